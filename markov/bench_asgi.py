@@ -0,0 +1,304 @@
+# bench_asgi.py
+# -*- coding: utf-8 -*-
+"""
+POST /inference 부하 테스트: Flask 앱 vs ASGI 앱 (동시 클라이언트 수별 RPS / 지연 p50·p99).
+
+모드
+  in-process (기본): 합성 모델 --users 명을 임시 MODEL_DIR 에 만들고 네트워크 없이 비교
+      flask  Flask test client 를 동시 클라이언트 수만큼의 스레드에서 호출
+      asgi   InferenceASGI 를 같은 이벤트 루프에서 동시 코루틴으로 직접 호출
+  URL: --url 이름=http://host:port 로 실제 서버에 keep-alive 연결을 동시 클라이언트 수만큼 열어 호출
+      (서버는 따로 띄운다: flask run / gunicorn, uvicorn realtime_inference_asgi:app)
+
+각 클라이언트는 응답을 받으면 바로 다음 요청을 보낸다 (closed loop, --duration 초).
+--cache-mb 0 이면 모델 캐시가 사실상 꺼져서 매 요청이 디스크에서 모델을 읽는다.
+
+    python bench_asgi.py --users 200 --concurrency 1 64 512 --duration 5 --out asgi.json
+    python bench_asgi.py --url flask=http://127.0.0.1:5000 --url asgi=http://127.0.0.1:8000
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_CONCURRENCY = (1, 64, 512)
+
+
+# ============================================================
+# 1. 결과 집계
+# ============================================================
+
+def summarize(latencies: Sequence[float], statuses: Sequence[int], elapsed: float) -> Dict[str, Any]:
+    lat_ms = np.asarray(latencies, dtype=float) * 1000.0
+    n = int(lat_ms.size)
+    n_ok = sum(1 for s in statuses if s == 200)
+    by_status: Dict[str, int] = {}
+    for s in statuses:
+        by_status[str(s)] = by_status.get(str(s), 0) + 1
+    return {
+        "requests": n,
+        "elapsed_sec": round(elapsed, 3),
+        "rps": round(n / elapsed, 1) if elapsed > 0 else None,
+        "ok_rps": round(n_ok / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 3) if n else None,
+        "p99_ms": round(float(np.percentile(lat_ms, 99)), 3) if n else None,
+        "max_ms": round(float(lat_ms.max()), 3) if n else None,
+        "error_rate": round(1.0 - n_ok / n, 4) if n else None,
+        "status": by_status,
+    }
+
+
+# ============================================================
+# 2. 클라이언트
+# ============================================================
+
+def run_flask_inprocess(flask_app, bodies: List[bytes], concurrency: int, duration: float) -> Dict[str, Any]:
+    """스레드 concurrency 개가 각자 test client 로 duration 초 동안 요청."""
+    stop_at = time.perf_counter() + duration
+    lock = threading.Lock()
+    latencies: List[float] = []
+    statuses: List[int] = []
+
+    def worker(w: int) -> None:
+        client = flask_app.test_client()
+        lat, st = [], []
+        i = w
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            resp = client.post("/inference", data=bodies[i % len(bodies)], content_type="application/json")
+            lat.append(time.perf_counter() - t0)
+            st.append(resp.status_code)
+            i += concurrency
+        with lock:
+            latencies.extend(lat)
+            statuses.extend(st)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(worker, range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - t0)
+
+
+async def call_asgi(asgi_app, path: str, body: bytes) -> int:
+    """ASGI 앱을 네트워크 없이 1회 호출 → status."""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+             "method": "POST", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "headers": [(b"content-type", b"application/json")]}
+    sent = False
+    status = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await asgi_app(scope, receive, send)
+    return status
+
+
+async def _closed_loop(send_one: Callable[[int], Any], concurrency: int, duration: float) -> Dict[str, Any]:
+    stop_at = time.perf_counter() + duration
+    latencies: List[float] = []
+    statuses: List[int] = []
+
+    async def worker(w: int) -> None:
+        i = w
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            try:
+                status = await send_one(i)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                status = 0
+            latencies.append(time.perf_counter() - t0)
+            statuses.append(status)
+            i += concurrency
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - t0)
+
+
+def run_asgi_inprocess(asgi_app, bodies: List[bytes], concurrency: int, duration: float) -> Dict[str, Any]:
+    async def send_one(i: int) -> int:
+        return await call_asgi(asgi_app, "/inference", bodies[i % len(bodies)])
+
+    return asyncio.run(_closed_loop(send_one, concurrency, duration))
+
+
+class HttpConnection:
+    """asyncio 로 HTTP/1.1 keep-alive 연결 1개 (Content-Length 응답만 처리)."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode("ascii") + body)
+        try:
+            await self.writer.drain()
+            raw_head = await self.reader.readuntil(b"\r\n\r\n")
+        except (OSError, asyncio.IncompleteReadError):
+            await self.close()
+            raise
+        lines = raw_head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {k.strip().lower(): v.strip() for k, _, v in (ln.partition(":") for ln in lines[1:] if ln)}
+        payload = await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, payload
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+
+def run_url(url: str, bodies: List[bytes], concurrency: int, duration: float) -> Dict[str, Any]:
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    path = (parts.path.rstrip("/") or "") + "/inference"
+
+    async def main() -> Dict[str, Any]:
+        conns = [HttpConnection(host, port) for _ in range(concurrency)]
+
+        async def send_one(i: int) -> int:
+            status, _ = await conns[i % concurrency].request("POST", path, bodies[i % len(bodies)])
+            return status
+
+        try:
+            return await _closed_loop(send_one, concurrency, duration)
+        finally:
+            await asyncio.gather(*(c.close() for c in conns))
+
+    return asyncio.run(main())
+
+
+# ============================================================
+# 3. CLI
+# ============================================================
+
+def _print_row(target: str, c: int, res: Dict[str, Any]) -> None:
+    print(f"[{target:>8} c={c:>4}] rps {res['rps']:>9}  p50 {res['p50_ms']} ms  "
+          f"p99 {res['p99_ms']} ms  errors {res['error_rate']}  {res['status']}", flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="/inference 부하 테스트: Flask vs ASGI")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--duration", type=float, default=5.0, help="동시 클라이언트 수별 측정 시간(초)")
+    parser.add_argument("--users", type=int, default=200, help="합성 유저 수 (요청은 유저를 돌아가며)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", action="append", default=[],
+                        help="이름=http://host:port (여러 번 가능). 없으면 in-process 로 flask / asgi 비교")
+    parser.add_argument("--cache-mb", type=float, help="in-process 모델 캐시 용량 (0 이면 매 요청 로드)")
+    parser.add_argument("--model-threads", type=int, help="in-process ASGI 모델 로드 스레드 수")
+    parser.add_argument("--max-in-flight", type=int, help="in-process ASGI 동시 처리 상한")
+    parser.add_argument("--timeout", type=float, help="in-process ASGI 요청 timeout(초)")
+    parser.add_argument("--out", type=Path, help="JSON 리포트 저장 경로")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(HERE))
+    from bench_pipeline import synthetic_payload, write_synthetic_model
+
+    out_path = args.out.resolve() if args.out else None
+    rng = np.random.default_rng(args.seed)
+    user_ids = [f"load_{i:06d}" for i in range(args.users)]
+    bodies = [json.dumps(synthetic_payload(rng, uid)).encode("utf-8") for uid in user_ids]
+
+    targets: Dict[str, Callable[[int], Dict[str, Any]]] = {}
+    meta: Dict[str, Any] = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "users": args.users,
+        "duration_sec": args.duration,
+    }
+
+    if args.url:
+        for spec in args.url:
+            name, _, url = spec.partition("=")
+            if not url:
+                parser.error(f"--url 은 이름=URL 형식이어야 합니다: {spec}")
+            targets[name] = lambda c, url=url: run_url(url, bodies, c, args.duration)
+        meta["mode"] = "url"
+        meta["urls"] = args.url
+        print("[BENCH] 서버에 합성 유저 모델이 있어야 합니다 (write_synthetic_model, user_id load_NNNNNN).")
+    else:
+        # 추론 모듈은 import 시 ./debug_outputs 를 쓴다 → 임시 디렉토리에서 실행
+        work_dir = tempfile.mkdtemp(prefix="mood_asgi_bench_")
+        os.chdir(work_dir)
+        import realtime_inference_many as inf
+        import realtime_inference_asgi as asgi_mod
+
+        model_date = datetime.now(timezone.utc) - timedelta(days=1)
+        for i, uid in enumerate(user_ids):
+            write_synthetic_model(inf.MODEL_DIR, uid, model_date, seed=args.seed + i)
+        if args.cache_mb is not None:
+            inf.MODEL_CACHE.max_bytes = int(args.cache_mb * 1024 * 1024)
+
+        asgi_app = asgi_mod.InferenceASGI(
+            model_threads=args.model_threads or asgi_mod.ASGI_MODEL_THREADS,
+            max_in_flight=args.max_in_flight or asgi_mod.ASGI_MAX_IN_FLIGHT,
+            timeout_sec=args.timeout or asgi_mod.ASGI_REQUEST_TIMEOUT_SEC,
+        )
+        targets["flask"] = lambda c: run_flask_inprocess(inf.app, bodies, c, args.duration)
+        targets["asgi"] = lambda c: run_asgi_inprocess(asgi_app, bodies, c, args.duration)
+        meta.update({
+            "mode": "in-process",
+            "work_dir": work_dir,
+            "cache_mb": args.cache_mb,
+            "asgi_model_threads": asgi_app.pool._max_workers,
+            "asgi_max_in_flight": asgi_app.max_in_flight,
+            "asgi_timeout_sec": asgi_app.timeout_sec,
+        })
+
+    results: Dict[str, Dict[str, Any]] = {name: {} for name in targets}
+    for c in args.concurrency:
+        for name, run in targets.items():
+            res = run(c)
+            results[name][str(c)] = res
+            _print_row(name, c, res)
+
+    report = {"meta": meta, "results": results}
+    if out_path:
+        with out_path.open("w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
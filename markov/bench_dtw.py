@@ -0,0 +1,125 @@
+# bench_dtw.py
+# -*- coding: utf-8 -*-
+"""
+DTW 클러스터링 엔진 벤치마크: dtw_kmeans(banded) vs tslearn TimeSeriesKMeans.
+
+user-day 1개 = 하루 feature(144, 5) → 윈도우 (121, 24, 5) 한 번 클러스터링.
+N user-day 는 빌드와 같이 user-day 마다 따로 클러스터링한 총 시간이다.
+tslearn 은 느리므로 --tslearn-max 개까지만 실제로 돌리고 그 이상은 선형 외삽한다.
+
+사용:
+    python bench_dtw.py --sizes 1 100 10000 --tslearn-max 20 --out dtw_bench.json
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List
+import argparse
+import json
+import time
+
+import numpy as np
+
+from dtw_kmeans import DTW_RADIUS, banded_dtw_kmeans, dtw_sq_matrix
+
+
+WINDOW_LENGTH = 24
+K_CLUSTERS = 5
+
+
+def synthetic_user_day_windows(rng: np.random.Generator) -> np.ndarray:
+    """0~1 범위 random walk feature 하루치 → (121, 24, 5) 윈도우."""
+    steps = rng.normal(0.0, 0.04, size=(144, 5))
+    feats = np.clip(rng.uniform(0.2, 0.8, size=5) + np.cumsum(steps, axis=0), 0.0, 1.0)
+    return np.lib.stride_tricks.sliding_window_view(feats, (WINDOW_LENGTH, 5))[:, 0]
+
+
+def run_banded(days: List[np.ndarray]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    inertias, iters, pruned = [], [], []
+    for X in days:
+        r = banded_dtw_kmeans(X, K_CLUSTERS, radius=DTW_RADIUS, max_iter=5, random_state=42)
+        inertias.append(r["inertia"])
+        iters.append(r["n_iter"])
+        pruned.append(r["pruned_ratio"])
+    elapsed = time.perf_counter() - t0
+    return {
+        "total_sec": elapsed,
+        "per_user_day_ms": 1000.0 * elapsed / len(days),
+        "mean_inertia": float(np.mean(inertias)),
+        "mean_iter": float(np.mean(iters)),
+        "mean_pruned_ratio": float(np.mean(pruned)),
+    }
+
+
+def run_tslearn(days: List[np.ndarray]) -> Dict[str, Any]:
+    from tslearn.clustering import TimeSeriesKMeans
+
+    t0 = time.perf_counter()
+    inertias = []
+    for X in days:
+        km = TimeSeriesKMeans(
+            n_clusters=K_CLUSTERS,
+            metric="dtw",
+            metric_params={"sakoe_chiba_radius": DTW_RADIUS},
+            max_iter=5,
+            n_init=1,
+            random_state=42,
+            n_jobs=1,
+            verbose=False,
+        )
+        km.fit(X)
+        # 같은 거리 정의로 다시 계산 (엔진 간 비교용)
+        inertias.append(float(dtw_sq_matrix(np.asarray(X, dtype=float), km.cluster_centers_).min(axis=1).mean()))
+    elapsed = time.perf_counter() - t0
+    return {
+        "total_sec": elapsed,
+        "per_user_day_ms": 1000.0 * elapsed / len(days),
+        "mean_inertia": float(np.mean(inertias)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="banded DTW k-means vs tslearn 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--tslearn-max", type=int, default=20,
+                        help="tslearn 을 실제로 돌리는 최대 user-day 수 (이상은 외삽)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON 리포트 저장 경로")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    all_days = [synthetic_user_day_windows(rng) for _ in range(max(args.sizes))]
+
+    # numba JIT 등 첫 호출 비용은 제외
+    run_banded(all_days[:1])
+    run_tslearn(all_days[:1])
+
+    report: Dict[str, Any] = {"radius": DTW_RADIUS, "K": K_CLUSTERS, "results": []}
+    for n in args.sizes:
+        days = all_days[:n]
+        banded = run_banded(days)
+
+        n_ts = min(n, args.tslearn_max)
+        ts = run_tslearn(days[:n_ts])
+        ts["measured_user_days"] = n_ts
+        ts["total_sec"] = ts["per_user_day_ms"] * n / 1000.0
+        ts["extrapolated"] = n_ts < n
+
+        row = {
+            "user_days": n,
+            "banded": banded,
+            "tslearn": ts,
+            "speedup": ts["per_user_day_ms"] / banded["per_user_day_ms"],
+        }
+        report["results"].append(row)
+        print(f"[{n:>6} user-days] banded {banded['total_sec']:.2f}s  "
+              f"tslearn {ts['total_sec']:.2f}s{' (extrapolated)' if ts['extrapolated'] else ''}  "
+              f"x{row['speedup']:.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
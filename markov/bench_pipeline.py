@@ -0,0 +1,501 @@
+# bench_pipeline.py
+# -*- coding: utf-8 -*-
+"""
+어제 모델 빌드 / 실시간 추론 단계별 벤치마크 (합성 데이터, RDS 없이 오프라인).
+
+DailyPreprocessedSlot 모양의 하루치 데이터를 seed 고정으로 만든다.
+  - 행 누락(연속 구간) + 컬럼별 NaN
+  - rainType(0~3) / sky(1,3,4) 범주값, sigh / laughter 횟수
+빌드 모듈의 RDS 조회 함수는 합성 데이터 조회로 바꿔 끼운다 (install_offline_fetch).
+
+측정 단계 (N 유저 기준 총 시간 / 유저당 ms):
+  fetch_offline   합성 블록 → DataFrame (RDS 조회 결과 모양)
+  clean           clean_raw_df_step2lite (DataFrame, 유저별)
+  clean_grid      slot_clean.clean_slot_block (전체 유저 블록 한 번)
+  features        compute_feature_df
+  windows         make_sliding_windows
+  dtw_cluster     dtw_cluster
+  markov          transition_matrices + compute_endpoint_means (유저별)
+  markov_batch    transition_count_tensor + endpoint_means_batch (전체 유저 한 번)
+  build_user      build_yesterday_model_for_user (조회 대체, 번들 저장까지)
+  model_load      load_model_artifact (캐시 없이 파일에서 로드)
+  model_cache     load_yesterday_model_runtime (MODEL_CACHE hit)
+  infer           infer_state_simple
+유저당 루프 단계는 --loop-max(클러스터링/빌드는 --cluster-max) 명까지만 실제로 돌리고
+그 이상은 선형 외삽한다 (리포트에 extrapolated 표시).
+
+회귀 비교:
+    python bench_pipeline.py --sizes 1 100 10000 --out bench_new.json
+    python bench_pipeline.py --sizes 1 100 10000 --baseline bench_old.json --threshold 0.2
+  baseline 대비 유저당 시간이 (1 + threshold) 배를 넘는 단계가 있으면 exit code 1.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from feature_engine import RAW_COLS, RAW_INDEX
+
+
+SLOTS_PER_DAY = 144
+BENCH_DATE = datetime(2025, 11, 30)
+
+STAGES = (
+    "fetch_offline", "clean", "clean_grid", "features", "windows", "dtw_cluster",
+    "markov", "markov_batch", "build_user", "model_load", "model_cache", "infer",
+)
+
+
+# ============================================================
+# 1. 합성 DailyPreprocessedSlot
+# ============================================================
+
+def synthetic_day_block(
+    n_users: int,
+    seed: int = 0,
+    row_gap_rate: float = 0.03,
+    cell_nan_rate: float = 0.02,
+) -> np.ndarray:
+    """
+    (n_users, 144, len(RAW_COLS)) raw 블록. 누락된 슬롯은 행 전체가 NaN.
+    row_gap_rate: 누락 구간이 시작될 확률 (구간 길이 1~6 슬롯)
+    cell_nan_rate: 연속형 / 횟수 컬럼의 개별 NaN 비율
+    """
+    rng = np.random.default_rng(seed)
+    U, T = n_users, SLOTS_PER_DAY
+    out = np.empty((U, T, len(RAW_COLS)), dtype=float)
+    t = np.arange(T)
+
+    def col(name: str) -> int:
+        return RAW_INDEX[name]
+
+    # 스트레스: 유저별 기준값 + random walk
+    base = rng.uniform(25, 70, size=(U, 1))
+    walk = np.cumsum(rng.normal(0, 2.0, size=(U, T)), axis=1)
+    avg = np.clip(base + 0.3 * walk, 0, 100)
+    out[:, :, col("average_stress_index")] = avg
+    out[:, :, col("recent_stress_index")] = np.clip(avg + rng.normal(0, 8, size=(U, T)), 0, 100)
+
+    # 수면: 하루 동안 거의 고정 (latest_*)
+    out[:, :, col("latest_sleep_score")] = rng.uniform(50, 95, size=(U, 1))
+    out[:, :, col("latest_sleep_duration")] = rng.uniform(240, 540, size=(U, 1))
+
+    # 날씨: 기온 일교차 + 습도, rainType / sky 는 30분~3시간 단위로 바뀜
+    temp_mean = rng.uniform(-5, 30, size=(U, 1))
+    out[:, :, col("temperature")] = (
+        temp_mean + 5.0 * np.sin((t - 54) / T * 2 * np.pi) + rng.normal(0, 0.5, size=(U, T))
+    )
+    out[:, :, col("humidity")] = np.clip(
+        rng.uniform(30, 80, size=(U, 1)) + rng.normal(0, 3, size=(U, T)), 0, 100)
+
+    seg = 6
+    n_seg = T // seg
+    rain_seg = rng.choice([0, 1, 2, 3], p=[0.75, 0.12, 0.1, 0.03], size=(U, n_seg))
+    sky_seg = rng.choice([1, 3, 4], p=[0.5, 0.3, 0.2], size=(U, n_seg))
+    out[:, :, col("rainType")] = np.repeat(rain_seg, seg, axis=1)
+    out[:, :, col("sky")] = np.repeat(sky_seg, seg, axis=1)
+
+    # 횟수
+    out[:, :, col("laughter")] = rng.poisson(0.6, size=(U, T))
+    out[:, :, col("sigh")] = rng.poisson(0.8, size=(U, T))
+
+    # 개별 NaN (범주형 제외)
+    cell_cols = [RAW_INDEX[c] for c in RAW_COLS if c not in ("rainType", "sky")]
+    cell_mask = rng.random((U, T, len(cell_cols))) < cell_nan_rate
+    sub = out[:, :, cell_cols]
+    sub[cell_mask] = np.nan
+    out[:, :, cell_cols] = sub
+
+    # 행 누락 구간
+    starts = rng.random((U, T)) < row_gap_rate
+    lengths = rng.integers(1, 7, size=(U, T))
+    gap = np.zeros((U, T), dtype=bool)
+    for u, s in zip(*np.nonzero(starts)):
+        gap[u, s:s + lengths[u, s]] = True
+    # 첫 / 마지막 슬롯은 남겨둔다 (하루 범위 유지)
+    gap[:, 0] = False
+    gap[:, -1] = False
+    out[gap] = np.nan
+    return out
+
+
+class OfflineSource:
+    """user_id → 합성 하루 블록. RDS 조회 함수와 같은 시그니처를 제공."""
+
+    def __init__(self, user_ids: Sequence[str], block: np.ndarray) -> None:
+        self.index = {uid: i for i, uid in enumerate(user_ids)}
+        self.block = block
+
+    def fetch_day_raw_from_rds(self, user_id: str, date: datetime):
+        from rds_fetch import day_block_to_frame
+        return day_block_to_frame(self.block[self.index[user_id]], date)
+
+    def fetch_day_raw_block(self, user_ids: Sequence[str], date: datetime, **kwargs):
+        rows = [self.index[uid] for uid in user_ids]
+        block = self.block[rows]
+        return block, (~np.isnan(block).all(axis=2)).sum(axis=1)
+
+
+def install_offline_fetch(build_module: Any, source: OfflineSource) -> None:
+    """build_yesterday_many 의 RDS 조회를 합성 데이터 조회로 교체."""
+    build_module.fetch_day_raw_from_rds = source.fetch_day_raw_from_rds
+    build_module.fetch_day_raw_block = source.fetch_day_raw_block
+
+
+def synthetic_payload(rng: np.random.Generator, user_id: str) -> Dict[str, Any]:
+    """/inference body 1개 (필드 범위는 synthetic_day_block 과 같음)."""
+    return {
+        "user_id": user_id,
+        "average_stress_index": float(rng.uniform(0, 100)),
+        "recent_stress_index": float(rng.uniform(0, 100)),
+        "latest_sleep_score": float(rng.uniform(50, 95)),
+        "latest_sleep_duration": float(rng.uniform(240, 540)),
+        "temperature": float(rng.uniform(-5, 30)),
+        "humidity": float(rng.uniform(30, 80)),
+        "rainType": int(rng.choice([0, 1, 2, 3])),
+        "sky": int(rng.choice([1, 3, 4])),
+        "sigh": int(rng.poisson(0.8)),
+        "laughter": int(rng.poisson(0.6)),
+    }
+
+
+def write_synthetic_model(
+    model_dir: Path,
+    user_id: str,
+    model_date: datetime,
+    seed: int = 0,
+    K: int = 5,
+    window_length: int = 24,
+    power_steps: Sequence[int] = (1, 2, 3, 6),
+) -> Path:
+    """
+    클러스터링 없이 추론 서버가 읽을 수 있는 모델 번들 1개를 만든다
+    (추론 / 기동 벤치마크, 부하 테스트용). 번들 경로 반환.
+    """
+    from cluster_text import RENDER_VERSION, render_cluster_texts
+    from feature_engine import FEATURE_COLS
+    from model_bundle import bundle_path, write_bundle
+
+    rng = np.random.default_rng(seed)
+    F = len(FEATURE_COLS)
+    centroids = rng.uniform(0, 1, size=(K, window_length, F))
+    endpoint_means = centroids[:, -1, :] + rng.normal(0, 0.02, size=(K, F))
+    P1 = rng.dirichlet(np.ones(K) * 0.5, size=K) * 0.5 + np.eye(K) * 0.5
+    P3 = np.linalg.matrix_power(P1, 3)
+    P1_powers = np.stack([np.linalg.matrix_power(P1, s) for s in power_steps])
+
+    summaries = []
+    for k in range(K):
+        s, c, f, v, w = centroids[k].mean(axis=0)
+        summaries.append({
+            "cluster_id": k,
+            "mean_scores": dict(zip(FEATURE_COLS, map(float, (s, c, f, v, w)))),
+            "valence": float((c + v + w) - (s + f)),
+            "arousal": float((s + v) / 2.0),
+        })
+
+    meta = {
+        "freq_minutes": 10,
+        "window_length": window_length,
+        "K": K,
+        "feature_cols": list(FEATURE_COLS),
+        "P1_power_steps": list(power_steps),
+        "cluster_summaries": summaries,
+        "cluster_texts": render_cluster_texts(summaries),
+        "cluster_text_version": RENDER_VERSION,
+        "save_prefix": f"{user_id}_{model_date.strftime('%Y%m%d')}",
+        "synthetic": True,
+    }
+    arrays = {
+        "centroids": centroids,
+        "endpoint_means": endpoint_means,
+        "P1": P1,
+        "P3": P3,
+        "P1_powers": P1_powers,
+    }
+    Path(model_dir).mkdir(parents=True, exist_ok=True)
+    return write_bundle(bundle_path(model_dir, meta["save_prefix"]), arrays, meta)
+
+
+# ============================================================
+# 2. 단계별 측정
+# ============================================================
+
+def _timed_loop(fn: Callable[[int], Any], n: int, n_measure: int, repeat: int = 1) -> Dict[str, Any]:
+    """fn(i) 를 n_measure 명에 대해 실제 실행 (repeat 회 중 최솟값), n 명으로 외삽."""
+    n_measure = max(1, min(n, n_measure))
+    elapsed = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        for i in range(n_measure):
+            fn(i)
+        elapsed = min(elapsed, time.perf_counter() - t0)
+    per_user = elapsed / n_measure
+    return {
+        "total_sec": round(per_user * n, 6),
+        "per_user_ms": round(1000.0 * per_user, 6),
+        "measured_users": n_measure,
+        "extrapolated": n_measure < n,
+    }
+
+
+def _timed_once(fn: Callable[[], Any], n: int, repeat: int = 1) -> Dict[str, Any]:
+    elapsed = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - t0)
+    return {
+        "total_sec": round(elapsed, 6),
+        "per_user_ms": round(1000.0 * elapsed / n, 6),
+        "measured_users": n,
+        "extrapolated": False,
+    }
+
+
+def bench_size(
+    n: int,
+    block: np.ndarray,
+    user_ids: List[str],
+    b: Any,
+    inf: Any,
+    loop_max: int,
+    cluster_max: int,
+    repeat: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    from markov_stats import endpoint_means_batch, transition_count_tensor
+    from slot_clean import clean_slot_block
+
+    res: Dict[str, Dict[str, Any]] = {}
+    n_loop = min(n, loop_max)
+    n_cluster = min(n, cluster_max)
+
+    frames: List[Any] = [None] * n_loop
+    clean: List[Any] = [None] * n_loop
+    feats: List[Any] = [None] * n_loop
+    wins: List[Any] = [None] * n_loop
+    labels: List[Any] = [None] * n_cluster
+
+    def _fetch(i: int) -> None:
+        frames[i] = b.fetch_day_raw_from_rds(user_ids[i], BENCH_DATE)
+
+    def _clean(i: int) -> None:
+        clean[i] = b.clean_raw_df_step2lite(frames[i])
+
+    def _features(i: int) -> None:
+        feats[i] = b.compute_feature_df(clean[i])
+
+    def _windows(i: int) -> None:
+        arr = np.ascontiguousarray(feats[i].values, dtype=float)
+        wins[i], _ = b.make_sliding_windows(arr, b.WINDOW_LENGTH)
+
+    def _cluster(i: int) -> None:
+        labels[i], _ = b.dtw_cluster(wins[i], K=b.K_CLUSTERS, engine="banded")
+
+    def _markov(i: int) -> None:
+        b.transition_matrices(labels[i], b.K_CLUSTERS, b.MARKOV_STEPS)
+        b.compute_endpoint_means(wins[i], labels[i], b.K_CLUSTERS)
+
+    res["fetch_offline"] = _timed_loop(_fetch, n, n_loop, repeat)
+    res["clean"] = _timed_loop(_clean, n, n_loop, repeat)
+    res["clean_grid"] = _timed_once(lambda: clean_slot_block(block[:n]), n, repeat)
+    res["features"] = _timed_loop(_features, n, n_loop, repeat)
+    res["windows"] = _timed_loop(_windows, n, n_loop, repeat)
+    res["dtw_cluster"] = _timed_loop(_cluster, n, n_cluster, repeat)
+    res["markov"] = _timed_loop(_markov, n, n_cluster, repeat)
+
+    # 전체 유저를 한 번에 (라벨은 측정한 유저 라벨을 반복해서 n 명 분량으로)
+    # (행 누락으로 유저별 윈도우 수가 달라서 라벨 -1 로 패딩)
+    W = max(wins[j].shape[0] for j in range(n_cluster))
+    stacked_labels = np.full((n, W), -1, dtype=np.int64)
+    stacked_wins = np.zeros((n, W) + wins[0].shape[1:])
+    for i in range(n):
+        j = i % n_cluster
+        lab = np.asarray(labels[j])
+        stacked_labels[i, :len(lab)] = lab
+        stacked_wins[i, :wins[j].shape[0]] = wins[j]
+
+    def _markov_batch() -> None:
+        transition_count_tensor(stacked_labels, b.K_CLUSTERS, b.MARKOV_STEPS)
+        endpoint_means_batch(stacked_wins, stacked_labels, b.K_CLUSTERS)
+
+    res["markov_batch"] = _timed_once(_markov_batch, n, repeat)
+
+    # 조회 대체 상태에서 유저 1명 end-to-end 빌드 (번들 / meta json 저장 포함)
+    def _build(i: int) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            b.build_yesterday_model_for_user(user_ids[i], BENCH_DATE)
+
+    res["build_user"] = _timed_loop(_build, n, n_cluster)
+
+    today = BENCH_DATE + timedelta(days=1)
+    models: List[Any] = [None] * n_cluster
+
+    def _load(i: int) -> None:
+        path = inf.locate_model_artifact(user_ids[i], BENCH_DATE)
+        models[i] = inf.load_model_artifact(user_ids[i], BENCH_DATE, path)
+
+    res["model_load"] = _timed_loop(_load, n, n_cluster, repeat)
+
+    for i in range(n_cluster):
+        inf.load_yesterday_model_runtime(user_ids[i], today)
+
+    def _cached(i: int) -> None:
+        inf.load_yesterday_model_runtime(user_ids[i], today)
+
+    res["model_cache"] = _timed_loop(_cached, n, n_cluster, repeat)
+
+    # 실시간 인풋: 각 유저 하루치의 마지막 정상 슬롯
+    points = []
+    for i in range(n_loop):
+        row = clean[i].iloc[-1]
+        points.append({c: float(row[c]) for c in RAW_COLS})
+
+    def _infer(i: int) -> None:
+        inf.infer_state_simple(points[i], models[i % n_cluster], future_minutes=30)
+
+    res["infer"] = _timed_loop(_infer, n, n_loop, repeat)
+    return res
+
+
+# ============================================================
+# 3. baseline 비교
+# ============================================================
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_ms: float,
+) -> List[Dict[str, Any]]:
+    """
+    크기 / 단계별 유저당 시간 비교. baseline 유저당 시간이 min_ms 미만인 단계는
+    측정 잡음이 커서 회귀 판정에서 제외한다.
+    """
+    rows = []
+    for size, stages in report["results"].items():
+        base_stages = baseline.get("results", {}).get(size)
+        if not base_stages:
+            continue
+        for stage, cur in stages.items():
+            base = base_stages.get(stage)
+            if not base or not base.get("per_user_ms"):
+                continue
+            ratio = cur["per_user_ms"] / base["per_user_ms"]
+            rows.append({
+                "size": int(size),
+                "stage": stage,
+                "baseline_ms": base["per_user_ms"],
+                "current_ms": cur["per_user_ms"],
+                "ratio": round(ratio, 4),
+                "regression": base["per_user_ms"] >= min_ms and ratio > 1.0 + threshold,
+            })
+    return rows
+
+
+# ============================================================
+# 4. CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="mood 모델 빌드/추론 단계별 벤치마크 (오프라인)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--loop-max", type=int, default=1000,
+                        help="유저별 루프 단계를 실제로 돌리는 최대 유저 수 (이상은 외삽)")
+    parser.add_argument("--cluster-max", type=int, default=50,
+                        help="클러스터링 / 빌드를 실제로 돌리는 최대 유저 수 (이상은 외삽)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="단계별 반복 측정 횟수 (최솟값 사용, build_user 는 1회)")
+    parser.add_argument("--out", type=Path, help="JSON 리포트 저장 경로")
+    parser.add_argument("--baseline", type=Path, help="비교할 이전 JSON 리포트")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="유저당 시간이 baseline 의 (1 + threshold) 배를 넘으면 회귀")
+    parser.add_argument("--min-ms", type=float, default=0.05,
+                        help="baseline 유저당 시간이 이보다 작은 단계는 회귀 판정 제외")
+    args = parser.parse_args(argv)
+
+    out_path = args.out.resolve() if args.out else None
+    baseline = None
+    if args.baseline:
+        with args.baseline.open("r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # 빌드 / 추론 모듈은 import 시 ./debug_outputs 를 만든다 → 임시 디렉토리에서 실행
+    work_dir = tempfile.mkdtemp(prefix="mood_bench_")
+    os.chdir(work_dir)
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import build_yesterday_many as b
+    import realtime_inference_many as inf
+
+    b.WARM_START = False
+    b.ROLLING_MODEL = False
+    b.MODEL_DEBUG_LEVEL = 0
+
+    n_max = max(args.sizes)
+    user_ids = [f"bench_{i:06d}" for i in range(n_max)]
+    block = synthetic_day_block(n_max, seed=args.seed)
+    install_offline_fetch(b, OfflineSource(user_ids, block))
+
+    # 첫 호출 비용 (import / 캐시) 제외
+    bench_size(1, block, user_ids, b, inf, 1, 1)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "loop_max": args.loop_max,
+            "cluster_max": args.cluster_max,
+            "repeat": args.repeat,
+            "dtw_engine": "banded",
+            "work_dir": work_dir,
+        },
+        "results": {},
+    }
+    for n in sorted(args.sizes):
+        res = bench_size(n, block, user_ids, b, inf, args.loop_max, args.cluster_max, args.repeat)
+        report["results"][str(n)] = res
+        line = "  ".join(f"{s} {res[s]['per_user_ms']:.3f}" for s in STAGES)
+        print(f"[{n:>6} users] ms/user  {line}")
+
+    exit_code = 0
+    if baseline is not None:
+        rows = compare_to_baseline(report, baseline, args.threshold, args.min_ms)
+        regressions = [r for r in rows if r["regression"]]
+        report["comparison"] = {
+            "baseline_created_at": baseline.get("meta", {}).get("created_at"),
+            "threshold": args.threshold,
+            "min_ms": args.min_ms,
+            "rows": rows,
+            "n_regressions": len(regressions),
+        }
+        for r in regressions:
+            print(f"[REGRESSION] {r['size']} users {r['stage']}: "
+                  f"{r['baseline_ms']:.3f} → {r['current_ms']:.3f} ms/user (x{r['ratio']:.2f})")
+        if regressions:
+            exit_code = 1
+
+    if out_path:
+        with out_path.open("w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# bench_startup.py
+# -*- coding: utf-8 -*-
+"""
+추론 서버 기동 비용 벤치마크 (오토스케일 시 워커 부팅 시간 확인용).
+
+새 파이썬 프로세스를 --runs 번 띄워서 각각 측정하고 중앙값을 리포트한다.
+  import_ms          import realtime_inference_many 소요 시간
+  rss_mb             import 직후 프로세스 RSS
+  rss_delta_mb       import 전후 RSS 차이
+  first_request_ms   첫 POST /inference (Flask test client, 모델 로드 포함)
+  second_request_ms  같은 유저 두 번째 요청 (모델 캐시 hit)
+  process_ms         인터프리터 시작 ~ 첫 응답까지 전체
+
+추론 경로에서 로드되면 안 되는 모듈(FORBIDDEN_MODULES, pandas 등)이
+하나라도 import 되면 실패로 본다. 임계값(--max-*)을 넘어도 실패.
+
+    python bench_startup.py --runs 5
+    python bench_startup.py --runs 5 --max-import-ms 800 --max-first-request-ms 50 --out startup.json
+  실패 시 exit code 1.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+HERE = Path(__file__).resolve().parent
+BENCH_USER = "startup_bench_user"
+
+# 빌드 / 배치 전용 의존성 — 추론 서버 import 로 끌려오면 안 된다
+FORBIDDEN_MODULES = ("pandas", "scipy", "sklearn", "tslearn", "psycopg2", "sqlalchemy")
+
+# 자식 프로세스에서 실행 (cwd = 합성 모델이 있는 임시 디렉토리)
+_PROBE = r"""
+import json, sys, time
+t_start = time.perf_counter()
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+rss0 = rss_mb()
+t0 = time.perf_counter()
+import realtime_inference_many as inf
+t1 = time.perf_counter()
+rss1 = rss_mb()
+
+client = inf.app.test_client()
+payload = json.loads(sys.argv[1])
+t2 = time.perf_counter()
+r1 = client.post("/inference", json=payload)
+t3 = time.perf_counter()
+r2 = client.post("/inference", json=payload)
+t4 = time.perf_counter()
+
+forbidden = [m for m in json.loads(sys.argv[2]) if m in sys.modules]
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "rss_mb": rss1,
+    "rss_delta_mb": rss1 - rss0,
+    "first_request_ms": (t3 - t2) * 1000,
+    "second_request_ms": (t4 - t3) * 1000,
+    "first_status": r1.status_code,
+    "second_status": r2.status_code,
+    "forbidden_modules": forbidden,
+}))
+"""
+
+METRIC_KEYS = ("import_ms", "rss_mb", "rss_delta_mb", "first_request_ms", "second_request_ms", "process_ms")
+
+
+def run_probe(work_dir: Path, payload: Dict[str, Any]) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(HERE), env.get("PYTHONPATH")]))
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, json.dumps(payload), json.dumps(FORBIDDEN_MODULES)],
+        cwd=work_dir, env=env, capture_output=True, text=True, check=False,
+    )
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"probe failed (exit {proc.returncode}):\n{proc.stderr}")
+    res = json.loads(proc.stdout.strip().splitlines()[-1])
+    res["process_ms"] = elapsed_ms
+    return res
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="추론 서버 기동 비용 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="새 프로세스 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="JSON 리포트 저장 경로")
+    parser.add_argument("--max-import-ms", type=float, help="import_ms 중앙값 상한")
+    parser.add_argument("--max-rss-mb", type=float, help="rss_mb 중앙값 상한")
+    parser.add_argument("--max-first-request-ms", type=float, help="first_request_ms 중앙값 상한")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(HERE))
+    import numpy as np
+    from bench_pipeline import synthetic_payload, write_synthetic_model
+
+    # 서버는 UTC 기준 어제 모델을 읽는다
+    today = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory(prefix="mood_startup_") as tmp:
+        work_dir = Path(tmp)
+        write_synthetic_model(work_dir / "debug_outputs" / "model", BENCH_USER,
+                              today - timedelta(days=1), seed=args.seed)
+        payload = synthetic_payload(np.random.default_rng(args.seed), BENCH_USER)
+
+        runs = []
+        for i in range(args.runs):
+            res = run_probe(work_dir, payload)
+            runs.append(res)
+            print(f"[run {i + 1}/{args.runs}] " + "  ".join(f"{k} {res[k]:.1f}" for k in METRIC_KEYS),
+                  flush=True)
+
+    summary = {k: statistics.median(r[k] for r in runs) for k in METRIC_KEYS}
+    forbidden = sorted({m for r in runs for m in r["forbidden_modules"]})
+    bad_status = sorted({r[k] for r in runs for k in ("first_status", "second_status") if r[k] != 200})
+
+    failures = []
+    if forbidden:
+        failures.append(f"forbidden modules imported: {', '.join(forbidden)}")
+    if bad_status:
+        failures.append(f"non-200 responses: {bad_status}")
+    for key, limit in (("import_ms", args.max_import_ms),
+                       ("rss_mb", args.max_rss_mb),
+                       ("first_request_ms", args.max_first_request_ms)):
+        if limit is not None and summary[key] > limit:
+            failures.append(f"{key} {summary[key]:.1f} > {limit}")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "runs": args.runs,
+        },
+        "median": summary,
+        "runs": runs,
+        "failures": failures,
+    }
+    print(json.dumps({"median": {k: round(v, 2) for k, v in summary.items()}, "failures": failures},
+                     ensure_ascii=False, indent=2))
+    if args.out:
+        with args.out.open("w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# build_jobs.py
+# -*- coding: utf-8 -*-
+"""
+어제 모델 빌드 비동기 잡 큐.
+
+- submit(): 잡을 큐에 넣고 바로 job_id 반환 (HTTP 요청은 빌드 시간과 무관)
+- 같은 (user_id, date) 잡이 queued/running 이면 새로 만들지 않고 기존 잡을 반환
+- 동시 실행 수(max_concurrency)와 대기 잡 수(max_pending)를 제한해서
+  요청이 몰려도 서버 코어를 과점유하지 않는다
+- 실제 빌드는 프로세스 풀에서 실행 (Flask 프로세스의 GIL 과 분리)
+  get_pool 을 넘기면 매번 그 풀을 받아서 쓴다 (배치 빌드와 공용 풀, 종료는 풀 주인이)
+- submit_many(): 여러 유저 잡을 한 번에 등록. 자리가 모자라면 하나도 넣지 않고 QueueFullError
+- wait(): 여러 잡이 끝날 때까지(또는 timeout 까지) 기다렸다가 스냅샷 반환
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+import threading
+import time
+import uuid
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+
+class QueueFullError(RuntimeError):
+    """대기 중인 잡이 max_pending 에 도달했을 때."""
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BuildJobQueue:
+    """
+    build_fn(user_id, date) -> {"status": "success" | "error", ...} 를
+    프로세스 풀에서 실행하는 잡 큐.
+    on_result: 잡이 끝날 때마다 결과 dict 로 호출 (dispatcher 스레드, 메트릭 기록용)
+    """
+
+    def __init__(
+        self,
+        build_fn: Callable[..., Dict[str, Any]],
+        max_concurrency: int,
+        max_pending: int,
+        worker_initializer: Optional[Callable[[], None]] = None,
+        keep_finished: int = 1000,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        get_pool: Optional[Callable[[], Executor]] = None,
+        on_pool_broken: Optional[Callable[[Executor], None]] = None,
+    ) -> None:
+        self.build_fn = build_fn
+        self.on_result = on_result
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max(1, max_pending)
+        self.keep_finished = keep_finished
+
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)  # 잡이 끝날 때마다 notify_all
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._active_by_key: Dict[Tuple[str, str], str] = {}
+
+        # dispatcher 스레드 수 == 동시에 풀에 넣는 빌드 수 → 동시에 도는 빌드는 최대 max_concurrency
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="build-job",
+        )
+        self.on_pool_broken = on_pool_broken
+        self._own_pool: Optional[ProcessPoolExecutor] = None
+        if get_pool is None:
+            self._own_pool = ProcessPoolExecutor(
+                max_workers=self.max_concurrency, initializer=worker_initializer,
+            )
+            get_pool = lambda: self._own_pool
+        self.get_pool = get_pool
+
+    # ------------------------------
+    # 제출 / 조회
+    # ------------------------------
+
+    def submit(self, user_id: str, date: datetime) -> Tuple[Dict[str, Any], bool]:
+        """
+        output: (job snapshot, created)
+          - created=False 면 같은 user/date 의 진행 중 잡을 돌려준 것
+        """
+        return self.submit_many([user_id], date)[0]
+
+    def submit_many(self, user_ids: Iterable[str], date: datetime) -> List[Tuple[Dict[str, Any], bool]]:
+        """
+        여러 유저 잡을 한 번에 등록 (입력 순서대로 (job snapshot, created)).
+        새로 만들 잡이 남은 자리(max_pending)보다 많으면 하나도 등록하지 않고 QueueFullError.
+        """
+        date_str = date.strftime("%Y-%m-%d")
+        out: List[Tuple[Dict[str, Any], bool]] = []
+        to_run: List[Tuple[str, Tuple[str, str]]] = []
+
+        with self._lock:
+            keys = [(user_id, date_str) for user_id in dict.fromkeys(user_ids)]
+            n_new = sum(1 for key in keys if key not in self._active_by_key)
+            if len(self._active_by_key) + n_new > self.max_pending:
+                raise QueueFullError(
+                    f"대기 중인 빌드 잡이 너무 많습니다 (max_pending={self.max_pending})."
+                )
+
+            for key in keys:
+                existing_id = self._active_by_key.get(key)
+                if existing_id is not None:
+                    out.append((dict(self._jobs[existing_id]), False))
+                    continue
+                job_id = uuid.uuid4().hex
+                job = {
+                    "job_id": job_id,
+                    "user_id": key[0],
+                    "target_date": date_str,
+                    "status": JOB_QUEUED,
+                    "created_at": _now_iso(),
+                    "started_at": None,
+                    "finished_at": None,
+                    "result": None,
+                }
+                self._jobs[job_id] = job
+                self._active_by_key[key] = job_id
+                out.append((dict(job), True))
+                to_run.append((job_id, key))
+
+        for job_id, key in to_run:
+            self._dispatcher.submit(self._run, job_id, key, date)
+        return out
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait(self, job_ids: Iterable[str], timeout: float) -> List[Optional[Dict[str, Any]]]:
+        """
+        job_ids 가 모두 끝나거나 timeout(초)이 지날 때까지 기다린 뒤 입력 순서대로 스냅샷.
+        없는 job_id(또는 keep_finished 로 이미 지워진 잡)는 None.
+        """
+        job_ids = list(job_ids)
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._finished:
+            while True:
+                active = [j for j in job_ids
+                          if j in self._jobs and self._jobs[j]["status"] in ACTIVE_STATUSES]
+                remaining = deadline - time.monotonic()
+                if not active or remaining <= 0:
+                    break
+                self._finished.wait(remaining)
+            return [dict(self._jobs[j]) if j in self._jobs else None for j in job_ids]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {s: 0 for s in (JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED)}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+        counts["max_concurrency"] = self.max_concurrency
+        counts["max_pending"] = self.max_pending
+        return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._dispatcher.shutdown(wait=wait)
+        if self._own_pool is not None:
+            self._own_pool.shutdown(wait=wait)
+
+    # ------------------------------
+    # 실행
+    # ------------------------------
+
+    def _run(self, job_id: str, key: Tuple[str, str], date: datetime) -> None:
+        with self._lock:
+            self._jobs[job_id]["status"] = JOB_RUNNING
+            self._jobs[job_id]["started_at"] = _now_iso()
+
+        pool = self.get_pool()
+        try:
+            result = pool.submit(self.build_fn, key[0], date).result()
+            status = JOB_SUCCEEDED if result.get("status") == "success" else JOB_FAILED
+        except BrokenExecutor as e:
+            # 워커가 죽은 풀: 주인에게 알려서 다음 잡부터 새 풀을 쓰게 함
+            if self.on_pool_broken is not None:
+                self.on_pool_broken(pool)
+            result = {"status": "error", "error": type(e).__name__, "message": str(e)}
+            status = JOB_FAILED
+        except Exception as e:
+            result = {"status": "error", "error": type(e).__name__, "message": str(e)}
+            status = JOB_FAILED
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = status
+            job["finished_at"] = _now_iso()
+            job["result"] = result
+            self._active_by_key.pop(key, None)
+            self._trim_finished()
+            self._finished.notify_all()
+
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def _trim_finished(self) -> None:
+        """완료된 잡은 최근 keep_finished 개만 보관 (오래된 것부터 삭제)."""
+        finished = [jid for jid, j in self._jobs.items() if j["status"] not in ACTIVE_STATUSES]
+        for jid in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[jid]
@@ -5,21 +5,54 @@
 → step2-lite (결측치 보간 + ffill/bfill, count=0, categorical ffill)
 → feature score 5개 계산
 → 슬라이딩 윈도우 → DTW 클러스터링 + 마르코프 + endpoint μ_k
-→ debug_outputs/ 이하에 중간 산출물 + {user_id}_{date}_yesterday_model_meta.json 저장.
+→ debug_outputs/model/ 에 {user_id}_{date}_yesterday_model.bundle (모델 번들)
+  + {user_id}_{date}_yesterday_model_meta.json 저장.
+  (MODEL_DEBUG_LEVEL >= 1 이면 중간 산출물 CSV/npy 도 저장)
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple
+from typing import Callable, List, Dict, Any, Tuple
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import argparse
 import json
+import os
+import sys
+import threading
+import time
 
 from flask import Flask, request, Response
 import numpy as np
 import pandas as pd
-import psycopg2
 import psycopg2.extras
-from tslearn.clustering import TimeSeriesKMeans
+
+from feature_engine import FEATURE_COLS, RAW_COLS, compute_feature_matrix, raw_frame_to_array
+from dtw_kmeans import DTW_RADIUS, banded_dtw_kmeans
+from model_bundle import (
+    BUNDLE_FORMAT_VERSION,
+    BundleFormatError,
+    bundle_path,
+    find_latest_bundle,
+    read_bundle,
+    write_bundle,
+)
+from markov_stats import ENDPOINT_TAIL, endpoint_means_batch, transition_matrices, transition_powers
+from rolling_model import (
+    fold_day,
+    load_rolling_state,
+    rolling_state_lock,
+    rolling_state_path,
+    save_rolling_state,
+    state_to_model_arrays,
+)
+from build_jobs import ACTIVE_STATUSES, JOB_FAILED, JOB_SUCCEEDED, BuildJobQueue, QueueFullError
+from rds_fetch import day_block_to_frame, fetch_day_raw_block, pooled_connection, slot_timestamps
+from slot_clean import clean_slot_block, frame_to_slot_block
+from bulk_export import exported_user_ids, has_export_day, read_export_block
+from cluster_text import RENDER_VERSION, render_cluster_texts
+from metrics import MetricsRegistry, StageTimer, collect_stage_times, instrument_flask_app
 
 
 # ============================================================
@@ -33,6 +66,52 @@ WINDOW_LENGTH = 24            # 24 * 10분 = 4시간
 K_CLUSTERS = 5
 RANDOM_SEED = 42
 
+# DTW 클러스터링 엔진: "banded"(자체 구현) | "tslearn"
+DTW_ENGINE = os.environ.get("DTW_ENGINE", "banded")
+DBA_ITER = 2
+KMEANS_MAX_ITER = 5
+
+# 마르코프 전이 step (P1, P3) 과 추론 서버가 쓰는 horizon (10분 단위 step)
+MARKOV_STEPS = (1, 3)
+INFERENCE_HORIZON_STEPS = (1, 2, 3, 6)
+
+# warm start: 최근 WARM_START_LOOKBACK_DAYS 일 안의 같은 유저 모델 중심에서 시작
+#   KMEANS_LABEL_TOL: 라벨 변경 비율이 이 이하이면 조기 종료
+#   KMEANS_INERTIA_TOL: inertia 상대 감소량이 이 이하이면 조기 종료
+WARM_START = os.environ.get("WARM_START", "1") == "1"
+WARM_START_LOOKBACK_DAYS = int(os.environ.get("WARM_START_LOOKBACK_DAYS", "7"))
+KMEANS_LABEL_TOL = float(os.environ.get("KMEANS_LABEL_TOL", "0.0"))
+KMEANS_INERTIA_TOL = float(os.environ.get("KMEANS_INERTIA_TOL", "1e-3"))
+
+# tslearn 내부 병렬 수. 배치 빌드 워커 프로세스에서는 1로 내려서
+# (워커 수 × n_jobs) 만큼 코어를 과점유하지 않도록 한다.
+DTW_N_JOBS = -1
+
+# /build-yesterday 비동기 잡 큐 설정
+BUILD_MAX_CONCURRENCY = int(os.environ.get("BUILD_MAX_CONCURRENCY",
+                                           str(max(1, (os.cpu_count() or 2) // 2))))
+BUILD_MAX_PENDING = int(os.environ.get("BUILD_MAX_PENDING", "1000"))
+# /build-yesterday/batch?wait=1 에서 잡 완료를 기다리는 최대 시간(초, ?timeout= 으로 더 짧게)
+BUILD_BATCH_WAIT_MAX_SEC = float(os.environ.get("BUILD_BATCH_WAIT_MAX_SEC", "600"))
+
+# 디버그 산출물 레벨
+#   0: 모델 번들 + meta json 만 저장 (기본)
+#   1: + raw/clean/features/windows meta/cluster labels CSV, 배열별 npy
+#   2: + windows_L24.npy
+MODEL_DEBUG_LEVEL = int(os.environ.get("MODEL_DEBUG_LEVEL", "0"))
+
+# rolling 모드: 유저별 누적 상태(전이 횟수, endpoint 합)에 하루씩 접어 넣음
+#   ROLLING_DECAY: 하루 지날 때마다 과거 횟수/합에 곱하는 계수
+ROLLING_MODEL = os.environ.get("ROLLING_MODEL", "0") == "1"
+ROLLING_DECAY = float(os.environ.get("ROLLING_DECAY", "0.8"))
+
+# bulk_export.py 로 미리 export 한 디렉토리. 해당 날짜 파티션이 있으면
+# 배치 빌드는 RDS 대신 이 파일들을 mmap 으로 읽는다 (backfill / 여러 날 재빌드)
+RAW_EXPORT_DIR = os.environ.get("RAW_EXPORT_DIR")
+
+# windows_L24.npy 저장 여부 (features CSV 로부터 load_windows_from_features 로 복원 가능)
+SAVE_WINDOWS_NPY = os.environ.get("SAVE_WINDOWS_NPY", "0") == "1" or MODEL_DEBUG_LEVEL >= 2
+
 np.random.seed(RANDOM_SEED)
 
 BASE_DEBUG_DIR = Path("./debug_outputs")
@@ -46,6 +125,22 @@ MODEL_DIR = BASE_DEBUG_DIR / "model"
 for d in [BASE_DEBUG_DIR, RAW_DIR, CLEAN_DIR, FEAT_DIR, WIN_DIR, CLUSTER_DIR, MODEL_DIR]:
     d.mkdir(parents=True, exist_ok=True)
 
+# 계측 (GET /metrics)
+#   stage: fetch / clean / features / windowing / clustering / markov / save / debug_io
+#   워커 프로세스에서 잰 stage 시간은 결과 dict(stage_sec) 로 받아서 여기에 기록
+METRICS = MetricsRegistry()
+BUILD_STAGES = StageTimer(METRICS.histogram(
+    "mood_build_stage_seconds", "빌드 단계별 소요 시간(초)", ("stage",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+))
+BUILD_USERS_TOTAL = METRICS.counter("mood_build_users_total", "유저 빌드 결과 수", ("status",))
+BUILD_USER_SECONDS = METRICS.histogram(
+    "mood_build_user_seconds", "유저 1명 빌드 전체 시간(초)",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+BUILD_JOBS = METRICS.gauge("mood_build_jobs", "빌드 잡 큐 상태별 잡 수", ("status",))
+instrument_flask_app(app, METRICS, "mood_build")
+
 
 def clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
@@ -62,6 +157,9 @@ def clean_raw_df_step2lite(raw_df: pd.DataFrame) -> pd.DataFrame:
     - count: NaN -> 0
     - categorical: ffill + bfill
     - timestamp 정렬
+
+    DataFrame 기준 구현 (row 가 있는 슬롯만 다룸).
+    빌드 경로는 144 슬롯 그리드 위에서 같은 규칙을 적용하는 slot_clean.clean_slot_block 을 사용한다.
     """
     df = raw_df.copy()
 
@@ -105,15 +203,6 @@ def clean_raw_df_step2lite(raw_df: pd.DataFrame) -> pd.DataFrame:
 # 2. feature score 5개 계산
 # ============================================================
 
-FEATURE_COLS = [
-    "StressScore",
-    "CalmScore",
-    "FatigueScore",
-    "VibrancyScore",
-    "WeatherScore",
-]
-
-
 def compute_feature_row(raw_row: pd.Series) -> Dict[str, float]:
     """
     raw_row: Series
@@ -121,6 +210,8 @@ def compute_feature_row(raw_row: pd.Series) -> Dict[str, float]:
         temperature, humidity, rainType, sky, laughter, sigh
     output:
       5개 0~1 score (Stress/Calm/Fatigue/Vibrancy/Weather)
+
+    스칼라 기준 구현. 빌드/추론 경로는 feature_engine.compute_feature_matrix 를 사용한다.
     """
     avg_stress = raw_row["average_stress_index"] / 100.0
     recent_stress = raw_row["recent_stress_index"] / 100.0
@@ -174,11 +265,8 @@ def compute_feature_row(raw_row: pd.Series) -> Dict[str, float]:
 
 
 def compute_feature_df(raw_df: pd.DataFrame) -> pd.DataFrame:
-    feat_rows = []
-    for _, row in raw_df.iterrows():
-        scores = compute_feature_row(row)
-        feat_rows.append(scores)
-    df_feat = pd.DataFrame(feat_rows, index=raw_df["timestamp"])
+    feats = compute_feature_matrix(raw_frame_to_array(raw_df))
+    df_feat = pd.DataFrame(feats, columns=FEATURE_COLS, index=raw_df["timestamp"])
     df_feat.index.name = "timestamp"
     return df_feat
 
@@ -188,55 +276,119 @@ def compute_feature_df(raw_df: pd.DataFrame) -> pd.DataFrame:
 # ============================================================
 
 def make_sliding_windows(arr: np.ndarray, L: int) -> Tuple[np.ndarray, List[int]]:
+    """
+    arr: (T, D) → windows (T-L+1, L, D), end_indices
+    windows 는 arr 의 읽기 전용 strided view (복사 없음).
+    windows[i] == arr[i : i+L], end_indices[i] == i+L-1
+    """
     T, D = arr.shape
     if T < L:
         return np.empty((0, L, D)), []
 
-    windows = []
-    end_indices = []
-    for end in range(L - 1, T):
-        start = end - L + 1
-        windows.append(arr[start:end + 1])
-        end_indices.append(end)
+    windows = np.lib.stride_tricks.sliding_window_view(arr, (L, D))[:, 0]
+    end_indices = list(range(L - 1, T))
+    return windows, end_indices
 
-    return np.stack(windows, axis=0), end_indices
+
+def load_windows_from_features(features_csv: str | Path, L: int = WINDOW_LENGTH) -> np.ndarray:
+    """
+    저장된 features CSV 에서 윈도우 view 를 다시 만든다.
+    (windows_L{L}.npy 를 저장하지 않았을 때 디버그/분석용, MODEL_DEBUG_LEVEL >= 1 필요)
+    """
+    df_feat = pd.read_csv(features_csv, index_col="timestamp")
+    arr = np.ascontiguousarray(df_feat[FEATURE_COLS].values, dtype=float)
+    windows, _ = make_sliding_windows(arr, L)
+    return windows
 
 
 # ============================================================
 # 4. DTW K-means + 마르코프 + endpoint μ_k
 # ============================================================
 
-def dtw_cluster(all_windows: np.ndarray, K: int = K_CLUSTERS) -> Tuple[np.ndarray, np.ndarray]:
+def dtw_cluster_with_info(
+    all_windows: np.ndarray,
+    K: int = K_CLUSTERS,
+    engine: str | None = None,
+    init_centroids: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    윈도우 DTW 클러스터링 → (labels (N,), centroids (K, L, D), info)
+    engine:
+      - "banded": dtw_kmeans.banded_dtw_kmeans (기본)
+      - "tslearn": 기존 TimeSeriesKMeans
+    init_centroids: 이전 모델 중심 (warm start). 없으면 cold init.
+    info: init / n_iter / converged / inertia / elapsed_sec / est_time_saved_sec
+    """
+    engine = engine or DTW_ENGINE
+    t0 = time.perf_counter()
+    if engine == "banded":
+        result = banded_dtw_kmeans(
+            all_windows,
+            K,
+            radius=DTW_RADIUS,
+            max_iter=KMEANS_MAX_ITER,
+            dba_iter=DBA_ITER,
+            random_state=RANDOM_SEED,
+            init_centroids=init_centroids,
+            label_tol=KMEANS_LABEL_TOL,
+            inertia_tol=KMEANS_INERTIA_TOL,
+        )
+        info = {
+            "engine": engine,
+            "init": result["init"],
+            "n_iter": result["n_iter"],
+            "converged": result["converged"],
+            "inertia": result["inertia"],
+            "elapsed_sec": round(time.perf_counter() - t0, 4),
+            "est_time_saved_sec": round(result["est_time_saved_sec"], 4),
+        }
+        return result["labels"], result["centroids"], info
+    if engine != "tslearn":
+        raise ValueError(f"알 수 없는 DTW engine: {engine}")
+
+    from tslearn.clustering import TimeSeriesKMeans
+
     km = TimeSeriesKMeans(
         n_clusters=K,
         metric="dtw",
-        metric_params={"sakoe_chiba_radius": 2},
-        max_iter=5,
+        metric_params={"sakoe_chiba_radius": DTW_RADIUS},
+        max_iter=KMEANS_MAX_ITER,
         n_init=1,
+        init=init_centroids if init_centroids is not None else "k-means++",
         random_state=RANDOM_SEED,
-        n_jobs=-1,
+        n_jobs=DTW_N_JOBS,
         verbose=False,
     )
     labels = km.fit_predict(all_windows)
     centroids = km.cluster_centers_
+    info = {
+        "engine": engine,
+        "init": "warm" if init_centroids is not None else "cold",
+        "n_iter": int(getattr(km, "n_iter_", KMEANS_MAX_ITER)),
+        "converged": None,
+        "inertia": float(km.inertia_),
+        "elapsed_sec": round(time.perf_counter() - t0, 4),
+        "est_time_saved_sec": None,
+    }
+    return labels, centroids, info
+
+
+def dtw_cluster(
+    all_windows: np.ndarray,
+    K: int = K_CLUSTERS,
+    engine: str | None = None,
+    init_centroids: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    labels, centroids, _ = dtw_cluster_with_info(all_windows, K, engine, init_centroids)
     return labels, centroids
 
 
 def compute_markov_transition(labels: np.ndarray, K: int, step: int = 1) -> np.ndarray:
-    P = np.zeros((K, K), dtype=float)
-    N = len(labels)
-    for i in range(N - step):
-        s = labels[i]
-        t = labels[i + step]
-        P[s, t] += 1.0
-
-    for i in range(K):
-        total = P[i].sum()
-        if total > 0:
-            P[i] /= total
-        else:
-            P[i, i] = 1.0
-    return P
+    """
+    labels 시퀀스의 step 전이 확률 (K, K). 관측 없는 행은 자기 자신으로 1.
+    (여러 step / 여러 유저는 markov_stats.transition_matrices 로 한 번에)
+    """
+    return transition_matrices(labels, K, (step,))[0]
 
 
 def compute_endpoint_means(windows: np.ndarray, labels: np.ndarray, K: int) -> np.ndarray:
@@ -245,84 +397,180 @@ def compute_endpoint_means(windows: np.ndarray, labels: np.ndarray, K: int) -> n
     - 마지막 3타임스텝(L-3, L-2, L-1)의 평균을 사용 (tail=3)
       → '마지막 30분' 정도의 평균 상태를 대표로 본다 (10분 간격 기준).
     """
-    N, L, D = windows.shape
-    endpoint_means = np.zeros((K, D), dtype=float)
-    counts = np.zeros(K, dtype=int)
-
-    TAIL = 3  # 마지막 3포인트(= 30분) 평균
-
-    for i in range(N):
-        c = labels[i]
-        tail_vec = windows[i, L - TAIL:L, :].mean(axis=0)  # shape (D,)
-        endpoint_means[c] += tail_vec
-        counts[c] += 1
-
-    for k in range(K):
-        if counts[k] > 0:
-            endpoint_means[k] /= counts[k]
-
-    return endpoint_means
+    return endpoint_means_batch(windows, labels, K, tail=ENDPOINT_TAIL)
 
 
 # ============================================================
 # 5. raw DataFrame → yesterday_model_meta.json
 # ============================================================
 
+def _write_json_atomic(path: Path, obj: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
 def build_yesterday_model_from_raw(
     raw_df: pd.DataFrame,
     save_prefix: str,
+    rolling_state_file: Path | None = None,
+    model_date: str | None = None,
+    init_centroids: np.ndarray | None = None,
 ) -> Dict[str, Any]:
-    clean_df = clean_raw_df_step2lite(raw_df)
-    clean_path = CLEAN_DIR / f"{save_prefix}_clean.csv"
-    clean_df.to_csv(clean_path, index=False, encoding="utf-8-sig")
-
-    df_feat = compute_feature_df(clean_df)
-    feat_path = FEAT_DIR / f"{save_prefix}_features.csv"
-    df_feat.to_csv(feat_path, encoding="utf-8-sig")
-
-    arr = df_feat.values.astype(float)
-
-    windows, end_idx = make_sliding_windows(arr, L=WINDOW_LENGTH)
-    if windows.shape[0] == 0:
-        raise ValueError("윈도우 수가 0입니다. T < L 인지 확인 필요.")
-
-    win_path = WIN_DIR / f"{save_prefix}_windows_L{WINDOW_LENGTH}.npy"
-    np.save(win_path, windows)
-
-    end_timestamps = [df_feat.index[i] for i in end_idx]
-    df_win_meta = pd.DataFrame({
-        "window_id": list(range(len(end_idx))),
-        "end_index": end_idx,
-        "end_timestamp": end_timestamps,
-    })
-    win_meta_path = WIN_DIR / f"{save_prefix}_windows_meta_L{WINDOW_LENGTH}.csv"
-    df_win_meta.to_csv(win_meta_path, index=False, encoding="utf-8-sig")
+    """
+    raw DataFrame → 144 슬롯 그리드 블록으로 옮긴 뒤 build_yesterday_model_from_block.
+    model_date(YYYY-MM-DD) 가 없으면 첫 timestamp 의 날짜.
+    """
+    date = datetime.strptime(model_date, "%Y-%m-%d") if model_date else None
+    day_raw = frame_to_slot_block(raw_df, date)
+    if model_date is None:
+        model_date = str(pd.Timestamp(raw_df["timestamp"].min()).date())
+    return build_yesterday_model_from_block(
+        day_raw,
+        model_date,
+        save_prefix,
+        rolling_state_file=rolling_state_file,
+        init_centroids=init_centroids,
+    )
 
-    labels, centroids = dtw_cluster(windows, K=K_CLUSTERS)
 
-    df_clusters = pd.DataFrame({
-        "window_id": list(range(len(labels))),
+def _block_frame(values: np.ndarray, timestamps: np.ndarray, columns: List[str]) -> pd.DataFrame:
+    """디버그 CSV 용 (슬롯 timestamp + 값) DataFrame."""
+    df = pd.DataFrame(values, columns=columns)
+    df.insert(0, "timestamp", pd.to_datetime(timestamps))
+    return df
 
-        "end_timestamp": end_timestamps,
-        "cluster": labels,
-    })
-    cluster_path = CLUSTER_DIR / f"{save_prefix}_cluster_labels.csv"
-    df_clusters.to_csv(cluster_path, index=False, encoding="utf-8-sig")
 
-    cent_path = MODEL_DIR / f"{save_prefix}_centroids_K{K_CLUSTERS}_L{WINDOW_LENGTH}.npy"
-    np.save(cent_path, centroids)
+def build_yesterday_model_from_block(
+    day_raw: np.ndarray,
+    model_date: str,
+    save_prefix: str,
+    rolling_state_file: Path | None = None,
+    init_centroids: np.ndarray | None = None,
+    day_clean: np.ndarray | None = None,
+) -> Dict[str, Any]:
+    """
+    (144, len(RAW_COLS)) raw 블록(빈 슬롯 NaN) → 모델 번들({prefix}_yesterday_model.bundle) + meta json 저장.
+    MODEL_DEBUG_LEVEL >= 1 이면 중간 산출물 CSV / 배열별 npy 도 같이 저장.
+
+    model_date: YYYY-MM-DD (슬롯 timestamp / rolling 상태 날짜)
+    day_clean: 배치 빌드에서 여러 유저를 한 번에 클린한 결과. 없으면 여기서 클린.
+    rolling_state_file 을 주면 하루치를 따로 클러스터링하지 않고 rolling 상태에 접어 넣은 뒤,
+    model_date 까지의 누적 상태로부터 모델(centroids / endpoint_means / P1 / P3)을 만든다.
+      - 같은 유저 상태 갱신(load → fold → save)은 rolling_state_lock 으로 직렬화
+      - 이미 반영된 날짜 재빌드 / 지난 날짜 backfill 은 그날 값만 교체·삽입 (rolling_model.fold_day)
+    init_centroids: 하루 모델 클러스터링 warm start 용 이전 중심.
+    """
+    if rolling_state_file is None:
+        return _build_model_from_block(day_raw, model_date, save_prefix, None, init_centroids, day_clean)
+    with rolling_state_lock(rolling_state_file):
+        return _build_model_from_block(
+            day_raw, model_date, save_prefix, rolling_state_file, init_centroids, day_clean)
 
-    P1 = compute_markov_transition(labels, K_CLUSTERS, step=1)
-    P3 = compute_markov_transition(labels, K_CLUSTERS, step=3)
 
-    P1_path = MODEL_DIR / f"{save_prefix}_P1_step1.npy"
-    P3_path = MODEL_DIR / f"{save_prefix}_P3_step3.npy"
-    np.save(P1_path, P1)
-    np.save(P3_path, P3)
+def _build_model_from_block(
+    day_raw: np.ndarray,
+    model_date: str,
+    save_prefix: str,
+    rolling_state_file: Path | None,
+    init_centroids: np.ndarray | None,
+    day_clean: np.ndarray | None,
+) -> Dict[str, Any]:
+    debug = MODEL_DEBUG_LEVEL >= 1
+    timestamps = slot_timestamps(datetime.strptime(model_date, "%Y-%m-%d"))
+
+    if day_clean is None:
+        with BUILD_STAGES.span("clean"):
+            day_clean = clean_slot_block(day_raw)
+    clean_path = None
+    if debug:
+        with BUILD_STAGES.span("debug_io"):
+            clean_path = CLEAN_DIR / f"{save_prefix}_clean.csv"
+            _block_frame(day_clean, timestamps, RAW_COLS).to_csv(
+                clean_path, index=False, encoding="utf-8-sig")
+
+    with BUILD_STAGES.span("features"):
+        arr = compute_feature_matrix(day_clean)
+    feat_path = None
+    if debug:
+        with BUILD_STAGES.span("debug_io"):
+            feat_path = FEAT_DIR / f"{save_prefix}_features.csv"
+            _block_frame(arr, timestamps, FEATURE_COLS).to_csv(
+                feat_path, index=False, encoding="utf-8-sig")
+
+    with BUILD_STAGES.span("windowing"):
+        windows, end_idx = make_sliding_windows(arr, L=WINDOW_LENGTH)
+    if windows.shape[0] == 0:
+        raise ValueError("윈도우 수가 0입니다. T < L 인지 확인 필요.")
 
-    endpoint_means = compute_endpoint_means(windows, labels, K_CLUSTERS)
-    ep_path = MODEL_DIR / f"{save_prefix}_endpoint_means_K{K_CLUSTERS}.npy"
-    np.save(ep_path, endpoint_means)
+    # 윈도우는 features 에서 언제든 다시 만들 수 있으므로 기본은 저장하지 않음
+    win_path = None
+    if SAVE_WINDOWS_NPY:
+        with BUILD_STAGES.span("debug_io"):
+            win_path = WIN_DIR / f"{save_prefix}_windows_L{WINDOW_LENGTH}.npy"
+            np.save(win_path, windows)
+
+    end_timestamps = pd.to_datetime(timestamps[end_idx])
+    win_meta_path = None
+    if debug:
+        with BUILD_STAGES.span("debug_io"):
+            df_win_meta = pd.DataFrame({
+                "window_id": list(range(len(end_idx))),
+                "end_index": end_idx,
+                "end_timestamp": end_timestamps,
+            })
+            win_meta_path = WIN_DIR / f"{save_prefix}_windows_meta_L{WINDOW_LENGTH}.csv"
+            df_win_meta.to_csv(win_meta_path, index=False, encoding="utf-8-sig")
+
+    rolling_state = None
+    clustering_info: Dict[str, Any] | None = None
+    if rolling_state_file is not None:
+        # rolling 모드는 할당 + 횟수 누적이 한 번에 일어나므로 clustering 에 포함
+        with BUILD_STAGES.span("clustering"):
+            rolling_state, labels = fold_day(
+                load_rolling_state(rolling_state_file),
+                windows,
+                model_date,
+                K=K_CLUSTERS,
+                decay=ROLLING_DECAY,
+                cluster_fn=lambda w, k: dtw_cluster(w, K=k),
+            )
+        with BUILD_STAGES.span("markov"):
+            model_arrays = state_to_model_arrays(rolling_state, as_of=model_date)
+            centroids = model_arrays["centroids"]
+            endpoint_means = model_arrays["endpoint_means"]
+            P1 = model_arrays["P1"]
+            P3 = model_arrays["P3"]
+            P1_powers = transition_powers(P1, INFERENCE_HORIZON_STEPS)
+    else:
+        with BUILD_STAGES.span("clustering"):
+            labels, centroids, clustering_info = dtw_cluster_with_info(
+                windows, K=K_CLUSTERS, init_centroids=init_centroids,
+            )
+        print(f"[CLUSTER] init={clustering_info['init']} n_iter={clustering_info['n_iter']} "
+              f"elapsed={clustering_info['elapsed_sec']}s "
+              f"saved~{clustering_info['est_time_saved_sec']}s")
+
+        with BUILD_STAGES.span("markov"):
+            # step 1 / 3 전이를 한 번에
+            P1, P3 = transition_matrices(labels, K_CLUSTERS, MARKOV_STEPS)
+
+            endpoint_means = compute_endpoint_means(windows, labels, K_CLUSTERS)
+
+            # 추론 서버가 쓰는 horizon 의 P1^h
+            P1_powers = transition_powers(P1, INFERENCE_HORIZON_STEPS)
+
+    cluster_path = None
+    if debug:
+        with BUILD_STAGES.span("debug_io"):
+            df_clusters = pd.DataFrame({
+                "window_id": list(range(len(labels))),
+                "end_timestamp": end_timestamps,
+                "cluster": labels,
+            })
+            cluster_path = CLUSTER_DIR / f"{save_prefix}_cluster_labels.csv"
+            df_clusters.to_csv(cluster_path, index=False, encoding="utf-8-sig")
 
     cluster_summaries = []
     for k in range(K_CLUSTERS):
@@ -345,39 +593,95 @@ def build_yesterday_model_from_raw(
             "arousal": float(arousal),
         })
 
-    model_meta = {
+    runtime_model = {
         "freq_minutes": SLOT_MINUTES,
         "window_length": WINDOW_LENGTH,
         "K": K_CLUSTERS,
         "feature_cols": FEATURE_COLS,
-        "centroids_npy": str(cent_path),
-        "endpoint_means_npy": str(ep_path),
-        "P1_npy": str(P1_path),
-        "P3_npy": str(P3_path),
-        "windows_npy": str(win_path),
-        "windows_meta_csv": str(win_meta_path),
-        "cluster_labels_csv": str(cluster_path),
-        "features_csv": str(feat_path),
-        "clean_csv": str(clean_path),
-        "raw_note": "raw data 저장은 main에서 처리",
+        "centroids": centroids,
+        "endpoint_means": endpoint_means,
+        "P1": P1,
+        "P3": P3,
+        "P1_power_steps": list(INFERENCE_HORIZON_STEPS),
+        "P1_powers": P1_powers,
         "cluster_summaries": cluster_summaries,
+        # 추론 서버는 클러스터 인덱스로 문구만 꺼내 쓴다
+        "cluster_texts": render_cluster_texts(cluster_summaries),
+        "cluster_text_version": RENDER_VERSION,
     }
 
-    model_json_path = MODEL_DIR / f"{save_prefix}_yesterday_model_meta.json"
-    with model_json_path.open("w", encoding="utf-8") as f:
-        json.dump(model_meta, f, ensure_ascii=False, indent=2)
+    # 1) 모델 번들 (추론 서버는 이 파일 하나만 읽는다)
+    bundle_arrays = {
+        "centroids": centroids,
+        "endpoint_means": endpoint_means,
+        "P1": P1,
+        "P3": P3,
+        "P1_powers": P1_powers,
+    }
+    bundle_meta = {k: v for k, v in runtime_model.items() if k not in bundle_arrays}
+    bundle_meta["save_prefix"] = save_prefix
+    bundle_meta["clustering"] = clustering_info
+    if rolling_state is not None:
+        bundle_meta["rolling"] = {
+            "as_of": model_date,
+            "first_date": rolling_state["first_date"],
+            "last_date": rolling_state["last_date"],
+            "n_days": rolling_state["n_days"],
+            "decay": rolling_state["decay"],
+        }
 
-    runtime_model = {
+    # 2) 배열별 npy (디버그용)
+    cent_path = ep_path = P1_path = P3_path = None
+    if debug:
+        with BUILD_STAGES.span("debug_io"):
+            cent_path = MODEL_DIR / f"{save_prefix}_centroids_K{K_CLUSTERS}_L{WINDOW_LENGTH}.npy"
+            ep_path = MODEL_DIR / f"{save_prefix}_endpoint_means_K{K_CLUSTERS}.npy"
+            P1_path = MODEL_DIR / f"{save_prefix}_P1_step1.npy"
+            P3_path = MODEL_DIR / f"{save_prefix}_P3_step3.npy"
+            np.save(cent_path, centroids)
+            np.save(ep_path, endpoint_means)
+            np.save(P1_path, P1)
+            np.save(P3_path, P3)
+
+    def _opt(p: Path | None) -> str | None:
+        return str(p) if p is not None else None
+
+    bundle_file = bundle_path(MODEL_DIR, save_prefix)
+    model_meta = {
         "freq_minutes": SLOT_MINUTES,
         "window_length": WINDOW_LENGTH,
         "K": K_CLUSTERS,
         "feature_cols": FEATURE_COLS,
-        "centroids": centroids,
-        "endpoint_means": endpoint_means,
-        "P1": P1,
-        "P3": P3,
+        "bundle_path": str(bundle_file),
+        "bundle_format_version": BUNDLE_FORMAT_VERSION,
+        "centroids_npy": _opt(cent_path),
+        "endpoint_means_npy": _opt(ep_path),
+        "P1_npy": _opt(P1_path),
+        "P3_npy": _opt(P3_path),
+        "windows_npy": _opt(win_path),
+        "windows_meta_csv": _opt(win_meta_path),
+        "cluster_labels_csv": _opt(cluster_path),
+        "features_csv": _opt(feat_path),
+        "clean_csv": _opt(clean_path),
+        "rolling_state_path": _opt(rolling_state_file),
+        "clustering": clustering_info,
+        "raw_note": "raw data 저장은 main에서 처리 (MODEL_DEBUG_LEVEL >= 1)",
         "cluster_summaries": cluster_summaries,
+        "cluster_texts": runtime_model["cluster_texts"],
+        "cluster_text_version": RENDER_VERSION,
     }
+    model_json_path = MODEL_DIR / f"{save_prefix}_yesterday_model_meta.json"
+
+    # 3) 번들 → rolling 상태 → meta json 순서로 저장
+    with BUILD_STAGES.span("save"):
+        write_bundle(bundle_file, bundle_arrays, bundle_meta)
+
+        # 하루 모델을 다 쓴 뒤에 rolling 상태 갱신 (중간 실패 시 같은 날짜 재시도 가능)
+        if rolling_state is not None:
+            save_rolling_state(rolling_state_file, rolling_state)
+
+        _write_json_atomic(model_json_path, model_meta)
+
     return runtime_model
 
 
@@ -387,27 +691,14 @@ def build_yesterday_model_from_raw(
 
 def fetch_day_raw_from_rds(user_id: str, date: datetime) -> pd.DataFrame:
     """
-    RDS에서 하루(144개) raw 데이터를 가져오는 부분.
+    RDS에서 하루(144개) raw 데이터를 가져오는 부분. (유저 1명, 커넥션 풀 사용)
+    여러 유저를 한 번에 가져올 때는 rds_fetch.fetch_day_raw_many 를 쓴다.
     """
-
-    host = "mood-manager-db.cd4iisicagg0.ap-northeast-2.rds.amazonaws.com"
-    port = "5432"
-    db = "mymood"
-    user = "postgres"
-    pw = "moodmanagerrds"
-
     date_str = date.strftime("%Y-%m-%d")
     start_ts = f"{date_str} 00:00:00"
     end_ts = f"{date_str} 23:59:59"
 
-    conn = psycopg2.connect(
-        host=host,
-        port=port,
-        dbname=db,
-        user=user,
-        password=pw,
-    )
-    try:
+    with pooled_connection() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             query = """
                 SELECT timestamp,
@@ -435,30 +726,323 @@ def fetch_day_raw_from_rds(user_id: str, date: datetime) -> pd.DataFrame:
             df = pd.DataFrame(rows)
             df["timestamp"] = pd.to_datetime(df["timestamp"])  # df timestamp 변환
             return df
-    finally:
-        conn.close()
 
 # ============================================================
 # 7. 유저 1명 빌드
 # ============================================================
 
-def build_yesterday_model_for_user(user_id: str, date: datetime) -> None:
+def load_warm_start_centroids(user_id: str, date: datetime) -> np.ndarray | None:
+    """
+    date 이전 가장 최근 모델 번들의 centroids. 없거나 shape 이 다르면 None (cold init).
+    """
+    path = find_latest_bundle(MODEL_DIR, user_id, date, WARM_START_LOOKBACK_DAYS)
+    if path is None:
+        return None
+    try:
+        arrays, _ = read_bundle(path, use_mmap=False)
+    except (OSError, BundleFormatError) as e:
+        print(f"[WARN] warm start 모델을 읽지 못해 cold init 사용: {path} ({e})")
+        return None
+    centroids = np.array(arrays["centroids"], dtype=float)
+    if centroids.shape[0] != K_CLUSTERS or centroids.shape[1] != WINDOW_LENGTH:
+        return None
+    print(f"[CLUSTER] warm start from {path.name}")
+    return centroids
+
+
+def build_yesterday_model_for_user(
+    user_id: str,
+    date: datetime,
+    raw_df: pd.DataFrame | None = None,
+    day_raw: np.ndarray | None = None,
+    day_clean: np.ndarray | None = None,
+) -> str:
+    """
+    유저 1명의 어제 모델을 빌드하고 model meta json 경로를 반환.
+    raw_df 를 넘기면 RDS 조회를 건너뛴다.
+    day_raw / day_clean: 배치 빌드에서 일괄 조회 / 일괄 클린한 (144, len(RAW_COLS)) 블록
+    """
     date_str = date.strftime("%Y%m%d")
     prefix = f"{user_id}_{date_str}"
+    raw_path = RAW_DIR / f"{prefix}_raw.csv"
 
     print(f"\n===== [USER {user_id}] Build yesterday model for {date_str} =====")
 
-    raw_df = fetch_day_raw_from_rds(user_id, date)
+    if day_raw is None:
+        if raw_df is None:
+            with BUILD_STAGES.span("fetch"):
+                raw_df = fetch_day_raw_from_rds(user_id, date)
+        if MODEL_DEBUG_LEVEL >= 1:
+            with BUILD_STAGES.span("debug_io"):
+                raw_df.to_csv(raw_path, index=False, encoding="utf-8-sig")
+        day_raw = frame_to_slot_block(raw_df, date)
+    elif MODEL_DEBUG_LEVEL >= 1:
+        with BUILD_STAGES.span("debug_io"):
+            day_block_to_frame(day_raw, date).to_csv(raw_path, index=False, encoding="utf-8-sig")
+
+    n_rows = int((~np.isnan(day_raw).all(axis=1)).sum())
+    if n_rows != SLOTS_PER_DAY:
+        print(f"[WARN] expected {SLOTS_PER_DAY} rows, got {n_rows} rows (빈 슬롯은 보간)")
+
+    rolling_file = rolling_state_path(MODEL_DIR, user_id) if ROLLING_MODEL else None
+    init_centroids = None
+    if WARM_START and rolling_file is None:
+        init_centroids = load_warm_start_centroids(user_id, date)
+
+    yesterday_model = build_yesterday_model_from_block(
+        day_raw,
+        date.strftime("%Y-%m-%d"),
+        save_prefix=prefix,
+        rolling_state_file=rolling_file,
+        init_centroids=init_centroids,
+        day_clean=day_clean,
+    )
 
-    raw_path = RAW_DIR / f"{prefix}_raw.csv"
-    raw_df.to_csv(raw_path, index=False, encoding="utf-8-sig")
+    print(f"=== [USER {user_id}] Yesterday model built (K={yesterday_model['K']}) ===")
 
-    if raw_df.shape[0] != SLOTS_PER_DAY:
-        print(f"[WARN] expected {SLOTS_PER_DAY} rows, got {raw_df.shape[0]} rows")
+    return str(MODEL_DIR / f"{prefix}_yesterday_model_meta.json")
 
-    yesterday_model = build_yesterday_model_from_raw(raw_df, save_prefix=prefix)
 
-    print(f"=== [USER {user_id}] Yesterday model built (K={yesterday_model['K']}) ===")
+# ============================================================
+# 7-1. 여러 유저 배치 빌드 (프로세스 풀)
+# ============================================================
+
+def _init_batch_worker() -> None:
+    """
+    배치 워커 프로세스 초기화.
+    - tslearn n_jobs=1
+    - BLAS/OpenMP 스레드 1개 (프로세스 수만큼만 코어 사용)
+    """
+    global DTW_N_JOBS
+    DTW_N_JOBS = 1
+
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = "1"
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+
+def _build_one_user_safe(
+    user_id: str,
+    date: datetime,
+    day_raw: np.ndarray | None = None,
+    day_clean: np.ndarray | None = None,
+) -> Dict[str, Any]:
+    """
+    build_yesterday_model_for_user 를 감싸서 예외 대신 상태 dict 를 반환.
+    day_raw / day_clean: 일괄 조회 / 일괄 클린된 (144, raw_cols) 블록. 없으면 워커에서 직접 조회.
+    stage_sec: 단계별 소요 시간 (부모 프로세스에서 record_build_result 로 기록)
+    """
+    t0 = time.perf_counter()
+    with collect_stage_times() as stage_times:
+        try:
+            model_meta_path = build_yesterday_model_for_user(
+                user_id, date, day_raw=day_raw, day_clean=day_clean,
+            )
+            result = {
+                "user_id": user_id,
+                "status": "success",
+                "elapsed_sec": round(time.perf_counter() - t0, 3),
+                "model_meta_path": model_meta_path,
+            }
+        except Exception as e:
+            result = {
+                "user_id": user_id,
+                "status": "error",
+                "elapsed_sec": round(time.perf_counter() - t0, 3),
+                "error": type(e).__name__,
+                "message": str(e),
+            }
+    result["stage_sec"] = {k: round(v, 4) for k, v in stage_times.items()}
+    return result
+
+
+def record_build_result(result: Dict[str, Any]) -> None:
+    """
+    유저 1명 빌드 결과를 부모 프로세스 메트릭에 기록.
+    (워커 프로세스의 registry 는 /metrics 에 보이지 않으므로 stage_sec 을 옮겨 담는다)
+    """
+    BUILD_USERS_TOTAL.inc(status=result.get("status", "error"))
+    if result.get("elapsed_sec") is not None:
+        BUILD_USER_SECONDS.observe(result["elapsed_sec"])
+    BUILD_STAGES.observe_stage_times(result.get("stage_sec") or {})
+
+
+_build_job_queue: BuildJobQueue | None = None
+_build_job_queue_lock = threading.Lock()
+
+
+def get_build_job_queue() -> BuildJobQueue:
+    """
+    /build-yesterday, /build-yesterday/batch 용 잡 큐 (첫 요청 시 생성).
+    빌드는 배치 빌드와 같은 공용 프로세스 풀(get_build_pool)에서 실행.
+    """
+    global _build_job_queue
+    with _build_job_queue_lock:
+        if _build_job_queue is None:
+            _build_job_queue = BuildJobQueue(
+                build_fn=_build_one_user_safe,
+                max_concurrency=BUILD_MAX_CONCURRENCY,
+                max_pending=BUILD_MAX_PENDING,
+                on_result=record_build_result,
+                get_pool=get_build_pool,
+                on_pool_broken=_discard_build_pool,
+            )
+        return _build_job_queue
+
+
+def _update_job_gauges() -> None:
+    if _build_job_queue is None:
+        return
+    stats = _build_job_queue.stats()
+    for status in ("queued", "running", "succeeded", "failed"):
+        BUILD_JOBS.set(stats[status], status=status)
+
+
+METRICS.on_render(_update_job_gauges)
+
+
+def default_batch_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+_build_pool: ProcessPoolExecutor | None = None
+_build_pool_lock = threading.Lock()
+
+
+def get_build_pool() -> ProcessPoolExecutor:
+    """
+    빌드 워커 프로세스 풀 (프로세스당 1개, 처음 쓸 때 만들고 계속 재사용).
+    - 크기: CPU 코어 수, 워커는 _init_batch_worker 로 한 번만 초기화
+    - 배치 빌드 / 빌드 잡 큐가 같이 쓰고, 각자 동시에 넣는 작업 수로 부하를 제한
+    """
+    global _build_pool
+    with _build_pool_lock:
+        if _build_pool is None:
+            _build_pool = ProcessPoolExecutor(max_workers=default_batch_workers(),
+                                              initializer=_init_batch_worker)
+        return _build_pool
+
+
+def _discard_build_pool(pool: ProcessPoolExecutor) -> None:
+    """워커가 죽어 깨진 풀(BrokenProcessPool)은 버리고, 다음 get_build_pool 에서 새로 만든다."""
+    global _build_pool
+    with _build_pool_lock:
+        if _build_pool is pool:
+            _build_pool = None
+    pool.shutdown(wait=False)
+
+
+def fetch_day_block(user_ids: List[str], date: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    여러 유저의 하루치 raw 블록 (fetch_day_raw_block 과 같은 모양).
+    RAW_EXPORT_DIR 에 그 날짜 export 가 있으면 export 에서 읽고, export 파트에 없는 유저
+    (--users-file 로 일부만 export 한 경우 등)만 RDS 에서 조회해서 합친다.
+    """
+    if not (RAW_EXPORT_DIR and has_export_day(RAW_EXPORT_DIR, date)):
+        return fetch_day_raw_block(user_ids, date)
+    block, row_counts = read_export_block(RAW_EXPORT_DIR, user_ids, date)
+    exported = exported_user_ids(RAW_EXPORT_DIR, date)
+    missing = [i for i, uid in enumerate(user_ids) if uid not in exported]
+    if missing:
+        block[missing], row_counts[missing] = fetch_day_raw_block([user_ids[i] for i in missing], date)
+    return block, row_counts
+
+
+def build_yesterday_models_for_users(
+    user_ids: List[str],
+    date: datetime,
+    max_workers: int | None = None,
+    bulk_fetch: bool = True,
+    on_result: Callable[[Dict[str, Any]], None] | None = None,
+) -> Dict[str, Any]:
+    """
+    여러 유저의 어제 모델을 공용 프로세스 풀(get_build_pool)로 나눠서 빌드.
+    - max_workers: 동시에 풀에 넣는 유저 수 (없으면 CPU 코어 수, 풀 크기를 넘지 않음)
+    - bulk_fetch: True 면 부모 프로세스에서 전체 유저 raw 를 (U, 144, cols) 블록으로 일괄 조회,
+      clean_slot_block 으로 한 번에 클린한 뒤 워커에 유저별 행을 넘긴다
+      (유저별 커넥션/쿼리/DataFrame 없음). RAW_EXPORT_DIR 에 해당 날짜 export 가 있으면 그걸 읽음
+      (fetch_day_block: export 에 없는 유저만 RDS 에서)
+    - on_result: 유저 1명이 끝날 때마다 (완료 순서대로) 결과 dict 로 호출 (체크포인트 기록용)
+    - 결과: 유저별 status / elapsed_sec / model_meta_path(또는 error) + 전체 요약 (입력 순서)
+    """
+    # 중복 제거 (입력 순서 유지)
+    user_ids = list(dict.fromkeys(user_ids))
+    n_workers = max(1, min(max_workers or default_batch_workers(), default_batch_workers(),
+                           len(user_ids) or 1))
+
+    t0 = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    fetch_sec = None
+    if user_ids:
+        block = clean_block = row_counts = None
+        if bulk_fetch:
+            t_fetch = time.perf_counter()
+            with BUILD_STAGES.span("fetch"):
+                block, row_counts = fetch_day_block(user_ids, date)
+            fetch_sec = round(time.perf_counter() - t_fetch, 3)
+            with BUILD_STAGES.span("clean"):
+                clean_block = clean_slot_block(block)
+
+        pool = get_build_pool()
+        by_index: List[Dict[str, Any] | None] = [None] * len(user_ids)
+
+        def finish(i: int, result: Dict[str, Any]) -> None:
+            by_index[i] = result
+            record_build_result(result)
+            if on_result is not None:
+                on_result(result)
+
+        def tasks():
+            for i, uid in enumerate(user_ids):
+                if not bulk_fetch:
+                    yield i, (uid, date)
+                elif row_counts[i] == 0:
+                    finish(i, {
+                        "user_id": uid,
+                        "status": "error",
+                        "elapsed_sec": 0.0,
+                        "error": "no_data",
+                        "message": "해당 날짜의 DailyPreprocessedSlot 데이터가 없습니다.",
+                    })
+                else:
+                    yield i, (uid, date, block[i], clean_block[i])
+
+        # 풀에 동시에 넣는 작업은 n_workers 개까지 (끝나는 대로 다음 유저)
+        pending_tasks = tasks()
+        in_flight: Dict[Future, int] = {}
+        try:
+            while True:
+                for i, task_args in pending_tasks:
+                    in_flight[pool.submit(_build_one_user_safe, *task_args)] = i
+                    if len(in_flight) >= n_workers:
+                        break
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for f in done:
+                    finish(in_flight.pop(f), f.result())
+        except BrokenProcessPool:
+            _discard_build_pool(pool)
+            raise
+        results = [r for r in by_index if r is not None]
+    elapsed = time.perf_counter() - t0
+
+    n_success = sum(1 for r in results if r["status"] == "success")
+    return {
+        "target_date": date.strftime("%Y-%m-%d"),
+        "n_users": len(user_ids),
+        "n_success": n_success,
+        "n_error": len(results) - n_success,
+        "n_workers": n_workers,
+        "fetch_sec": fetch_sec,
+        "elapsed_sec": round(elapsed, 3),
+        "users_per_sec": round(len(results) / elapsed, 3) if elapsed > 0 else None,
+        "results": results,
+    }
 
 
 # ============================================================
@@ -479,8 +1063,11 @@ def build_yesterday():
       "user_id": "user_001",
       "date": "2025-11-30"   # (선택) 없으면 서버 기준 어제 날짜로 처리
     }
+
+    빌드 잡을 큐에 넣고 바로 202 + job_id 반환.
+    진행 상황은 GET /build-jobs/<job_id> 로 조회.
     """
-    now = datetime.datetime.now(datetime.UTC)
+    now = datetime.now(timezone.utc)
 
     # 1) JSON 파싱
     try:
@@ -519,32 +1106,184 @@ def build_yesterday():
         # date가 없으면 '오늘 기준 어제'
         target_date = now - timedelta(days=1)
 
-    # 3) 빌드 실행
+    # 3) 빌드 잡 등록 (빌드는 백그라운드 워커에서 실행)
     try:
-        build_yesterday_model_for_user(user_id, target_date)
+        job, created = get_build_job_queue().submit(user_id, target_date)
+    except QueueFullError as e:
+        err = {"error": "queue_full", "message": str(e)}
+        body = json.dumps(err, ensure_ascii=False)
+        return Response(body, status=429,
+                        mimetype="application/json; charset=utf-8")
+
+    result = {
+        "job_id": job["job_id"],
+        "user_id": user_id,
+        "target_date": job["target_date"],
+        "status": job["status"],
+        "deduplicated": not created,
+        "status_url": f"/build-jobs/{job['job_id']}",
+    }
+    body = json.dumps(result, ensure_ascii=False)
+    return Response(body, status=202,
+                    mimetype="application/json; charset=utf-8")
+
+
+@app.route("/build-jobs/<job_id>", methods=["GET"])
+def build_job_status(job_id: str):
+    """
+    GET http://localhost:5001/build-jobs/<job_id>
+    status: queued | running | succeeded | failed
+    완료 시 result 에 model_meta_path (또는 error) 포함.
+    """
+    job = get_build_job_queue().get(job_id)
+    if job is None:
+        return _json_response({"error": "job_not_found",
+                               "message": f"job_id {job_id} 를 찾을 수 없습니다."}, 404)
+    return _json_response(job, 200)
 
-        prefix = f"{user_id}_{target_date.strftime('%Y%m%d')}"
-        model_meta_path = str(MODEL_DIR / f"{prefix}_yesterday_model_meta.json")
 
-        result = {
-            "user_id": user_id,
-            "target_date": target_date.strftime("%Y-%m-%d"),
-            "status": "success",
-            "model_meta_path": model_meta_path,
+def _json_response(obj: Dict[str, Any], status: int) -> Response:
+    body = json.dumps(obj, ensure_ascii=False)
+    return Response(body, status=status,
+                    mimetype="application/json; charset=utf-8")
+
+
+@app.route("/build-yesterday/batch", methods=["POST"])
+def build_yesterday_batch():
+    """
+    POST http://localhost:5001/build-yesterday/batch
+    Body(JSON):
+    {
+      "user_ids": ["user_001", "user_002", ...],
+      "date": "2025-11-30"   # (선택) 없으면 서버 기준 어제 날짜
+    }
+
+    /build-yesterday 와 같은 잡 큐에 유저별 잡을 넣는다
+    (동시 실행 수 / 대기 잡 수 제한도 같이 적용, 자리가 모자라면 하나도 넣지 않고 429).
+    대량 nightly 빌드는 CLI / nightly_build.py 로.
+
+    응답 (예전처럼 빌드가 끝난 뒤 유저별 결과를 한 번에 주던 동기 API 가 아님):
+      - 기본: 바로 202 + 유저별 job (status 는 queued / running, result 는 null)
+      - ?wait=1: 모든 잡이 끝나거나 timeout 까지 기다린 뒤 응답
+          ?timeout=<초> (기본 / 최대 BUILD_BATCH_WAIT_MAX_SEC)
+          모두 끝났으면 200, 아직 진행 중인 잡이 있으면 202 (그 잡은 status_url 로 계속 조회)
+    {
+      "target_date", "n_jobs", "n_created", "done", "n_succeeded", "n_failed",
+      "jobs": [{"job_id", "user_id", "status", "deduplicated", "status_url",
+                "result": null | {"status", "elapsed_sec", "model_meta_path" 또는 "error" / "message",
+                                  "stage_sec"}}]
+    }
+    result 는 GET /build-jobs/<job_id> 의 result 와 같다.
+    """
+    now = datetime.now(timezone.utc)
+
+    try:
+        payload = request.get_json(force=True, silent=False)
+    except Exception:
+        return _json_response({"error": "invalid_json",
+                               "message": "유효한 JSON body가 필요합니다."}, 400)
+
+    if not isinstance(payload, dict):
+        return _json_response({"error": "invalid_payload",
+                               "message": "JSON body는 object 형태여야 합니다."}, 400)
+
+    user_ids = payload.get("user_ids")
+    if (not isinstance(user_ids, list) or not user_ids
+            or not all(isinstance(u, str) and u for u in user_ids)):
+        return _json_response({"error": "missing_user_ids",
+                               "message": "user_ids(문자열 리스트)가 body에 필요합니다."}, 400)
+
+    date_str = payload.get("date")
+    if date_str:
+        try:
+            target_date = datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            return _json_response({"error": "invalid_date",
+                                   "message": "date는 YYYY-MM-DD 형식이어야 합니다."}, 400)
+    else:
+        target_date = now - timedelta(days=1)
+
+    wait = request.args.get("wait", "0").lower() in ("1", "true", "yes")
+    timeout = BUILD_BATCH_WAIT_MAX_SEC
+    if request.args.get("timeout") is not None:
+        try:
+            timeout = min(max(0.0, float(request.args["timeout"])), BUILD_BATCH_WAIT_MAX_SEC)
+        except ValueError:
+            return _json_response({"error": "invalid_timeout",
+                                   "message": "timeout 은 초 단위 숫자여야 합니다."}, 400)
+
+    queue = get_build_job_queue()
+    try:
+        submitted = queue.submit_many(user_ids, target_date)
+    except QueueFullError as e:
+        return _json_response({"error": "queue_full", "message": str(e)}, 429)
+
+    snapshots = [job for job, _ in submitted]
+    if wait:
+        waited = queue.wait([job["job_id"] for job in snapshots], timeout)
+        # keep_finished 로 이미 지워진 잡은 상태를 알 수 없음
+        snapshots = [w if w is not None else dict(job, status="unknown")
+                     for job, w in zip(snapshots, waited)]
+
+    jobs = [
+        {
+            "job_id": job["job_id"],
+            "user_id": job["user_id"],
+            "status": job["status"],
+            "deduplicated": not created,
+            "status_url": f"/build-jobs/{job['job_id']}",
+            "result": job["result"],
         }
-        body = json.dumps(result, ensure_ascii=False)
-        return Response(body, status=200,
-                        mimetype="application/json; charset=utf-8")
+        for job, (_, created) in zip(snapshots, submitted)
+    ]
+    done = all(job["status"] not in ACTIVE_STATUSES for job in jobs)
+    return _json_response({
+        "target_date": target_date.strftime("%Y-%m-%d"),
+        "n_jobs": len(jobs),
+        "n_created": sum(1 for _, created in submitted if created),
+        "done": done,
+        "n_succeeded": sum(1 for job in jobs if job["status"] == JOB_SUCCEEDED),
+        "n_failed": sum(1 for job in jobs if job["status"] == JOB_FAILED),
+        "jobs": jobs,
+    }, 200 if done else 202)
 
-    except NotImplementedError as e:
-        err = {"error": "fetch_not_implemented", "message": str(e)}
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=500,
-                        mimetype="application/json; charset=utf-8")
 
-    except Exception as e:
-        err = {"error": "internal_error", "message": str(e)}
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=500,
-                        mimetype="application/json; charset=utf-8")
+# ============================================================
+# 9. CLI: 여러 유저 배치 빌드
+# ============================================================
+
+def main(argv: List[str] | None = None) -> int:
+    """
+    python build_yesterday_many.py --users user_001 user_002 --date 2025-11-30 --workers 8
+    python build_yesterday_many.py --users-file users.txt
+    """
+    parser = argparse.ArgumentParser(description="어제 모델 배치 빌드")
+    parser.add_argument("--users", nargs="*", default=[], help="빌드할 user_id 목록")
+    parser.add_argument("--users-file", type=Path, help="user_id 가 한 줄에 하나씩 있는 파일")
+    parser.add_argument("--date", help="YYYY-MM-DD (없으면 UTC 기준 어제)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--no-bulk-fetch", action="store_true",
+                        help="일괄 조회 대신 워커별로 유저 raw 를 조회")
+    args = parser.parse_args(argv)
+
+    user_ids = list(args.users)
+    if args.users_file:
+        with args.users_file.open("r", encoding="utf-8") as f:
+            user_ids += [line.strip() for line in f if line.strip()]
+    if not user_ids:
+        parser.error("--users 또는 --users-file 이 필요합니다.")
+
+    if args.date:
+        target_date = datetime.strptime(args.date, "%Y-%m-%d")
+    else:
+        target_date = datetime.now(timezone.utc) - timedelta(days=1)
+
+    summary = build_yesterday_models_for_users(
+        user_ids, target_date, args.workers, bulk_fetch=not args.no_bulk_fetch,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary["n_error"] == 0 else 1
+
 
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+# bulk_export.py
+# -*- coding: utf-8 -*-
+"""
+DailyPreprocessedSlot → 날짜별 파티션 NumPy 파일 일괄 export (backfill / 여러 날 재빌드용).
+
+- 조회: COPY (SELECT ...) TO STDOUT WITH (FORMAT csv) 스트림을 받아서
+  batch_bytes 단위로 잘라 바로 파싱 (Python row 객체 / RealDictCursor 없음)
+- 컬럼 타입: continuous float32 (결측 NaN), categorical int8 / count int16 (결측 -1)
+- 메모리: 유저 파트(users_per_part 명) × 열려 있는 날짜 그리드만 유지.
+  쿼리가 timestamp 순이라 날짜가 넘어가면 이전 날짜 그리드를 바로 파일로 내보낸다.
+- 파일 레이아웃 (np.load(mmap_mode="r") 로 읽음):
+    {export_dir}/{YYYYMMDD}/part-{p:05d}/
+        user_ids.json          파트 안 인덱스 → user_id
+        {col}.npy              (U_part, 144) 컬럼별 typed 배열
+        row_counts.npy         (U_part,) 유저별 row 수
+  파트 디렉토리는 임시 이름으로 다 쓴 뒤 rename (읽는 쪽은 완성된 파트만 봄).
+  export 범위의 모든 날짜 / 파트를 (데이터가 없어도) 쓰므로 "export 됨, 데이터 없음" 과
+  "export 안 됨" 을 구분할 수 있다.
+- conn 으로 sqlite3 커넥션을 넘기면 COPY 대신 SELECT 결과를 같은 CSV 스트림으로 흘려서 동작 (오프라인용)
+
+사용:
+    python bulk_export.py --start 2025-11-01 --end 2025-11-30 --out ./raw_export
+    python bulk_export.py --start 2025-11-01 --end 2025-11-30 --out ./raw_export --users-file users.txt
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from feature_engine import RAW_COLS
+from rds_fetch import SLOT_MINUTES, SLOTS_PER_DAY, placeholder, pooled_connection
+from slot_clean import CATEGORICAL_COLS, CONTINUOUS_COLS, COUNT_COLS
+
+
+USERS_PER_PART = 5000
+BATCH_BYTES = 8 << 20   # 파싱 단위 (8 MiB)
+MISSING_INT = -1
+
+COLUMN_DTYPES: Dict[str, np.dtype] = {
+    **{c: np.dtype(np.float32) for c in CONTINUOUS_COLS},
+    **{c: np.dtype(np.int8) for c in CATEGORICAL_COLS},
+    **{c: np.dtype(np.int16) for c in COUNT_COLS},
+}
+
+
+def day_dir(export_dir: Path, date: datetime) -> Path:
+    return Path(export_dir) / date.strftime("%Y%m%d")
+
+
+# ============================================================
+# 1. 날짜 그리드 (파트 1개 × 하루)
+# ============================================================
+
+class _DayGrid:
+    def __init__(self, n_users: int) -> None:
+        self.cols: Dict[str, np.ndarray] = {}
+        for c, dt in COLUMN_DTYPES.items():
+            fill = np.nan if dt.kind == "f" else MISSING_INT
+            self.cols[c] = np.full((n_users, SLOTS_PER_DAY), fill, dtype=dt)
+        self.row_counts = np.zeros(n_users, dtype=np.int32)
+
+    def put(self, uidx: np.ndarray, slots: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        for c, dt in COLUMN_DTYPES.items():
+            v = values[c]
+            if dt.kind == "f":
+                self.cols[c][uidx, slots] = v
+            else:
+                info = np.iinfo(dt)
+                iv = np.where(np.isnan(v), MISSING_INT, np.clip(np.rint(v), info.min, info.max))
+                self.cols[c][uidx, slots] = iv.astype(dt)
+        np.add.at(self.row_counts, uidx, 1)
+
+    def write(self, part_dir: Path, user_ids: Sequence[str]) -> None:
+        tmp = part_dir.with_name(f".{part_dir.name}.tmp")
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+        with (tmp / "user_ids.json").open("w", encoding="utf-8") as f:
+            json.dump(list(user_ids), f, ensure_ascii=False)
+        for c, a in self.cols.items():
+            np.save(tmp / f"{c}.npy", a)
+        np.save(tmp / "row_counts.npy", self.row_counts)
+        if part_dir.exists():
+            shutil.rmtree(part_dir)
+        os.replace(tmp, part_dir)
+
+
+# ============================================================
+# 2. COPY 스트림 → 배치 파싱
+# ============================================================
+
+class _CopySink:
+    """
+    copy_expert 가 write() 하는 CSV 바이트를 받아서 batch_bytes 마다
+    완성된 줄까지만 잘라 파싱 → 날짜 그리드에 배치, 끝난 날짜는 파일로 내보냄.
+    (user_id 에 줄바꿈이 없다고 가정)
+    """
+
+    def __init__(
+        self,
+        user_ids: Sequence[str],
+        export_dir: Path,
+        part_name: str,
+        batch_bytes: int = BATCH_BYTES,
+    ) -> None:
+        self.user_ids = list(user_ids)
+        self.user_pos = {uid: i for i, uid in enumerate(self.user_ids)}
+        self.export_dir = Path(export_dir)
+        self.part_name = part_name
+        self.batch_bytes = batch_bytes
+        self._buf = bytearray()
+        self.grids: Dict[np.datetime64, _DayGrid] = {}
+        self.written_days: set = set()
+        self.n_rows = 0
+        self.n_bytes = 0
+
+    def write(self, data: Any) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._buf += data
+        self.n_bytes += len(data)
+        if len(self._buf) >= self.batch_bytes:
+            cut = self._buf.rfind(b"\n") + 1
+            if cut > 0:
+                chunk = bytes(self._buf[:cut])
+                del self._buf[:cut]
+                self._parse(chunk)
+        return len(data)
+
+    def _parse(self, chunk: bytes) -> None:
+        import pandas as pd
+
+        df = pd.read_csv(
+            io.BytesIO(chunk),
+            header=None,
+            names=["user_id", "timestamp", *RAW_COLS],
+            dtype={"user_id": str, "timestamp": str, **{c: np.float64 for c in RAW_COLS}},
+            keep_default_na=False,
+            na_values=[""],
+        )
+        if df.empty:
+            return
+        uidx = df["user_id"].map(self.user_pos)
+        ts = pd.to_datetime(df["timestamp"])
+        if getattr(ts.dt, "tz", None) is not None:
+            ts = ts.dt.tz_localize(None)
+        ts = ts.to_numpy().astype("datetime64[m]")
+        days = ts.astype("datetime64[D]")
+        slots = (ts - days).astype(np.int64) // SLOT_MINUTES
+
+        ok = uidx.notna().to_numpy() & (slots >= 0) & (slots < SLOTS_PER_DAY)
+        uidx = uidx.to_numpy()[ok].astype(np.int64)
+        days, slots = days[ok], slots[ok]
+        values = {c: df[c].to_numpy()[ok] for c in RAW_COLS}
+        self.n_rows += int(ok.sum())
+
+        for day in np.unique(days):
+            sel = days == day
+            grid = self.grids.get(day)
+            if grid is None:
+                grid = self.grids[day] = _DayGrid(len(self.user_ids))
+            grid.put(uidx[sel], slots[sel], {c: v[sel] for c, v in values.items()})
+
+        # timestamp 순 스트림: 이번 배치의 가장 이른 날짜 이전은 더 이상 row 가 오지 않음
+        self._flush_before(days.min() if len(days) else None)
+
+    def _flush_before(self, day: Optional[np.datetime64]) -> None:
+        for d in sorted(self.grids):
+            if day is not None and d >= day:
+                break
+            self._write_day(d, self.grids.pop(d))
+
+    def _write_day(self, day: np.datetime64, grid: _DayGrid) -> None:
+        date = datetime.strptime(str(day), "%Y-%m-%d")
+        grid.write(day_dir(self.export_dir, date) / self.part_name, self.user_ids)
+        self.written_days.add(day)
+
+    def close(self, days: Sequence[np.datetime64]) -> None:
+        """남은 바이트 파싱 + 열린 날짜 전부 내보내고, 데이터 없는 날짜도 빈 파트로 씀."""
+        if self._buf:
+            chunk = bytes(self._buf)
+            self._buf.clear()
+            self._parse(chunk)
+        self._flush_before(None)
+        for d in days:
+            if d not in self.written_days:
+                self._write_day(d, _DayGrid(len(self.user_ids)))
+
+
+def _stream_rows(
+    conn: Any,
+    user_ids: Sequence[str],
+    start_ts: str,
+    end_ts: str,
+    sink: _CopySink,
+) -> None:
+    ph = placeholder(conn)
+    in_list = ", ".join([ph] * len(user_ids))
+    select = f"""
+        SELECT user_id, timestamp, {", ".join(RAW_COLS)}
+        FROM DailyPreprocessedSlot
+        WHERE user_id IN ({in_list})
+          AND timestamp >= {ph} AND timestamp < {ph}
+        ORDER BY timestamp
+    """
+    params = (*user_ids, start_ts, end_ts)
+
+    cur = conn.cursor()
+    try:
+        if isinstance(conn, sqlite3.Connection):
+            # COPY 가 없으므로 같은 CSV 스트림을 만들어서 흘림
+            cur.execute(select, params)
+            while True:
+                rows = cur.fetchmany(10000)
+                if not rows:
+                    break
+                out = io.StringIO()
+                csv.writer(out, lineterminator="\n").writerows(
+                    ["" if v is None else v for v in r] for r in rows
+                )
+                sink.write(out.getvalue())
+        else:
+            copy_sql = cur.mogrify(f"COPY ({select}) TO STDOUT WITH (FORMAT csv)", params)
+            cur.copy_expert(copy_sql.decode("utf-8") if isinstance(copy_sql, bytes) else copy_sql, sink)
+    finally:
+        cur.close()
+
+
+# ============================================================
+# 3. export
+# ============================================================
+
+def fetch_user_ids_in_range(conn: Any, start_ts: str, end_ts: str) -> List[str]:
+    ph = placeholder(conn)
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT DISTINCT user_id FROM DailyPreprocessedSlot "
+            f"WHERE timestamp >= {ph} AND timestamp < {ph} ORDER BY user_id",
+            (start_ts, end_ts),
+        )
+        return [str(r[0]) for r in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def export_range(
+    start_date: datetime,
+    end_date: datetime,
+    export_dir: str | Path,
+    user_ids: Optional[Sequence[str]] = None,
+    conn: Any = None,
+    users_per_part: int = USERS_PER_PART,
+    batch_bytes: int = BATCH_BYTES,
+) -> Dict[str, Any]:
+    """
+    [start_date, end_date] (양 끝 포함) 날짜의 raw 를 export_dir 에 파티션 파일로 저장.
+    user_ids 가 없으면 범위 안에 데이터가 있는 유저 전체.
+    유저 파트마다 COPY 스트림 1번 (범위 전체를 한 번에 훑음).
+    """
+    export_dir = Path(export_dir)
+    start_ts = start_date.strftime("%Y-%m-%d 00:00:00")
+    end_ts = (end_date + timedelta(days=1)).strftime("%Y-%m-%d 00:00:00")
+    n_days = (end_date.date() - start_date.date()).days + 1
+    days = [np.datetime64((start_date + timedelta(days=i)).strftime("%Y-%m-%d"), "D")
+            for i in range(n_days)]
+
+    def run(c: Any) -> Dict[str, Any]:
+        uids = list(dict.fromkeys(user_ids)) if user_ids is not None else \
+            fetch_user_ids_in_range(c, start_ts, end_ts)
+        t0 = time.perf_counter()
+        n_rows = n_bytes = 0
+        n_parts = (len(uids) + users_per_part - 1) // users_per_part
+        for p in range(n_parts):
+            part_users = uids[p * users_per_part:(p + 1) * users_per_part]
+            sink = _CopySink(part_users, export_dir, f"part-{p:05d}", batch_bytes)
+            _stream_rows(c, part_users, start_ts, end_ts, sink)
+            sink.close(days)
+            n_rows += sink.n_rows
+            n_bytes += sink.n_bytes
+            print(f"[EXPORT] part {p + 1}/{n_parts}: {len(part_users)} users, "
+                  f"{sink.n_rows} rows", flush=True)
+        elapsed = time.perf_counter() - t0
+        return {
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+            "export_dir": str(export_dir),
+            "n_users": len(uids),
+            "n_parts": n_parts,
+            "n_days": n_days,
+            "n_rows": n_rows,
+            "stream_mb": round(n_bytes / 2 ** 20, 3),
+            "elapsed_sec": round(elapsed, 3),
+            "rows_per_sec": round(n_rows / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    export_dir.mkdir(parents=True, exist_ok=True)
+    if conn is not None:
+        return run(conn)
+    with pooled_connection() as c:
+        return run(c)
+
+
+# ============================================================
+# 4. reader
+# ============================================================
+
+def has_export_day(export_dir: str | Path, date: datetime) -> bool:
+    d = day_dir(Path(export_dir), date)
+    return d.is_dir() and any(d.glob("part-*"))
+
+
+def exported_user_ids(export_dir: str | Path, date: datetime) -> set:
+    """date 파트들의 user_ids.json 에 있는 유저 (export 됨 = 데이터가 없어도 포함)."""
+    users: set = set()
+    for part_dir in day_dir(Path(export_dir), date).glob("part-*"):
+        with (part_dir / "user_ids.json").open("r", encoding="utf-8") as f:
+            users.update(json.load(f))
+    return users
+
+
+def read_export_block(
+    export_dir: str | Path,
+    user_ids: Sequence[str],
+    date: datetime,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    fetch_day_raw_block 과 같은 모양으로 반환:
+      - block: (len(user_ids), 144, len(RAW_COLS)) float, 데이터 없는 슬롯은 NaN
+      - row_counts: (len(user_ids),)
+    파트 파일은 mmap 으로 열고, 요청한 유저 행만 복사한다.
+    """
+    user_ids = list(user_ids)
+    block = np.full((len(user_ids), SLOTS_PER_DAY, len(RAW_COLS)), np.nan, dtype=float)
+    row_counts = np.zeros(len(user_ids), dtype=np.int64)
+    want = {uid: i for i, uid in enumerate(user_ids)}
+
+    for part_dir in sorted(day_dir(Path(export_dir), date).glob("part-*")):
+        with (part_dir / "user_ids.json").open("r", encoding="utf-8") as f:
+            part_users = json.load(f)
+        src, dst = [], []
+        for j, uid in enumerate(part_users):
+            i = want.get(uid)
+            if i is not None:
+                src.append(j)
+                dst.append(i)
+        if not src:
+            continue
+        src_idx, dst_idx = np.asarray(src), np.asarray(dst)
+
+        row_counts[dst_idx] = np.load(part_dir / "row_counts.npy", mmap_mode="r")[src_idx]
+        for ci, c in enumerate(RAW_COLS):
+            col = np.load(part_dir / f"{c}.npy", mmap_mode="r")[src_idx].astype(float)
+            if COLUMN_DTYPES[c].kind != "f":
+                col[col == MISSING_INT] = np.nan
+            block[dst_idx, :, ci] = col
+    return block, row_counts
+
+
+# ============================================================
+# 5. CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="DailyPreprocessedSlot 날짜 범위 일괄 export")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD (포함)")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD (포함)")
+    parser.add_argument("--out", type=Path, required=True, help="export 디렉토리")
+    parser.add_argument("--users-file", type=Path, help="user_id 가 한 줄에 하나씩 있는 파일 (없으면 전체)")
+    parser.add_argument("--users-per-part", type=int, default=USERS_PER_PART)
+    parser.add_argument("--batch-mb", type=int, default=BATCH_BYTES >> 20, help="파싱 단위 (MiB)")
+    args = parser.parse_args(argv)
+
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    end = datetime.strptime(args.end, "%Y-%m-%d")
+    if end < start:
+        parser.error("--end 는 --start 이후여야 합니다.")
+
+    user_ids = None
+    if args.users_file:
+        with args.users_file.open("r", encoding="utf-8") as f:
+            user_ids = [line.strip() for line in f if line.strip()]
+
+    summary = export_range(
+        start, end, args.out, user_ids,
+        users_per_part=args.users_per_part, batch_bytes=args.batch_mb << 20,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# cluster_text.py
+# -*- coding: utf-8 -*-
+"""
+클러스터 요약(cluster_summaries[k]) → 자연어 (title, description).
+
+빌드 시 K개 클러스터 문구를 미리 만들어 모델 번들에 넣고,
+추론 서버는 클러스터 인덱스로 꺼내 쓴다.
+문구 규칙을 바꾸면 RENDER_VERSION 을 올린다
+→ 버전이 다른 번들은 추론 서버가 로드할 때 다시 렌더링한다.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+
+
+RENDER_VERSION = 1
+
+
+def _describe_level(x: float, low=0.33, high=0.66,
+                    words=("낮은", "보통인", "높은")) -> str:
+    if x < low:
+        return words[0]
+    elif x > high:
+        return words[2]
+    else:
+        return words[1]
+
+
+def _overall_mood_title(valence: float, arousal: float,
+                        stress: float, fatigue: float, vibrancy: float) -> str:
+    if valence > 0.7 and arousal > 0.55:
+        base = "활력이 느껴지는 긍정 상태"
+    elif valence > 0.7 and arousal <= 0.55:
+        base = "편안한 긍정 상태"
+    elif valence > 0.2:
+        base = "안정적인 중립~긍정 상태"
+    elif valence < -0.3 and arousal < 0.4:
+        base = "기운이 빠진 다운 상태"
+    elif valence < -0.3 and arousal >= 0.4:
+        base = "예민하거나 긴장된 상태"
+    else:
+        base = "복합적인 감정 상태"
+
+    stress_level = _describe_level(stress, words=("낮은", "보통인", "높은"))
+    fatigue_level = _describe_level(fatigue, words=("낮은", "보통인", "높은"))
+    vib_level = _describe_level(vibrancy, words=("낮은", "보통인", "높은"))
+
+    if "긍정" in base and fatigue_level == "낮은" and vib_level == "높은":
+        return "에너지가 좋은 상향 긍정 상태"
+    if "긍정" in base and fatigue_level == "보통인" and vib_level == "낮은":
+        return "기분은 괜찮지만 조금 지친 긍정 상태"
+    if "다운" in base and stress_level == "높은":
+        return "지치고 부담이 큰 다운 상태"
+    if "편안한 긍정" in base and fatigue_level != "높은":
+        return "잔잔하고 편안한 긍정 상태"
+
+    return base
+
+
+def explain_cluster(summary: dict) -> Tuple[str, str]:
+    """
+    cluster_summaries[k] 하나를 받아서
+    (title, description) 반환.
+    """
+    s = summary["mean_scores"]
+    Stress = float(s["StressScore"])
+    Calm = float(s["CalmScore"])
+    Fatigue = float(s["FatigueScore"])
+    Vibrancy = float(s["VibrancyScore"])
+    Weather = float(s["WeatherScore"])
+    val = float(summary["valence"])
+    aro = float(summary["arousal"])
+
+    title = _overall_mood_title(val, aro, Stress, Fatigue, Vibrancy)
+
+    parts: List[str] = []
+
+    if val > 0.7:
+        parts.append("전반적으로 기분이 꽤 좋은 편이에요.")
+    elif val > 0.2:
+        parts.append("전반적으로 무난하고 안정적인 감정 상태예요.")
+    elif val > -0.2:
+        parts.append("크게 좋지도 나쁘지도 않은 보통 감정 상태예요.")
+    else:
+        parts.append("조금은 기분이 가라앉아 있는 편이에요.")
+
+    if aro > 0.6:
+        parts.append("에너지가 올라와 있고, 뭔가를 해볼 수 있는 여유가 느껴져요.")
+    elif aro > 0.4:
+        parts.append("적당한 에너지가 있어서 일상적인 일을 하기에는 무리가 없어요.")
+    else:
+        parts.append("에너지가 다소 떨어져 있어서 무리한 활동보다는 휴식이 잘 어울리는 상태예요.")
+
+    if Stress > 0.6:
+        parts.append("스트레스나 긴장은 비교적 높은 편이라, 스스로를 좀 더 보호해 줄 필요가 있어요.")
+    elif Stress < 0.4:
+        parts.append("스트레스 수준은 낮은 편이라 크게 압박을 느끼고 있지는 않아요.")
+
+    if Calm > 0.65:
+        parts.append("마음은 꽤 차분하고 안정적인 상태예요.")
+    elif Calm < 0.45:
+        parts.append("마음이 다소 산만하거나 불안정하게 느껴질 수 있어요.")
+
+    if Fatigue > 0.6:
+        parts.append("피로감이 많이 쌓여 있어서 충분한 휴식이 필요해 보여요.")
+    elif Fatigue > 0.35:
+        parts.append("어느 정도 피로가 느껴지지만, 완전히 지친 수준은 아니어요.")
+    else:
+        parts.append("피로감은 크지 않은 편이라 컨디션은 비교적 괜찮아요.")
+
+    if Vibrancy > 0.6:
+        parts.append("흥미나 즐거움이 잘 느껴지는 상태예요.")
+    elif Vibrancy < 0.3:
+        parts.append("흥미나 설렘은 다소 낮아서, 새로운 자극보다는 익숙한 것이 편할 수 있어요.")
+
+    if Weather > 0.7:
+        parts.append("외부 환경이나 날씨도 컨디션을 크게 방해하지는 않는 편이에요.")
+    elif Weather < 0.4:
+        parts.append("날씨나 환경이 컨디션에 조금 부정적인 영향을 줄 수 있어요.")
+
+    description = " ".join(parts)
+    return title, description
+
+
+def render_cluster_texts(cluster_summaries: Sequence[dict]) -> List[Dict[str, str]]:
+    """
+    cluster_summaries 전체 → [{"title", "description"}, ...] (클러스터 인덱스 순서)
+    """
+    texts = []
+    for summary in cluster_summaries:
+        title, description = explain_cluster(summary)
+        texts.append({"title": title, "description": description})
+    return texts
@@ -0,0 +1,328 @@
+# dtw_kmeans.py
+# -*- coding: utf-8 -*-
+"""
+고정 shape (L=24, D=5) 윈도우 전용 banded DTW k-means.
+
+tslearn TimeSeriesKMeans(metric="dtw", sakoe_chiba_radius=2) 대체용.
+- DTW: Sakoe-Chiba band(|i-j| <= radius) 안에서만 DP, 여러 (윈도우, 중심) 쌍을 NumPy 로 한 번에 계산
+- 할당: LB_Keogh 하한으로 후보를 거른 뒤 남은 쌍만 DTW 계산
+- 갱신: DBA(DTW Barycenter Averaging) 를 dba_iter 회만 수행
+- 거리 정의는 tslearn 과 같음: sqrt(정렬 경로 위 제곱 유클리드 거리 합)
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+import time
+
+import numpy as np
+
+
+DTW_RADIUS = 2
+PAIR_CHUNK = 8192  # DP 행렬을 한 번에 잡는 (윈도우, 중심) 쌍 수
+
+
+# ============================================================
+# 1. banded DTW
+# ============================================================
+
+def _dtw_dp(
+    X: np.ndarray,
+    C: np.ndarray,
+    x_idx: np.ndarray,
+    c_idx: np.ndarray,
+    radius: int,
+) -> np.ndarray:
+    """
+    (X[x_idx[p]], C[c_idx[p]]) 쌍들의 누적 비용 행렬 (P, L+1, L+1), band 밖은 inf.
+    쌍 배열 (P, L, D) 을 만들지 않고 시점별로 (P, D) 만 꺼내 쓴다.
+    """
+    P, L = x_idx.shape[0], X.shape[1]
+    acc = np.full((P, L + 1, L + 1), np.inf, dtype=float)
+    acc[:, 0, 0] = 0.0
+    for i in range(1, L + 1):
+        x_i = X[x_idx, i - 1, :]
+        for j in range(max(1, i - radius), min(L, i + radius) + 1):
+            cost = ((x_i - C[c_idx, j - 1, :]) ** 2).sum(axis=1)
+            prev = np.minimum(
+                np.minimum(acc[:, i - 1, j], acc[:, i, j - 1]),
+                acc[:, i - 1, j - 1],
+            )
+            acc[:, i, j] = cost + prev
+    return acc
+
+
+def dtw_sq_pairs(
+    X: np.ndarray,
+    C: np.ndarray,
+    x_idx: np.ndarray,
+    c_idx: np.ndarray,
+    radius: int = DTW_RADIUS,
+) -> np.ndarray:
+    """
+    X[x_idx[p]] 와 C[c_idx[p]] 사이의 제곱 DTW 거리, output: (P,)
+    """
+    P = x_idx.shape[0]
+    out = np.empty(P, dtype=float)
+    for s in range(0, P, PAIR_CHUNK):
+        acc = _dtw_dp(X, C, x_idx[s:s + PAIR_CHUNK], c_idx[s:s + PAIR_CHUNK], radius)
+        out[s:s + PAIR_CHUNK] = acc[:, -1, -1]
+    return out
+
+
+def dtw_sq_matrix(X: np.ndarray, C: np.ndarray, radius: int = DTW_RADIUS) -> np.ndarray:
+    """
+    모든 (윈도우, 중심) 조합의 제곱 DTW 거리, output: (N, K)
+    """
+    N, K = X.shape[0], C.shape[0]
+    n_idx = np.repeat(np.arange(N), K)
+    k_idx = np.tile(np.arange(K), N)
+    return dtw_sq_pairs(X, C, n_idx, k_idx, radius).reshape(N, K)
+
+
+# ============================================================
+# 2. LB_Keogh 하한 + 가지치기 할당
+# ============================================================
+
+def keogh_envelope(C: np.ndarray, radius: int = DTW_RADIUS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    C: (K, L, D) → (upper, lower) 각각 (K, L, D)
+    """
+    L = C.shape[1]
+    pad_hi = np.pad(C, ((0, 0), (radius, radius), (0, 0)), mode="constant", constant_values=-np.inf)
+    pad_lo = np.pad(C, ((0, 0), (radius, radius), (0, 0)), mode="constant", constant_values=np.inf)
+    view_hi = np.lib.stride_tricks.sliding_window_view(pad_hi, 2 * radius + 1, axis=1)[:, :L]
+    view_lo = np.lib.stride_tricks.sliding_window_view(pad_lo, 2 * radius + 1, axis=1)[:, :L]
+    return view_hi.max(axis=-1), view_lo.min(axis=-1)
+
+
+def lb_keogh_sq(X: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """
+    제곱 DTW 거리의 하한, output: (N, K)
+    (각 시점의 비용이 band 내 어떤 정렬보다도 크지 않으므로 DTW^2 >= LB^2)
+    시점별로 (N, K, D) 만 만들어서 윈도우 배열 크기의 임시 배열을 피한다.
+    """
+    N, L = X.shape[0], X.shape[1]
+    lb = np.zeros((N, upper.shape[0]), dtype=float)
+    for t in range(L):
+        x_t = X[:, t, None, :]
+        above = np.maximum(x_t - upper[None, :, t, :], 0.0)
+        below = np.maximum(lower[None, :, t, :] - x_t, 0.0)
+        lb += (above ** 2 + below ** 2).sum(axis=2)
+    return lb
+
+
+def assign_pruned(
+    X: np.ndarray,
+    C: np.ndarray,
+    radius: int = DTW_RADIUS,
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    각 윈도우를 가장 가까운 중심에 할당.
+    output: (labels (N,), 제곱 DTW 거리 (N,), 가지치기된 쌍 비율)
+    """
+    N, K = X.shape[0], C.shape[0]
+    upper, lower = keogh_envelope(C, radius)
+    lb = lb_keogh_sq(X, upper, lower)
+
+    rows = np.arange(N)
+    first = lb.argmin(axis=1)
+    full = np.full((N, K), np.inf, dtype=float)
+    full[rows, first] = dtw_sq_pairs(X, C, rows, first, radius)
+
+    # 하한이 현재 최선보다 작은 쌍만 실제 DTW 계산
+    cand = lb < full[rows, first][:, None]
+    cand[rows, first] = False
+    n_idx, k_idx = np.nonzero(cand)
+    if n_idx.size:
+        full[n_idx, k_idx] = dtw_sq_pairs(X, C, n_idx, k_idx, radius)
+
+    labels = full.argmin(axis=1)
+    pruned = 1.0 - (N + n_idx.size) / float(N * K)
+    return labels, full[rows, labels], pruned
+
+
+# ============================================================
+# 3. DBA 중심 갱신
+# ============================================================
+
+def dba_update(
+    X: np.ndarray,
+    labels: np.ndarray,
+    C: np.ndarray,
+    radius: int = DTW_RADIUS,
+    n_iter: int = 2,
+) -> np.ndarray:
+    """
+    모든 클러스터의 중심을 DBA 로 n_iter 회 갱신.
+    각 윈도우의 DTW 경로를 한꺼번에 역추적해서 중심 시점별 정렬 값의 평균을 낸다.
+    빈 클러스터의 중심은 그대로 둔다.
+    """
+    K, L, D = C.shape
+    C = C.copy()
+    N = X.shape[0]
+    rows = np.arange(N)
+
+    for _ in range(n_iter):
+        sums = np.zeros((K * L, D), dtype=float)
+        counts = np.zeros(K * L, dtype=float)
+
+        for s in range(0, N, PAIR_CHUNK):
+            xs = rows[s:s + PAIR_CHUNK]
+            ls = labels[s:s + PAIR_CHUNK]
+            acc = _dtw_dp(X, C, xs, ls, radius)
+            P = xs.shape[0]
+            r = np.arange(P)
+
+            i = np.full(P, L)
+            j = np.full(P, L)
+            active = np.ones(P, dtype=bool)
+            while active.any():
+                a = r[active]
+                flat = ls[a] * L + (j[a] - 1)
+                np.add.at(sums, flat, X[xs[a], i[a] - 1])
+                np.add.at(counts, flat, 1.0)
+
+                done = (i[a] == 1) & (j[a] == 1)
+                active[a[done]] = False
+                a = a[~done]
+                if a.size == 0:
+                    break
+
+                ia, ja = i[a], j[a]
+                steps = np.stack([
+                    acc[a, ia - 1, ja - 1],   # 대각
+                    acc[a, ia - 1, ja],       # 위
+                    acc[a, ia, ja - 1],       # 왼쪽
+                ], axis=1)
+                move = steps.argmin(axis=1)
+                i[a] = ia - (move != 2)
+                j[a] = ja - (move != 1)
+
+        filled = counts > 0
+        new_flat = C.reshape(K * L, D).copy()
+        new_flat[filled] = sums[filled] / counts[filled, None]
+        C = new_flat.reshape(K, L, D)
+
+    return C
+
+
+# ============================================================
+# 4. k-means (k-means++ 초기화 + Lloyd 반복)
+# ============================================================
+
+def _kmeans_pp_init(X: np.ndarray, K: int, radius: int, rng: np.random.Generator) -> np.ndarray:
+    N = X.shape[0]
+    rows = np.arange(N)
+    chosen = [int(rng.integers(N))]
+    min_d = dtw_sq_pairs(X, X, rows, np.full(N, chosen[0]), radius)
+    for _ in range(1, K):
+        total = min_d.sum()
+        if total <= 0:
+            nxt = int(rng.integers(N))
+        else:
+            nxt = int(rng.choice(N, p=min_d / total))
+        chosen.append(nxt)
+        d = dtw_sq_pairs(X, X, rows, np.full(N, nxt), radius)
+        min_d = np.minimum(min_d, d)
+    return X[chosen].astype(float, copy=True)
+
+
+def _fix_empty_clusters(
+    X: np.ndarray, labels: np.ndarray, dist: np.ndarray, C: np.ndarray,
+) -> bool:
+    """
+    빈 클러스터가 있으면 현재 가장 먼 윈도우로 중심을 옮긴다 (in-place).
+    output: 수정 여부
+    """
+    K = C.shape[0]
+    counts = np.bincount(labels, minlength=K)
+    empty = np.flatnonzero(counts == 0)
+    if empty.size == 0:
+        return False
+    far = np.argsort(dist)[::-1]
+    for k, n in zip(empty, far):
+        C[k] = X[n]
+        labels[n] = k
+        dist[n] = 0.0
+    return True
+
+
+def banded_dtw_kmeans(
+    X: np.ndarray,
+    K: int,
+    radius: int = DTW_RADIUS,
+    max_iter: int = 5,
+    dba_iter: int = 2,
+    random_state: int = 42,
+    init_centroids: Optional[np.ndarray] = None,
+    label_tol: float = 0.0,
+    inertia_tol: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    X: (N, L, D) 윈도우. make_sliding_windows 의 strided view 를 그대로 받아도
+       복사하지 않는다 (DP 는 시점별 (P, D) 슬라이스만 꺼낸다).
+    init_centroids: (K, L, D) 가 주어지면 k-means++ 대신 이 중심에서 시작 (warm start)
+    조기 종료:
+      - label_tol: 직전 반복 대비 라벨이 바뀐 비율이 이 값 이하이면 종료
+      - inertia_tol: (직전 inertia - 현재 inertia) <= inertia_tol * 직전 inertia 이면 종료
+    output dict:
+      - labels (N,), centroids (K, L, D)
+      - inertia: 제곱 DTW 거리 평균 (tslearn inertia_ 와 같은 정의)
+      - n_iter: 실제 Lloyd 반복 수, converged: max_iter 전에 종료했는지
+      - init: "warm" | "cold"
+      - est_time_saved_sec: 조기 종료로 건너뛴 반복 수 × 평균 반복 시간
+      - pruned_ratio: 마지막 할당에서 LB_Keogh 로 건너뛴 쌍 비율
+    """
+    X = np.asarray(X, dtype=float)
+    N, L, D = X.shape
+    if N < K:
+        raise ValueError(f"윈도우 수({N})가 클러스터 수({K})보다 적습니다.")
+
+    if init_centroids is not None:
+        C = np.array(init_centroids, dtype=float)
+        if C.shape != (K, L, D):
+            raise ValueError(f"init_centroids shape {C.shape} != {(K, L, D)}")
+        init = "warm"
+    else:
+        rng = np.random.default_rng(random_state)
+        C = _kmeans_pp_init(X, K, radius, rng)
+        init = "cold"
+
+    prev_labels = None
+    prev_inertia = None
+    n_iter = 0
+    converged = False
+    t0 = time.perf_counter()
+    for it in range(max_iter):
+        labels, dist, _ = assign_pruned(X, C, radius)
+        _fix_empty_clusters(X, labels, dist, C)
+        inertia = float(dist.mean())
+        if prev_labels is not None and np.mean(labels != prev_labels) <= label_tol:
+            converged = True
+            break
+        if (prev_inertia is not None and inertia_tol is not None
+                and prev_inertia - inertia <= inertia_tol * prev_inertia):
+            converged = True
+            break
+        C = dba_update(X, labels, C, radius, n_iter=dba_iter)
+        prev_labels = labels
+        prev_inertia = inertia
+        n_iter = it + 1
+    loop_sec = time.perf_counter() - t0
+
+    labels, dist, pruned = assign_pruned(X, C, radius)
+    # 마지막 DBA 뒤 재할당에서도 빈 클러스터가 생길 수 있음 (endpoint / 전이 행이 비지 않게)
+    _fix_empty_clusters(X, labels, dist, C)
+    est_saved = 0.0
+    if converged and n_iter > 0:
+        est_saved = (max_iter - n_iter) * loop_sec / (n_iter + 1)
+    return {
+        "labels": labels,
+        "centroids": C,
+        "inertia": float(dist.mean()),
+        "n_iter": n_iter,
+        "converged": converged,
+        "init": init,
+        "est_time_saved_sec": est_saved,
+        "pruned_ratio": pruned,
+    }
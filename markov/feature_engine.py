@@ -0,0 +1,149 @@
+# feature_engine.py
+# -*- coding: utf-8 -*-
+"""
+raw 슬롯 값 → feature score 5개 (Stress/Calm/Fatigue/Vibrancy/Weather) 계산을
+NumPy 배열 연산으로 처리하는 공용 모듈.
+
+- 입력: 마지막 축이 RAW_COLS 순서인 배열 (..., 10)
+    · 하루치 (144, 10), 여러 유저 (U, 144, 10), 실시간 포인트 1개 (10,) 모두 가능
+- 출력: 마지막 축이 FEATURE_COLS 순서인 배열 (..., 5)
+
+build_yesterday_many.compute_feature_row(스칼라 버전)와 같은 공식을 쓴다.
+공식은 compute_feature_matrix 한 곳에만 있고, 실시간 포인트 1개(compute_feature_point)도
+1행 배열로 같은 커널을 탄다.
+단, temperature/humidity 가 결측(NaN/None)이면 실시간 서버와 동일하게
+날씨 불쾌지수에 영향을 주지 않는 값으로 본다.
+"""
+
+from __future__ import annotations
+from typing import Dict, Any, List, Sequence
+
+import numpy as np
+
+
+RAW_COLS = [
+    "average_stress_index",
+    "recent_stress_index",
+    "latest_sleep_score",
+    "latest_sleep_duration",
+    "temperature",
+    "humidity",
+    "rainType",
+    "sky",
+    "laughter",
+    "sigh",
+]
+
+FEATURE_COLS = [
+    "StressScore",
+    "CalmScore",
+    "FatigueScore",
+    "VibrancyScore",
+    "WeatherScore",
+]
+
+RAW_INDEX = {c: i for i, c in enumerate(RAW_COLS)}
+
+
+# ============================================================
+# 1. 입력 → (..., len(RAW_COLS)) 배열
+# ============================================================
+
+def _as_float(v: Any) -> float:
+    if v is None:
+        return np.nan
+    return float(v)
+
+
+def raw_frame_to_array(raw_df) -> np.ndarray:
+    """
+    raw DataFrame → (N, len(RAW_COLS)) float 배열.
+    없는 컬럼은 NaN 으로 채운다.
+    """
+    return raw_df.reindex(columns=RAW_COLS).to_numpy(dtype=float)
+
+
+def raw_point_to_array(raw_point: Dict[str, Any]) -> np.ndarray:
+    """
+    실시간 raw dict 하나 → (len(RAW_COLS),) float 배열.
+    필수 키가 없으면 KeyError (호출부에서 missing_field 로 처리).
+    """
+    return np.array([_as_float(raw_point[c]) for c in RAW_COLS], dtype=float)
+
+
+# ============================================================
+# 2. feature score 커널
+# ============================================================
+
+def compute_feature_matrix(raw: np.ndarray) -> np.ndarray:
+    """
+    raw: (..., len(RAW_COLS))
+    output: (..., len(FEATURE_COLS)), 각 값은 0~1
+    """
+    raw = np.asarray(raw, dtype=float)
+
+    def col(name: str) -> np.ndarray:
+        return raw[..., RAW_INDEX[name]]
+
+    # --- Stress / Calm ---
+    avg_stress = col("average_stress_index") / 100.0
+    recent_stress = col("recent_stress_index") / 100.0
+    stress = np.clip(0.4 * avg_stress + 0.6 * recent_stress, 0.0, 1.0)
+
+    calm = np.clip(1.0 - stress * 0.9, 0.0, 1.0)
+
+    # --- Fatigue ---
+    sleep_score = col("latest_sleep_score") / 100.0
+    sleep_dur_norm = col("latest_sleep_duration") / 600.0
+    sleep_fatigue = np.clip(1.0 - 0.7 * sleep_score - 0.3 * sleep_dur_norm, 0.0, 1.0)
+
+    sigh_norm = np.clip(col("sigh") / 10.0, 0.0, 1.0)
+    fatigue = np.clip(0.6 * sleep_fatigue + 0.4 * sigh_norm, 0.0, 1.0)
+
+    # --- Vibrancy ---
+    laugh_norm = np.clip(col("laughter") / 10.0, 0.0, 1.0)
+    vibrancy = np.clip(0.7 * laugh_norm + 0.3 * (1.0 - fatigue), 0.0, 1.0)
+
+    # --- Weather ---
+    temp = col("temperature")
+    temp = np.where(np.isnan(temp), 22.0, temp)
+    temp_discomfort = np.abs(temp - 22.0) / 20.0
+
+    humid = col("humidity")
+    humid_discomfort = np.where(
+        np.isnan(humid), 0.0, np.maximum(0.0, (humid - 60.0) / 40.0)
+    )
+
+    rain_type = col("rainType")
+    rain_penalty = np.where(
+        rain_type == 1, 0.1,
+        np.where((rain_type == 2) | (rain_type == 3), 0.2, 0.0),
+    )
+    sky_penalty = np.where(col("sky") == 4, 0.05, 0.0)
+
+    discomfort = np.clip(
+        temp_discomfort + humid_discomfort + rain_penalty + sky_penalty,
+        0.0,
+        1.5,
+    )
+    weather = np.clip(1.0 - discomfort, 0.0, 1.0)
+
+    return np.stack([stress, calm, fatigue, vibrancy, weather], axis=-1)
+
+
+def compute_feature_point(raw_point: Dict[str, Any]) -> List[float]:
+    """
+    실시간 raw dict 하나 → FEATURE_COLS 순서 float 5개 (compute_feature_matrix 1행).
+    필수 키가 없으면 KeyError.
+    """
+    return compute_feature_matrix(raw_point_to_array(raw_point)).tolist()
+
+
+def select_feature_cols(feats: np.ndarray, feature_cols: Sequence[str]) -> np.ndarray:
+    """
+    FEATURE_COLS 순서의 결과를 모델 meta 의 feature_cols 순서로 재배열.
+    """
+    if list(feature_cols) == FEATURE_COLS:
+        return feats
+    idx: List[int] = [FEATURE_COLS.index(c) for c in feature_cols]
+    return feats[..., idx]
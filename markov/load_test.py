@@ -0,0 +1,494 @@
+# load_test.py
+# -*- coding: utf-8 -*-
+"""
+추론 서버 오프라인 부하 테스트 (배포 전 용량 회귀 확인용).
+
+- 합성 유저 --users 명의 모델(번들)을 임시 MODEL_DIR 에 만들고 /inference, /inference/batch 호출
+- 요청 구성 (--mix 종류=가중치):
+    single    POST /inference
+    forecast  POST /inference + forecast_minutes (--forecast-minutes)
+    stream    POST /inference + stream=true
+    batch     POST /inference/batch (아이템 --batch-size 개)
+- 부하 방식:
+    closed loop  --concurrency c ...   : 클라이언트 c 개가 응답을 받으면 바로 다음 요청
+    open loop    --rate r ...           : 초당 r 개를 정해진 시각에 보냄 (--arrival uniform | poisson)
+                                          지연은 "보내기로 한 시각" 기준 (서버가 밀리면 대기 시간 포함)
+                                          처리 중 요청이 --max-outstanding 이상이면 보내지 않고 dropped 로 집계
+- 대상:
+    in-process (기본)  Flask test client (네트워크 없음)
+    --bind             같은 프로세스에서 Flask 앱을 127.0.0.1 임의 포트에 띄우고 HTTP 로 호출
+    --url URL          이미 떠 있는 서버 (--model-dir 로 그 서버의 MODEL_DIR 에 합성 모델을 써 둘 수 있음)
+- 결과: 부하 단계별 처리량(rps), 지연 p50 / p90 / p95 / p99 / max, 오류율 (요청 종류별 포함) → JSON
+  --max-p99-ms / --max-error-rate / --min-rps 를 넘으면 exit code 1
+
+    python load_test.py --users 500 --concurrency 1 16 64 --duration 10 --out load.json
+    python load_test.py --users 500 --rate 200 500 1000 --mix single=70 forecast=15 stream=10 batch=5
+    python load_test.py --bind --rate 300 --max-p99-ms 50 --max-error-rate 0.001
+"""
+
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+HERE = Path(__file__).resolve().parent
+REQUEST_KINDS = ("single", "forecast", "stream", "batch")
+DEFAULT_MIX = ("single=80", "forecast=10", "stream=5", "batch=5")
+PERCENTILES = (50, 90, 95, 99)
+
+# (종류, 경로, body)
+Request = Tuple[str, str, bytes]
+# (종류, 지연(초), status, 배치 아이템 오류 수) — status 0: 연결 오류, -1: dropped (open loop)
+Record = Tuple[str, float, int, int]
+Sender = Callable[[Request], Awaitable[Tuple[int, bytes]]]
+
+
+# ============================================================
+# 1. 요청 만들기
+# ============================================================
+
+def parse_mix(specs: Sequence[str]) -> Dict[str, float]:
+    """["single=80", "batch=5"] → {종류: 비율} (합 1)."""
+    mix: Dict[str, float] = {}
+    for spec in specs:
+        kind, _, weight = spec.partition("=")
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"unknown request kind '{kind}' (가능: {', '.join(REQUEST_KINDS)})")
+        mix[kind] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("mix 가중치 합이 0 입니다.")
+    return {k: w / total for k, w in mix.items() if w > 0}
+
+
+def build_requests(
+    rng: np.random.Generator,
+    user_ids: Sequence[str],
+    mix: Dict[str, float],
+    n: int,
+    batch_size: int = 50,
+    forecast_minutes: Sequence[int] = (10, 30, 60, 120),
+) -> List[Request]:
+    """mix 비율대로 요청 n 개를 미리 만들어 둔다 (측정 중에는 돌아가며 재사용)."""
+    from bench_pipeline import synthetic_payload
+
+    kinds = list(mix)
+    picks = rng.choice(len(kinds), size=n, p=[mix[k] for k in kinds])
+    out: List[Request] = []
+    for p in picks:
+        kind = kinds[p]
+        if kind == "batch":
+            users = rng.choice(len(user_ids), size=batch_size)
+            body: Dict[str, Any] = {"items": [synthetic_payload(rng, user_ids[u]) for u in users],
+                                    "future_minutes": 30}
+            path = "/inference/batch"
+        else:
+            body = synthetic_payload(rng, user_ids[int(rng.integers(len(user_ids)))])
+            if kind == "forecast":
+                body["forecast_minutes"] = list(forecast_minutes)
+            elif kind == "stream":
+                body["stream"] = True
+            path = "/inference"
+        out.append((kind, path, json.dumps(body).encode("utf-8")))
+    return out
+
+
+def _batch_item_errors(kind: str, status: int, payload: bytes) -> int:
+    if kind != "batch" or status != 200:
+        return 0
+    try:
+        return int(json.loads(payload).get("n_error", 0))
+    except (ValueError, AttributeError):
+        return 0
+
+
+# ============================================================
+# 2. 결과 집계
+# ============================================================
+
+def summarize(records: Sequence[Record], elapsed: float) -> Dict[str, Any]:
+    lat_ms = np.array([r[1] for r in records], dtype=float) * 1000.0
+    statuses = [r[2] for r in records]
+    n = len(records)
+    n_ok = sum(1 for s in statuses if s == 200)
+    n_dropped = sum(1 for s in statuses if s == -1)
+    by_status: Dict[str, int] = {}
+    for s in statuses:
+        key = "dropped" if s == -1 else ("connection_error" if s == 0 else str(s))
+        by_status[key] = by_status.get(key, 0) + 1
+
+    sent = lat_ms[np.array(statuses) != -1] if n else lat_ms
+    out: Dict[str, Any] = {
+        "requests": n,
+        "elapsed_sec": round(elapsed, 3),
+        "rps": round(n / elapsed, 1) if elapsed > 0 else None,
+        "ok_rps": round(n_ok / elapsed, 1) if elapsed > 0 else None,
+        "error_rate": round(1.0 - n_ok / n, 5) if n else None,
+        "dropped": n_dropped,
+        "batch_item_errors": sum(r[3] for r in records),
+        "status": by_status,
+    }
+    for q in PERCENTILES:
+        out[f"p{q}_ms"] = round(float(np.percentile(sent, q)), 3) if sent.size else None
+    out["mean_ms"] = round(float(sent.mean()), 3) if sent.size else None
+    out["max_ms"] = round(float(sent.max()), 3) if sent.size else None
+    return out
+
+
+def summarize_by_kind(records: Sequence[Record], elapsed: float) -> Dict[str, Any]:
+    return {
+        "overall": summarize(records, elapsed),
+        "by_kind": {kind: summarize([r for r in records if r[0] == kind], elapsed)
+                    for kind in REQUEST_KINDS if any(r[0] == kind for r in records)},
+    }
+
+
+# ============================================================
+# 3. 부하 방식 (closed / open loop)
+# ============================================================
+
+async def closed_loop(send: Sender, requests: List[Request], concurrency: int,
+                      duration: float) -> Dict[str, Any]:
+    stop_at = time.perf_counter() + duration
+    records: List[Record] = []
+
+    async def worker(w: int) -> None:
+        i = w
+        while time.perf_counter() < stop_at:
+            req = requests[i % len(requests)]
+            t0 = time.perf_counter()
+            try:
+                status, payload = await send(req)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                status, payload = 0, b""
+            records.append((req[0], time.perf_counter() - t0, status,
+                            _batch_item_errors(req[0], status, payload)))
+            i += concurrency
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return summarize_by_kind(records, time.perf_counter() - t0)
+
+
+async def closed_loop_once(send: Sender, requests: Sequence[Request]) -> None:
+    """requests 를 순서대로 한 번씩 (warmup 용)."""
+    for req in requests:
+        try:
+            await send(req)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            pass
+
+
+async def open_loop(send: Sender, requests: List[Request], rate: float, duration: float,
+                    arrival: str = "uniform", max_outstanding: int = 1024,
+                    seed: int = 0) -> Dict[str, Any]:
+    """
+    초당 rate 개를 정해진 시각에 보냄. 응답을 기다리지 않고 다음 요청을 보내므로
+    서버가 처리량을 못 따라가면 지연이 계속 늘어난다 (coordinated omission 없음).
+    """
+    rng = np.random.default_rng(seed)
+    n = max(1, int(rate * duration))
+    if arrival == "poisson":
+        offsets = np.cumsum(rng.exponential(1.0 / rate, size=n))
+    else:
+        offsets = np.arange(n) / rate
+
+    records: List[Record] = []
+    tasks = []
+    outstanding = 0
+
+    async def one(req: Request, scheduled: float) -> None:
+        nonlocal outstanding
+        try:
+            status, payload = await send(req)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            status, payload = 0, b""
+        finally:
+            outstanding -= 1
+        records.append((req[0], time.perf_counter() - scheduled, status,
+                        _batch_item_errors(req[0], status, payload)))
+
+    t0 = time.perf_counter()
+    for i, off in enumerate(offsets):
+        scheduled = t0 + float(off)
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        req = requests[i % len(requests)]
+        if outstanding >= max_outstanding:
+            records.append((req[0], 0.0, -1, 0))
+            continue
+        outstanding += 1
+        tasks.append(asyncio.ensure_future(one(req, scheduled)))
+    await asyncio.gather(*tasks)
+    return summarize_by_kind(records, time.perf_counter() - t0)
+
+
+# ============================================================
+# 4. 대상 (in-process Flask / HTTP)
+# ============================================================
+
+class FlaskSender:
+    """Flask test client 를 스레드 풀에서 호출 (스레드마다 client 1개)."""
+
+    def __init__(self, flask_app, threads: int) -> None:
+        self.app = flask_app
+        self.pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="load-flask")
+        self._local = threading.local()
+
+    def _call(self, req: Request) -> Tuple[int, bytes]:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        resp = client.post(req[1], data=req[2], content_type="application/json")
+        return resp.status_code, resp.get_data()
+
+    async def __call__(self, req: Request) -> Tuple[int, bytes]:
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._call, req)
+
+    async def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+class HttpSender:
+    """keep-alive 연결 풀 (쉬는 연결을 재사용, 없으면 새로 연다)."""
+
+    def __init__(self, url: str) -> None:
+        from bench_asgi import HttpConnection
+
+        parts = urlsplit(url)
+        self._conn_cls = HttpConnection
+        self.host, self.port = parts.hostname or "127.0.0.1", parts.port or 80
+        self.base = parts.path.rstrip("/")
+        self._idle: List[Any] = []
+        self._all: List[Any] = []
+
+    async def __call__(self, req: Request) -> Tuple[int, bytes]:
+        if self._idle:
+            conn = self._idle.pop()
+        else:
+            conn = self._conn_cls(self.host, self.port)
+            self._all.append(conn)
+        result = await conn.request("POST", self.base + req[1], req[2])
+        self._idle.append(conn)
+        return result
+
+    async def close(self) -> None:
+        await asyncio.gather(*(c.close() for c in self._all))
+        self._idle, self._all = [], []
+
+
+def serve_local(flask_app) -> Tuple[str, Callable[[], None]]:
+    """Flask 앱을 127.0.0.1 임의 포트에 띄움 (스레드 서버) → (url, 종료 함수)."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class _QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args: Any, **kwargs: Any) -> None:  # 요청마다 access log 를 찍지 않음
+            pass
+
+    server = make_server("127.0.0.1", 0, flask_app, threaded=True, request_handler=_QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True)
+    thread.start()
+
+    def shutdown() -> None:
+        server.shutdown()
+        thread.join(timeout=5)
+
+    return f"http://127.0.0.1:{server.server_port}", shutdown
+
+
+def run_stage(make_sender: Callable[[int], Any], requests: List[Request], load: Dict[str, Any],
+              args: argparse.Namespace) -> Dict[str, Any]:
+    """부하 단계 1개 (새 이벤트 루프 + 새 sender)."""
+
+    async def main() -> Dict[str, Any]:
+        if load["mode"] == "closed":
+            sender = make_sender(load["concurrency"])
+            coro = closed_loop(sender, requests, load["concurrency"], args.duration)
+        else:
+            sender = make_sender(args.max_outstanding)
+            coro = open_loop(sender, requests, load["rate"], args.duration,
+                             args.arrival, args.max_outstanding, args.seed)
+        try:
+            return await coro
+        finally:
+            await sender.close()
+
+    return asyncio.run(main())
+
+
+# ============================================================
+# 5. CLI
+# ============================================================
+
+def _print_row(load: Dict[str, Any], res: Dict[str, Any]) -> None:
+    o = res["overall"]
+    label = f"c={load['concurrency']}" if load["mode"] == "closed" else f"rate={load['rate']:g}/s"
+    print(f"[{load['mode']:>6} {label:>12}] rps {o['rps']:>9}  p50 {o['p50_ms']} ms  "
+          f"p99 {o['p99_ms']} ms  errors {o['error_rate']}  {o['status']}", flush=True)
+
+
+def check_thresholds(stages: List[Dict[str, Any]], args: argparse.Namespace) -> List[str]:
+    failures = []
+    for stage in stages:
+        load, o = stage["load"], stage["result"]["overall"]
+        label = f"{load['mode']} " + (f"c={load['concurrency']}" if load["mode"] == "closed"
+                                      else f"rate={load['rate']:g}")
+        if args.max_p99_ms is not None and (o["p99_ms"] is None or o["p99_ms"] > args.max_p99_ms):
+            failures.append(f"{label}: p99_ms {o['p99_ms']} > {args.max_p99_ms}")
+        if args.max_error_rate is not None and (o["error_rate"] or 0) > args.max_error_rate:
+            failures.append(f"{label}: error_rate {o['error_rate']} > {args.max_error_rate}")
+        if args.min_rps is not None and load["mode"] == "closed" and (o["ok_rps"] or 0) < args.min_rps:
+            failures.append(f"{label}: ok_rps {o['ok_rps']} < {args.min_rps}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="추론 서버 오프라인 부하 테스트")
+    parser.add_argument("--users", type=int, default=200, help="합성 유저 수")
+    parser.add_argument("--mix", nargs="+", default=list(DEFAULT_MIX),
+                        help="요청 종류=가중치 (single / forecast / stream / batch)")
+    parser.add_argument("--batch-size", type=int, default=50, help="batch 요청 1개의 아이템 수")
+    parser.add_argument("--forecast-minutes", type=int, nargs="+", default=[10, 30, 60, 120])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[],
+                        help="closed loop 동시 클라이언트 수 (여러 개면 단계별로)")
+    parser.add_argument("--rate", type=float, nargs="+", default=[], help="open loop 초당 요청 수")
+    parser.add_argument("--arrival", choices=("uniform", "poisson"), default="uniform",
+                        help="open loop 요청 간격")
+    parser.add_argument("--max-outstanding", type=int, default=1024,
+                        help="open loop 처리 중 요청 상한 (넘으면 dropped)")
+    parser.add_argument("--duration", type=float, default=10.0, help="단계별 측정 시간(초)")
+    parser.add_argument("--pool-size", type=int, default=5000, help="미리 만들어 돌려 쓰는 요청 수")
+    parser.add_argument("--no-warmup", action="store_true", help="측정 전 유저별 1회 요청(모델 로드) 생략")
+    parser.add_argument("--seed", type=int, default=0)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--bind", action="store_true", help="앱을 로컬 포트에 띄우고 HTTP 로 호출")
+    target.add_argument("--url", help="이미 떠 있는 서버 주소 (예: http://127.0.0.1:5000)")
+    parser.add_argument("--model-dir", type=Path,
+                        help="--url 서버의 MODEL_DIR (주면 여기에 합성 모델을 쓴다)")
+    parser.add_argument("--out", type=Path, help="JSON 리포트 저장 경로")
+    parser.add_argument("--max-p99-ms", type=float, help="단계별 p99 상한")
+    parser.add_argument("--max-error-rate", type=float, help="단계별 오류율 상한")
+    parser.add_argument("--min-rps", type=float, help="closed loop 단계별 ok_rps 하한")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.concurrency and not args.rate:
+        args.concurrency = [1, 16, 64]
+    loads = ([{"mode": "closed", "concurrency": c} for c in args.concurrency]
+             + [{"mode": "open", "rate": r} for r in args.rate])
+
+    sys.path.insert(0, str(HERE))
+    from bench_pipeline import write_synthetic_model
+
+    out_path = args.out.resolve() if args.out else None
+    rng = np.random.default_rng(args.seed)
+    user_ids = [f"load_{i:06d}" for i in range(args.users)]
+    model_date = datetime.now(timezone.utc) - timedelta(days=1)  # 서버는 UTC 기준 어제 모델을 읽는다
+
+    meta: Dict[str, Any] = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "users": args.users,
+        "mix": mix,
+        "batch_size": args.batch_size,
+        "duration_sec": args.duration,
+        "arrival": args.arrival,
+        "max_outstanding": args.max_outstanding,
+    }
+
+    inf = None
+    shutdown: Optional[Callable[[], None]] = None
+    if args.url:
+        if args.model_dir:
+            args.model_dir.mkdir(parents=True, exist_ok=True)
+            for i, uid in enumerate(user_ids):
+                write_synthetic_model(args.model_dir, uid, model_date, seed=args.seed + i)
+        else:
+            print("[LOAD] 서버 MODEL_DIR 에 합성 유저 모델(load_NNNNNN)이 있어야 합니다 (--model-dir).")
+        url = args.url
+        meta["target"] = "url"
+    else:
+        # 추론 모듈은 import 시 ./debug_outputs 를 쓴다 → 임시 디렉토리에서 실행
+        work_dir = tempfile.mkdtemp(prefix="mood_load_test_")
+        os.chdir(work_dir)
+        import realtime_inference_many as inf
+
+        t0 = time.perf_counter()
+        for i, uid in enumerate(user_ids):
+            write_synthetic_model(inf.MODEL_DIR, uid, model_date, seed=args.seed + i)
+        print(f"[LOAD] {args.users} synthetic models in {time.perf_counter() - t0:.1f}s ({work_dir})",
+              flush=True)
+        meta["work_dir"] = work_dir
+        if args.bind:
+            url, shutdown = serve_local(inf.app)
+            meta["target"] = "bind"
+        else:
+            url = None
+            meta["target"] = "in-process"
+    meta["url"] = url
+
+    def make_sender(parallel: int):
+        return HttpSender(url) if url else FlaskSender(inf.app, parallel)
+
+    requests = build_requests(rng, user_ids, mix, args.pool_size, args.batch_size, args.forecast_minutes)
+
+    try:
+        if not args.no_warmup:
+            from bench_pipeline import synthetic_payload
+
+            warm = [("single", "/inference", json.dumps(synthetic_payload(rng, uid)).encode("utf-8"))
+                    for uid in user_ids]
+
+            async def warmup() -> None:
+                sender = make_sender(8)
+                try:
+                    await asyncio.gather(*(closed_loop_once(sender, warm[w::8]) for w in range(8)))
+                finally:
+                    await sender.close()
+
+            t0 = time.perf_counter()
+            asyncio.run(warmup())
+            print(f"[LOAD] warmup {len(warm)} requests in {time.perf_counter() - t0:.1f}s", flush=True)
+
+        stages = []
+        for load in loads:
+            res = run_stage(make_sender, requests, load, args)
+            stages.append({"load": load, "result": res})
+            _print_row(load, res)
+    finally:
+        if shutdown is not None:
+            shutdown()
+
+    failures = check_thresholds(stages, args)
+    report: Dict[str, Any] = {"meta": meta, "stages": stages, "failures": failures}
+    if inf is not None:
+        report["server"] = {"model_cache": inf.MODEL_CACHE.stats()}
+
+    print(json.dumps({"failures": failures}, ensure_ascii=False))
+    if out_path:
+        with out_path.open("w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
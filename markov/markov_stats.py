@@ -0,0 +1,150 @@
+# markov_stats.py
+# -*- coding: utf-8 -*-
+"""
+클러스터 라벨 → 마르코프 전이 / endpoint μ_k 계산을 배치 배열 연산으로 처리하는 커널.
+
+- 여러 유저를 한 번에: labels (U, W), windows (U, W, L, D)
+  (유저별 윈도우 수가 다르면 라벨 -1 로 패딩)
+- 여러 step 을 한 번에: (U, S, K, K) 전이 횟수 텐서를 np.bincount 한 번으로 계산
+- 추론 서버가 쓰는 horizon 의 P^h 를 미리 계산
+"""
+
+from __future__ import annotations
+from typing import Sequence, Tuple
+
+import numpy as np
+
+
+ENDPOINT_TAIL = 3  # 마지막 3포인트(= 30분) 평균
+
+
+def _as_2d_labels(labels: np.ndarray) -> Tuple[np.ndarray, bool]:
+    labels = np.asarray(labels)
+    if labels.ndim == 1:
+        return labels[None, :], True
+    return labels, False
+
+
+# ============================================================
+# 1. 전이 횟수 / 확률
+# ============================================================
+
+def transition_count_tensor(
+    labels: np.ndarray,
+    K: int,
+    steps: Sequence[int],
+) -> np.ndarray:
+    """
+    labels: (U, W) 또는 (W,) 정수 라벨, 음수는 패딩(무시)
+    output: (U, S, K, K) 또는 (S, K, K) 전이 횟수 (float)
+    """
+    lab, squeeze = _as_2d_labels(labels)
+    U, W = lab.shape
+    S = len(steps)
+
+    flat_parts = []
+    for si, step in enumerate(steps):
+        if W <= step:
+            continue
+        src = lab[:, :-step]
+        dst = lab[:, step:]
+        valid = (src >= 0) & (dst >= 0)
+        u_idx = np.broadcast_to(np.arange(U)[:, None], src.shape)
+        flat = ((u_idx * S + si) * K + src) * K + dst
+        flat_parts.append(flat[valid])
+
+    if flat_parts:
+        flat_all = np.concatenate(flat_parts)
+    else:
+        flat_all = np.empty(0, dtype=np.int64)
+    counts = np.bincount(flat_all, minlength=U * S * K * K).astype(float)
+    counts = counts.reshape(U, S, K, K)
+    return counts[0] if squeeze else counts
+
+
+def normalize_transitions(counts: np.ndarray) -> np.ndarray:
+    """
+    (..., K, K) 행 정규화. 관측이 없는 행은 자기 자신으로 가는 확률 1.
+    """
+    counts = np.asarray(counts, dtype=float)
+    totals = counts.sum(axis=-1, keepdims=True)
+    P = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    empty = totals[..., 0] == 0
+    if empty.any():
+        K = counts.shape[-1]
+        eye = np.broadcast_to(np.eye(K), counts.shape)
+        P[empty] = eye[empty]
+    return P
+
+
+def transition_matrices(labels: np.ndarray, K: int, steps: Sequence[int]) -> np.ndarray:
+    """labels → (…, S, K, K) 정규화된 전이 행렬."""
+    return normalize_transitions(transition_count_tensor(labels, K, steps))
+
+
+def transition_powers(P1: np.ndarray, horizons: Sequence[int]) -> np.ndarray:
+    """
+    P1: (..., K, K) → (..., H, K, K), [h] = P1 ** horizons[h]
+    1..max(horizons) 를 누적 곱으로 한 번에 계산.
+    """
+    P1 = np.asarray(P1, dtype=float)
+    max_h = max(horizons)
+    K = P1.shape[-1]
+    cur = np.broadcast_to(np.eye(K), P1.shape).copy()
+    by_h = {0: cur}
+    for h in range(1, max_h + 1):
+        cur = cur @ P1
+        by_h[h] = cur
+    return np.stack([by_h[h] for h in horizons], axis=-3)
+
+
+# ============================================================
+# 2. endpoint μ_k
+# ============================================================
+
+def endpoint_sums_counts(
+    windows: np.ndarray,
+    labels: np.ndarray,
+    K: int,
+    tail: int = ENDPOINT_TAIL,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    windows: (U, W, L, D) 또는 (W, L, D), labels: (U, W) 또는 (W,), 음수는 무시
+    output: (sums (U, K, D), counts (U, K)) — 입력이 1유저면 U 축 없음
+    클러스터별 '마지막 tail 시점 평균 벡터' 의 합과 윈도우 수.
+    """
+    lab, squeeze = _as_2d_labels(labels)
+    win = np.asarray(windows)
+    if squeeze:
+        win = win[None]
+    U, W, L, D = win.shape
+
+    tails = win[:, :, L - tail:L, :].mean(axis=2)           # (U, W, D)
+    valid = lab >= 0
+    flat = (np.arange(U)[:, None] * K + lab)[valid]          # (n_valid,)
+    vals = tails[valid]                                      # (n_valid, D)
+
+    counts = np.bincount(flat, minlength=U * K).astype(float).reshape(U, K)
+    sums = np.empty((U * K, D), dtype=float)
+    for d in range(D):
+        sums[:, d] = np.bincount(flat, weights=vals[:, d], minlength=U * K)
+    sums = sums.reshape(U, K, D)
+
+    if squeeze:
+        return sums[0], counts[0]
+    return sums, counts
+
+
+def endpoint_means_batch(
+    windows: np.ndarray,
+    labels: np.ndarray,
+    K: int,
+    tail: int = ENDPOINT_TAIL,
+) -> np.ndarray:
+    """
+    클러스터별 대표 벡터 μ_k, output: (U, K, D) 또는 (K, D).
+    윈도우가 없는 클러스터는 0 벡터.
+    """
+    sums, counts = endpoint_sums_counts(windows, labels, K, tail)
+    return np.divide(sums, counts[..., None], out=np.zeros_like(sums),
+                     where=counts[..., None] > 0)
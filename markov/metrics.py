@@ -0,0 +1,299 @@
+# metrics.py
+# -*- coding: utf-8 -*-
+"""
+빌드 / 추론 Flask 서버 공용 계측 모듈 (외부 의존성 없음).
+
+- MetricsRegistry: Counter / Gauge / Histogram 을 모아서 Prometheus text(0.0.4) 로 출력
+- StageTimer.span(stage): 구간 시간을 stage 라벨 히스토그램에 기록
+- collect_stage_times(): with 블록 안의 span 시간을 dict 로도 모음
+  (프로세스 풀 워커에서 잰 시간을 결과와 함께 부모 프로세스로 넘길 때 사용)
+- instrument_flask_app(): 요청 수 / 지연 / 처리 중 요청 수 + GET /metrics 등록
+"""
+
+from __future__ import annotations
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import math
+import threading
+import time
+
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v))
+
+
+# ============================================================
+# 1. metric 타입
+# ============================================================
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels {sorted(labels)} != {list(self.labelnames)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key → ([bucket 별 개수], sum, count)
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, agg = self._values.setdefault(key, ([0] * len(self.buckets), [0.0, 0.0]))
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    counts[i] += 1
+                    break
+            agg[0] += value
+            agg[1] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return int(entry[1][1]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, (counts, agg) in sorted(self._values.items()):
+                cum = 0
+                for b, c in zip(self.buckets, counts):
+                    cum += c
+                    le = f'le="{_fmt_value(b)}"'
+                    lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {cum}")
+                lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(agg[0])}")
+                lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {int(agg[1])}")
+        return lines
+
+
+# ============================================================
+# 2. registry
+# ============================================================
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))  # type: ignore[return-value]
+
+    def on_render(self, fn: Callable[[], None]) -> None:
+        """render 직전에 호출할 함수 (gauge 를 현재 상태로 갱신할 때)."""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in list(self._collectors):
+            fn()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+# ============================================================
+# 3. stage 타이머
+# ============================================================
+
+_stage_collector: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_collector", default=None)
+
+
+@contextmanager
+def collect_stage_times() -> Iterator[Dict[str, float]]:
+    """with 블록 안의 StageTimer.span 시간을 {stage: 누적 초} 로 모은다."""
+    times: Dict[str, float] = {}
+    token = _stage_collector.set(times)
+    try:
+        yield times
+    finally:
+        _stage_collector.reset(token)
+
+
+class StageTimer:
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.histogram.observe(elapsed, stage=stage)
+            times = _stage_collector.get()
+            if times is not None:
+                times[stage] = times.get(stage, 0.0) + elapsed
+
+    def observe_stage_times(self, times: Dict[str, float]) -> None:
+        """다른 프로세스에서 모아 온 stage 시간을 기록."""
+        for stage, elapsed in times.items():
+            self.histogram.observe(elapsed, stage=stage)
+
+
+# ============================================================
+# 4. Flask 연동
+# ============================================================
+
+def instrument_flask_app(app, registry: MetricsRegistry, prefix: str) -> None:
+    """
+    - {prefix}_http_requests_total{endpoint,method,status}
+    - {prefix}_http_request_seconds{endpoint}
+    - {prefix}_http_requests_in_flight
+    - GET /metrics (Prometheus text)
+    """
+    from flask import Response, g, request
+
+    requests_total = registry.counter(
+        f"{prefix}_http_requests_total", "HTTP 요청 수", ("endpoint", "method", "status"))
+    request_seconds = registry.histogram(
+        f"{prefix}_http_request_seconds", "HTTP 요청 처리 시간(초)", ("endpoint",))
+    in_flight = registry.gauge(
+        f"{prefix}_http_requests_in_flight", "처리 중인 HTTP 요청 수")
+
+    def _endpoint() -> str:
+        rule = request.url_rule
+        return rule.rule if rule is not None else "unmatched"
+
+    @app.before_request
+    def _metrics_before() -> None:
+        g._metrics_t0 = time.perf_counter()
+        g._metrics_in_flight = True
+        in_flight.inc()
+
+    @app.after_request
+    def _metrics_after(response):
+        t0 = getattr(g, "_metrics_t0", None)
+        if t0 is not None:
+            endpoint = _endpoint()
+            request_seconds.observe(time.perf_counter() - t0, endpoint=endpoint)
+            requests_total.inc(endpoint=endpoint, method=request.method,
+                               status=str(response.status_code))
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(exc) -> None:
+        if getattr(g, "_metrics_in_flight", False):
+            in_flight.dec()
+            g._metrics_in_flight = False
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(registry.render(), status=200,
+                        content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,227 @@
+# model_bundle.py
+# -*- coding: utf-8 -*-
+"""
+유저-하루 모델 번들 (단일 바이너리 파일) reader / writer.
+
+레이아웃 (little endian):
+    [0:8)    MAGIC  b"MMBUNDLE"
+    [8:12)   uint32 포맷 버전
+    [12:16)  uint32 header 길이 (bytes)
+    [16:..)  header JSON (utf-8)
+             {"format_version", "meta": {...}, "arrays": {name: {dtype, shape, offset, nbytes}}}
+    이후     각 배열 raw bytes (C-order, ALIGN 바이트 정렬, offset 은 파일 시작 기준)
+
+- 쓰기: 같은 디렉토리 임시 파일에 쓴 뒤 fsync + os.replace (원자적 교체)
+    · bundle_writer: 배열을 메모리에 다 올리지 않고 파일(memmap)에 바로 채워 넣는 writer
+- 읽기: 파일 한 번 열어서 mmap(읽기 전용) 후 배열은 np.frombuffer view 로 반환
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+
+MAGIC = b"MMBUNDLE"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_SUFFIX = "_yesterday_model.bundle"
+ALIGN = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+class BundleFormatError(ValueError):
+    """번들 파일이 깨졌거나 지원하지 않는 버전일 때."""
+
+
+def bundle_path(model_dir: Path, prefix: str) -> Path:
+    """{user_id}_{YYYYMMDD} prefix → 번들 경로."""
+    return Path(model_dir) / f"{prefix}{BUNDLE_SUFFIX}"
+
+
+def find_latest_bundle(
+    model_dir: Path,
+    user_id: str,
+    before: datetime,
+    lookback_days: int = 7,
+) -> Optional[Path]:
+    """
+    before 이전 날짜 중 가장 최근 번들 경로 (lookback_days 일까지만 찾음), 없으면 None.
+    """
+    for d in range(1, lookback_days + 1):
+        day = before - timedelta(days=d)
+        path = bundle_path(model_dir, f"{user_id}_{day.strftime('%Y%m%d')}")
+        if path.exists():
+            return path
+    return None
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+# ============================================================
+# 1. writer
+# ============================================================
+
+def _layout(
+    specs: Dict[str, Tuple[np.dtype, Sequence[int]]],
+    meta: Dict[str, Any],
+) -> Tuple[bytes, Dict[str, Dict[str, Any]], int]:
+    """
+    specs: {name: (dtype, shape)} → (header JSON bytes, entries, 파일 전체 크기)
+    """
+    # header 길이가 offset 에 영향을 주므로, offset 이 변하지 않을 때까지 계산
+    data_start = 0
+    while True:
+        entries: Dict[str, Dict[str, Any]] = {}
+        offset = data_start
+        for name, (dtype, shape) in specs.items():
+            dtype = np.dtype(dtype)
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            offset = _align(offset)
+            entries[name] = {
+                "dtype": dtype.str,
+                "shape": [int(n) for n in shape],
+                "offset": offset,
+                "nbytes": nbytes,
+            }
+            offset += nbytes
+        header = json.dumps(
+            {"format_version": BUNDLE_FORMAT_VERSION, "meta": meta, "arrays": entries},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        new_start = _align(_PREAMBLE.size + len(header))
+        if new_start == data_start:
+            return header, entries, offset
+        data_start = new_start
+
+
+def _commit(tmp_name: str, path: Path) -> None:
+    os.replace(tmp_name, path)
+
+
+def _discard(tmp_name: str) -> None:
+    try:
+        os.unlink(tmp_name)
+    except FileNotFoundError:
+        pass
+
+
+def write_bundle(path: str | Path, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Path:
+    """
+    arrays 와 meta(JSON 직렬화 가능)를 번들 하나로 원자적으로 저장.
+    """
+    path = Path(path)
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    header, entries, _ = _layout({name: (a.dtype, a.shape) for name, a in arrays.items()}, meta)
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, BUNDLE_FORMAT_VERSION, len(header)))
+            f.write(header)
+            for name, a in arrays.items():
+                f.write(b"\0" * (entries[name]["offset"] - f.tell()))
+                f.write(a.tobytes(order="C"))
+            f.flush()
+            os.fsync(f.fileno())
+        _commit(tmp_name, path)
+    except BaseException:
+        _discard(tmp_name)
+        raise
+    return path
+
+
+@contextmanager
+def bundle_writer(
+    path: str | Path,
+    specs: Dict[str, Tuple[np.dtype, Sequence[int]]],
+    meta: Dict[str, Any],
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    shape 이 정해진 큰 배열들을 나눠 채우는 writer.
+    with 블록에서 받은 {name: 쓰기 가능한 memmap} 을 채우면, 블록이 정상 종료될 때
+    flush + fsync + os.replace. 예외가 나면 임시 파일을 지운다.
+    """
+    path = Path(path)
+    header, entries, total = _layout(specs, meta)
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "r+b") as f:
+            f.truncate(total)
+            f.write(_PREAMBLE.pack(MAGIC, BUNDLE_FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.flush()
+            arrays = {
+                name: (np.memmap(f, dtype=np.dtype(e["dtype"]), mode="r+", offset=e["offset"],
+                                 shape=tuple(e["shape"]))
+                       if e["nbytes"] else np.empty(e["shape"], dtype=np.dtype(e["dtype"])))
+                for name, e in entries.items()
+            }
+            yield arrays
+            for a in arrays.values():
+                if isinstance(a, np.memmap):
+                    a.flush()
+            del arrays
+            os.fsync(f.fileno())
+        _commit(tmp_name, path)
+    except BaseException:
+        _discard(tmp_name)
+        raise
+
+
+# ============================================================
+# 2. reader
+# ============================================================
+
+def _parse(buf: Any, path: Path) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    if len(buf) < _PREAMBLE.size:
+        raise BundleFormatError(f"bundle too short: {path}")
+    magic, version, header_len = _PREAMBLE.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise BundleFormatError(f"not a model bundle: {path}")
+    if version != BUNDLE_FORMAT_VERSION:
+        raise BundleFormatError(f"unsupported bundle version {version}: {path}")
+
+    if _PREAMBLE.size + header_len > len(buf):
+        raise BundleFormatError(f"truncated header: {path}")
+    try:
+        header = json.loads(bytes(buf[_PREAMBLE.size:_PREAMBLE.size + header_len]).decode("utf-8"))
+        entries, meta = header["arrays"], header["meta"]
+    except (UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise BundleFormatError(f"bad bundle header ({e}): {path}")
+    arrays: Dict[str, np.ndarray] = {}
+    for name, e in entries.items():
+        dtype = np.dtype(e["dtype"])
+        count = int(np.prod(e["shape"], dtype=np.int64))
+        if e["offset"] + e["nbytes"] > len(buf):
+            raise BundleFormatError(f"truncated array '{name}': {path}")
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=count,
+                                     offset=e["offset"]).reshape(e["shape"])
+    return arrays, meta
+
+
+def read_bundle(path: str | Path, use_mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    output: (arrays, meta)
+      - arrays 는 읽기 전용 (use_mmap=True 면 mmap 된 파일의 view)
+    """
+    path = Path(path)
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise BundleFormatError(f"empty bundle: {path}")
+        if use_mmap:
+            buf: Any = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = f.read()
+    return _parse(buf, path)
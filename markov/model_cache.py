@@ -0,0 +1,251 @@
+# model_cache.py
+# -*- coding: utf-8 -*-
+"""
+추론 서버용 in-process 모델 캐시 (LRU + byte 예산).
+
+- 키: (user_id, model_date "YYYYMMDD")
+- 용량: 모델 배열 nbytes 합(+ 엔트리당 고정 오버헤드)이 max_bytes 를 넘으면 오래 안 쓴 것부터 제거
+- 무효화: 모델 파일(번들 또는 legacy meta json)의 stat (경로, mtime_ns, size, inode) 이 바뀌면 다시 로드
+    · 번들/meta 는 원자적 교체(os.replace)로 써지므로 다시 빌드되면 inode 와 mtime 이 바뀐다
+    · stat 확인은 revalidate_sec 마다 한 번만 → 그 사이의 hit 는 디스크를 전혀 건드리지 않음
+- 같은 키의 동시 miss 는 하나로 합쳐서(coalesce) 로드는 1번만, 나머지는 결과를 기다림
+- 로드 실패(FileNotFoundError 등)는 캐시하지 않고, 기다리던 요청 모두에 같은 예외를 올린다
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import os
+import threading
+import time
+
+import numpy as np
+
+
+ENTRY_OVERHEAD_BYTES = 4096  # meta / cluster_texts 등 배열 외 객체 몫 (대략)
+
+CacheKey = Tuple[str, str]
+Stamp = Tuple[str, int, int, int]
+
+
+def model_nbytes(model: Dict[str, Any]) -> int:
+    """runtime_model 의 ndarray nbytes 합 + 고정 오버헤드."""
+    total = ENTRY_OVERHEAD_BYTES
+    for v in model.values():
+        if isinstance(v, np.ndarray):
+            total += int(v.nbytes)
+    return total
+
+
+def file_stamp(path: Path) -> Stamp:
+    st = os.stat(path)
+    return (str(path), st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class _Entry:
+    __slots__ = ("model", "nbytes", "stamp", "checked_at")
+
+    def __init__(self, model: Dict[str, Any], nbytes: int, stamp: Stamp, checked_at: float) -> None:
+        self.model = model
+        self.nbytes = nbytes
+        self.stamp = stamp
+        self.checked_at = checked_at
+
+
+class _Flight:
+    """진행 중인 로드 1건 (같은 키의 다른 요청은 event 를 기다린다)."""
+    __slots__ = ("event", "model", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.model: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class ModelCache:
+    """
+    locate_fn(user_id, model_date) -> Path
+        모델 파일 경로 (없으면 FileNotFoundError)
+    load_fn(user_id, model_date, path) -> runtime_model dict
+        실제 로드 (디스크 I/O, JSON 파싱)
+    registry: 주어지면 {prefix}_hits_total / _misses_total / _evictions_total /
+              _invalidations_total / _coalesced_total 카운터와 _bytes / _entries 게이지 등록
+    """
+
+    def __init__(
+        self,
+        locate_fn: Callable[[str, datetime], Path],
+        load_fn: Callable[[str, datetime, Path], Dict[str, Any]],
+        max_bytes: int,
+        revalidate_sec: float = 5.0,
+        registry=None,
+        prefix: str = "model_cache",
+    ) -> None:
+        self.locate_fn = locate_fn
+        self.load_fn = load_fn
+        self.max_bytes = max(0, int(max_bytes))
+        self.revalidate_sec = revalidate_sec
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, _Flight] = {}
+        self._bytes = 0
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "coalesced": 0}
+
+        self._counters = {}
+        if registry is not None:
+            for name in self._counts:
+                self._counters[name] = registry.counter(
+                    f"{prefix}_{name}_total", f"모델 캐시 {name} 수")
+            bytes_gauge = registry.gauge(f"{prefix}_bytes", "모델 캐시 사용량(bytes, 추정)")
+            entries_gauge = registry.gauge(f"{prefix}_entries", "모델 캐시 엔트리 수")
+
+            def _update_gauges() -> None:
+                with self._lock:
+                    bytes_gauge.set(self._bytes)
+                    entries_gauge.set(len(self._entries))
+
+            registry.on_render(_update_gauges)
+
+    # ------------------------------
+    # 조회
+    # ------------------------------
+
+    def get(self, user_id: str, model_date: datetime) -> Dict[str, Any]:
+        key = (user_id, model_date.strftime("%Y%m%d"))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = entry is not None and time.monotonic() - entry.checked_at < self.revalidate_sec
+            if fresh:
+                self._entries.move_to_end(key)
+            else:
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _Flight()
+                    self._inflight[key] = flight
+
+        if fresh:
+            self._count("hits")
+            return entry.model
+
+        if not leader:
+            flight.event.wait()
+            self._count("coalesced")
+            if flight.error is not None:
+                raise flight.error
+            return flight.model
+
+        try:
+            model = self._refresh(key, user_id, model_date, entry)
+            flight.model = model
+            return model
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def peek(self, user_id: str, model_date: datetime) -> Optional[Dict[str, Any]]:
+        """
+        revalidate_sec 안에 확인된 엔트리만 반환 (디스크 / 대기 없음), 아니면 None.
+        이벤트 루프에서 먼저 부르고, None 이면 get() 을 스레드 풀에서 호출하는 용도.
+        """
+        key = (user_id, model_date.strftime("%Y%m%d"))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.checked_at >= self.revalidate_sec:
+                return None
+            self._entries.move_to_end(key)
+        self._count("hits")
+        return entry.model
+
+    def _refresh(self, key: CacheKey, user_id: str, model_date: datetime,
+                 entry: Optional[_Entry]) -> Dict[str, Any]:
+        """리더 요청만 호출: stat 확인 후 그대로면 재사용, 바뀌었거나 없으면 로드."""
+        try:
+            path = self.locate_fn(user_id, model_date)
+            stamp = file_stamp(path)
+        except FileNotFoundError:
+            if entry is not None:
+                self._drop(key, "invalidations")
+            raise
+
+        if entry is not None and entry.stamp == stamp:
+            with self._lock:
+                entry.checked_at = time.monotonic()
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            self._count("hits")
+            return entry.model
+
+        if entry is not None:
+            self._drop(key, "invalidations")
+        self._count("misses")
+
+        model = self.load_fn(user_id, model_date, path)
+        self._put(key, _Entry(model, model_nbytes(model), stamp, time.monotonic()))
+        return model
+
+    # ------------------------------
+    # 저장 / 제거
+    # ------------------------------
+
+    def _put(self, key: CacheKey, entry: _Entry) -> None:
+        n_evicted = 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            # 방금 넣은 엔트리 하나는 예산을 넘어도 남긴다
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                n_evicted += 1
+        if n_evicted:
+            self._count("evictions", n_evicted)
+
+    def _drop(self, key: CacheKey, reason: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            self._bytes -= entry.nbytes
+        self._count(reason)
+
+    def invalidate(self, user_id: Optional[str] = None) -> int:
+        """user_id 의 엔트리(없으면 전체)를 제거. 제거한 개수 반환."""
+        with self._lock:
+            keys = [k for k in self._entries if user_id is None or k[0] == user_id]
+            for k in keys:
+                self._bytes -= self._entries.pop(k).nbytes
+        if keys:
+            self._count("invalidations", len(keys))
+        return len(keys)
+
+    # ------------------------------
+    # 통계
+    # ------------------------------
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+        counter = self._counters.get(name)
+        if counter is not None:
+            counter.inc(n)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counts)
+            out["entries"] = len(self._entries)
+            out["bytes"] = self._bytes
+        out["max_bytes"] = self.max_bytes
+        out["revalidate_sec"] = self.revalidate_sec
+        return out
@@ -0,0 +1,312 @@
+# model_rollover.py
+# -*- coding: utf-8 -*-
+"""
+자정(UTC) 모델 날짜 전환용 백그라운드 pre-warm.
+
+추론 서버는 요청 시각 기준 "어제" 모델을 쓰므로, 날짜가 바뀌는 순간
+모든 유저의 첫 요청이 동시에 디스크로 가고, 새 모델이 아직 안 만들어진 유저는 404 를 받는다.
+
+ModelRollover:
+- 스레드가 scan_interval_sec 마다 MODEL_DIR 을 훑어서 (어제, 오늘) 날짜의 새 모델 파일을 찾고
+  요청이 오기 전에 모델 캐시에 로드 (오늘 날짜 모델은 자정 전에 미리)
+    · 디렉토리 mtime 이 그대로면 파일 목록을 다시 읽지 않음
+    · 그 날짜 공유 스토어(model_store)가 있으면 유저별로 로드하지 않고 스토어만 열고 목록에 올림
+      (요청 시 조회는 index probe + view, pre-fork 워커마다 모델 사본을 만들지 않는다)
+    · 캐시 사용량이 max_bytes × cache_fraction, 엔트리 수가 max_entries 이상이거나
+      남은 fd 가 fd_reserve 보다 적으면 더 로드하지 않고 목록에만 올림 (요청 시 로드)
+    · 로드 실패는 목록에 올리지 않고 다음 스캔에서 다시 시도 (_load_errors_total, 날짜·유저당 로그 1번)
+- 유저별 활성 모델 날짜: 새 날짜 모델이 로드된 뒤에야 그 유저를 그 날짜 목록에 추가 (원자적 전환)
+    → 요청은 "목록에 있는 가장 최근 날짜 (≤ 어제)" 모델을 쓴다
+    → 새 모델이 아직 없는 유저는 디스크 확인 없이 이전 날짜 모델 (fallback_days 일까지)
+- 스캔이 scan_interval_sec × 3 넘게 안 돌았으면 (스레드 정지 등) 목록을 믿지 않고 예전처럼 디스크 확인
+- 준비 상태는 메트릭으로: {prefix}_target_built_users / _target_ready_users / _target_warm_users /
+  _target_warm_ratio 게이지, _loads_total / _load_errors_total / _fallback_total / _scans_total 카운터
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional, Set
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import os
+import sys
+import threading
+import time
+
+from model_cache import ModelCache
+from model_store import open_store, store_path
+
+
+def open_fd_headroom() -> float:
+    """RLIMIT_NOFILE soft 한도 - 지금 열린 fd 수 (알 수 없으면 inf)."""
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        n_open = len(os.listdir("/proc/self/fd"))
+    except (ImportError, OSError):
+        return float("inf")
+    if soft == resource.RLIM_INFINITY:
+        return float("inf")
+    return soft - n_open
+
+
+def _day(d: datetime) -> str:
+    return d.strftime("%Y%m%d")
+
+
+class ModelRollover:
+    """
+    list_fn(model_date) -> 그 날짜 모델 파일이 있는 user_id 집합
+    cache: 모델 로드 / 보관 (ModelCache)
+    """
+
+    def __init__(
+        self,
+        cache: ModelCache,
+        list_fn: Callable[[datetime], Set[str]],
+        model_dir: Path,
+        scan_interval_sec: float = 30.0,
+        fallback_days: int = 1,
+        cache_fraction: float = 0.8,
+        max_entries: int = 10000,
+        fd_reserve: int = 256,
+        registry=None,
+        prefix: str = "model_prewarm",
+    ) -> None:
+        self.cache = cache
+        self.list_fn = list_fn
+        self.model_dir = Path(model_dir)
+        self.scan_interval_sec = scan_interval_sec
+        self.fallback_days = max(0, fallback_days)
+        self.cache_fraction = cache_fraction
+        self.max_entries = max_entries
+        self.fd_reserve = fd_reserve
+
+        self._lock = threading.Lock()
+        # 날짜별: 디스크에서 찾은 유저 / 로드 끝나서 활성 날짜로 쓸 수 있는 유저 / 그중 pre-warm 으로 로드한 유저
+        self._built: Dict[str, Set[str]] = {}
+        self._ready: Dict[str, Set[str]] = {}
+        self._warm: Dict[str, Set[str]] = {}
+        self._scanned_at: Dict[str, float] = {}
+        self._dir_mtime: Dict[str, int] = {}
+        self._failed: Dict[str, Set[str]] = {}
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+        self._loads = self._load_errors = self._fallbacks = self._scans = None
+        if registry is not None:
+            self._loads = registry.counter(f"{prefix}_loads_total", "pre-warm 으로 미리 로드한 모델 수")
+            self._load_errors = registry.counter(
+                f"{prefix}_load_errors_total", "pre-warm 모델 로드 실패 수 (다음 스캔에서 재시도)")
+            self._fallbacks = registry.counter(
+                f"{prefix}_fallback_total", "새 모델이 없어 이전 날짜 모델로 응답한 요청 수")
+            self._scans = registry.counter(f"{prefix}_scans_total", "MODEL_DIR 스캔 수")
+            gauges = {
+                name: registry.gauge(f"{prefix}_{name}", help_text)
+                for name, help_text in (
+                    ("target_built_users", "현재 대상 날짜(어제) 모델 파일이 있는 유저 수"),
+                    ("target_ready_users", "현재 대상 날짜 모델로 전환된 유저 수"),
+                    ("target_warm_users", "현재 대상 날짜 모델을 pre-warm 으로 미리 로드한 유저 수"),
+                    ("target_warm_ratio", "target_warm_users / target_built_users"),
+                    ("next_built_users", "다음 대상 날짜(오늘) 모델 파일이 있는 유저 수"),
+                    ("next_warm_users", "다음 대상 날짜 모델을 미리 로드한 유저 수"),
+                )
+            }
+
+            def _update_gauges() -> None:
+                for name, value in self.stats().items():
+                    if name in gauges:
+                        gauges[name].set(value)
+
+            registry.on_render(_update_gauges)
+
+    # ------------------------------
+    # 요청 경로
+    # ------------------------------
+
+    def _fresh(self, day: str, now: float) -> bool:
+        return now - self._scanned_at.get(day, float("-inf")) < self.scan_interval_sec * 3
+
+    def model_date_for(self, user_id: str, target: datetime) -> datetime:
+        """
+        요청에 쓸 모델 날짜. 스캔이 최신이면 목록 기준 (디스크 I/O 없음):
+          target 목록에 있음 → target / 없으면 fallback_days 안의 가장 최근 날짜
+          어디에도 없음 → target (평소 경로 → 없으면 404)
+        """
+        self.ensure_started()
+        if not self._fresh(_day(target), time.monotonic()):
+            return target
+        for d in range(self.fallback_days + 1):
+            day = target - timedelta(days=d)
+            if user_id in self._ready.get(_day(day), ()):
+                return day
+        return target
+
+    def load(self, user_id: str, target: datetime) -> Dict[str, Any]:
+        """
+        model_date_for 로 고른 날짜의 모델. 그 날짜 파일이 없으면(FileNotFoundError)
+        이전 날짜(fallback_days 까지)를 차례로 시도, 다 없으면 FileNotFoundError.
+        """
+        model_date = self.model_date_for(user_id, target)
+        try:
+            model = self.cache.get(user_id, model_date)
+        except FileNotFoundError as e:
+            if model_date != target or not self.fallback_days:
+                raise
+            error = e
+        else:
+            if model_date != target:
+                self._count(self._fallbacks)
+            return model
+        for d in range(1, self.fallback_days + 1):
+            day = target - timedelta(days=d)
+            try:
+                model = self.cache.get(user_id, day)
+            except FileNotFoundError:
+                continue
+            # 다음 요청부터는 디스크 확인 없이 이 날짜 모델 (스캔 전에 뜬 서버 등)
+            with self._lock:
+                self._ready.setdefault(_day(day), set()).add(user_id)
+            self._count(self._fallbacks)
+            return model
+        raise error
+
+    def peek(self, user_id: str, target: datetime) -> Optional[Dict[str, Any]]:
+        model_date = self.model_date_for(user_id, target)
+        model = self.cache.peek(user_id, model_date)
+        if model is not None and model_date != target:
+            self._count(self._fallbacks)
+        return model
+
+    # ------------------------------
+    # 스캔 / pre-warm
+    # ------------------------------
+
+    def scan_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        (어제, 오늘) 날짜 모델 파일을 찾아 새로 생긴 유저를 캐시에 로드하고 활성 목록에 추가.
+        """
+        now = now or datetime.now(timezone.utc)
+        t0 = time.perf_counter()
+        target = now - timedelta(days=1)
+        n_loaded = 0
+        for day_dt in (target, now):
+            n_loaded += self._scan_day(day_dt)
+            if self._stop.is_set():
+                break
+
+        keep = {_day(target - timedelta(days=d)) for d in range(self.fallback_days + 1)} | {_day(now)}
+        with self._lock:
+            for table in (self._built, self._ready, self._warm, self._scanned_at, self._dir_mtime,
+                          self._failed):
+                for day in [k for k in table if k not in keep]:
+                    del table[day]
+        self._count(self._scans)
+        return {"loaded": n_loaded, "seconds": time.perf_counter() - t0}
+
+    def _scan_day(self, day_dt: datetime) -> int:
+        day = _day(day_dt)
+        try:
+            mtime = os.stat(self.model_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = -1
+        if mtime != self._dir_mtime.get(day):
+            built = set(self.list_fn(day_dt)) if mtime >= 0 else set()
+            with self._lock:
+                self._built[day] = built
+                self._ready.setdefault(day, set())
+                self._warm.setdefault(day, set())
+            self._dir_mtime[day] = mtime
+
+        pending = sorted(self._built.get(day, set()) - self._ready.get(day, set()))
+        if pending and open_store(store_path(self.model_dir, day_dt)) is not None:
+            # 공유 스토어 날짜: 스토어 mmap 만 열어 두고 유저별 로드 없이 전환
+            with self._lock:
+                self._ready[day].update(pending)
+            self._scanned_at[day] = time.monotonic()
+            return 0
+
+        n_loaded = 0
+        for user_id in pending:
+            if self._stop.is_set():
+                break
+            if self._can_prewarm():
+                try:
+                    self.cache.get(user_id, day_dt)
+                except Exception as e:
+                    self._count(self._load_errors)
+                    failed = self._failed.setdefault(day, set())
+                    if user_id not in failed:
+                        failed.add(user_id)
+                        print(f"[PREWARM] load failed {user_id} {day}: {type(e).__name__}: {e}",
+                              file=sys.stderr, flush=True)
+                    continue  # 다음 스캔에서 다시 시도
+                self._warm[day].add(user_id)
+                self._count(self._loads)
+                n_loaded += 1
+            # 로드가 끝난 뒤(또는 예산 초과로 요청 시 로드)에야 이 날짜로 전환
+            self._ready[day].add(user_id)
+        self._scanned_at[day] = time.monotonic()
+        return n_loaded
+
+    def _can_prewarm(self) -> bool:
+        stats = self.cache.stats()
+        return (stats["bytes"] < stats["max_bytes"] * self.cache_fraction
+                and stats["entries"] < self.max_entries
+                and open_fd_headroom() >= self.fd_reserve)
+
+    # ------------------------------
+    # 스레드
+    # ------------------------------
+
+    def ensure_started(self) -> None:
+        """scan_interval_sec > 0 이면 이 프로세스에서 스캔 스레드를 한 번 시작 (fork 후 워커에서도)."""
+        if self.scan_interval_sec <= 0 or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-prewarm", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.scan_once()
+            except Exception as e:
+                print(f"[PREWARM] scan failed: {e}", file=sys.stderr, flush=True)
+            self._stop.wait(self.scan_interval_sec)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._pid = None
+
+    # ------------------------------
+    # 통계
+    # ------------------------------
+
+    def _count(self, counter, n: int = 1) -> None:
+        if counter is not None:
+            counter.inc(n)
+
+    def stats(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        now = now or datetime.now(timezone.utc)
+        target, nxt = _day(now - timedelta(days=1)), _day(now)
+        with self._lock:
+            built = len(self._built.get(target, ()))
+            out = {
+                "target_date": target,
+                "target_built_users": built,
+                "target_ready_users": len(self._ready.get(target, ())),
+                "target_warm_users": len(self._warm.get(target, ())),
+                "next_built_users": len(self._built.get(nxt, ())),
+                "next_warm_users": len(self._warm.get(nxt, ())),
+            }
+        out["target_warm_ratio"] = out["target_warm_users"] / built if built else 0.0
+        out["scan_fresh"] = self._fresh(target, time.monotonic())
+        return out
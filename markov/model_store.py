@@ -0,0 +1,266 @@
+# model_store.py
+# -*- coding: utf-8 -*-
+"""
+날짜별 공유 모델 스토어: 한 모델 날짜의 모든 유저 배열을 파일 하나에 고정 레이아웃으로 묶는다.
+
+pre-fork 서버에서 워커마다 유저 번들을 따로 읽어 들고 있는 대신,
+모든 워커가 이 파일 하나를 읽기 전용 mmap → page cache 한 벌을 N 워커가 공유.
+
+파일: {MODEL_DIR}/store_{YYYYMMDD}{STORE_SUFFIX}  (포맷은 model_bundle 번들과 같음)
+    user_keys        (N,)            S{W}    user_id utf-8, 정렬됨 → searchsorted 로 조회
+    centroids        (N, K, L, D)    float64
+    endpoint_means   (N, K, D)       float64
+    P1, P3           (N, K, K)       float64
+    P1_powers        (N, S, K, K)    float64 (S = len(P1_power_steps))
+    forecast_powers  (N, H, K, K)    float64 (H = forecast_max_minutes // freq, [h-1] = P1^h)
+    meta_offsets     (N + 1,)        int64   meta_blob 안의 유저별 JSON 구간
+    meta_blob        (M,)            uint8   유저 번들 meta JSON (cluster_summaries / cluster_texts 등)
+  공통 meta: model_date, n_users, key_width, freq_minutes, window_length, K, feature_cols,
+             P1_power_steps, forecast_steps
+
+- 조회: 이진 탐색(index probe) 1번 + 배열 slice (view, 복사 없음) + 유저 meta JSON 파싱
+  → 워커마다 유저 수에 비례하는 dict / 배열을 만들지 않는다 (워커 메모리 일정)
+- shape 이 다른 유저(K 등이 다름)는 스토어에 넣지 않는다 → 추론 서버는 유저 번들로 fallback
+- 패킹은 유저 번들을 하나씩 읽어서 memmap 에 바로 채운다 (전체를 메모리에 올리지 않음)
+
+사용:
+    python model_store.py --date 2025-11-30
+    python model_store.py --date 2025-11-30 --model-dir debug_outputs/model --forecast-max-minutes 360
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from markov_stats import transition_powers
+from model_bundle import BUNDLE_SUFFIX, BundleFormatError, bundle_writer, read_bundle
+
+
+STORE_SUFFIX = ".mstore"
+STORE_ARRAYS = ("centroids", "endpoint_means", "P1", "P3", "P1_powers")
+
+
+def store_path(model_dir: Path, model_date: datetime) -> Path:
+    return Path(model_dir) / f"store_{model_date.strftime('%Y%m%d')}{STORE_SUFFIX}"
+
+
+# ============================================================
+# 1. 패킹 (빌드 쪽)
+# ============================================================
+
+def _user_bundles(model_dir: Path, date_str: str) -> List[Tuple[str, Path]]:
+    """{user_id}_{date}{BUNDLE_SUFFIX} → [(user_id, path)] (user_id utf-8 bytes 순 정렬)."""
+    tail = f"_{date_str}{BUNDLE_SUFFIX}"
+    found = [(p.name[:-len(tail)], p) for p in Path(model_dir).glob(f"*{tail}")]
+    return sorted(found, key=lambda t: t[0].encode("utf-8"))
+
+
+def _bundle_shapes(arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        tuple((name, arrays[name].shape) for name in STORE_ARRAYS if name in arrays),
+        meta["freq_minutes"], meta["window_length"], meta["K"],
+        tuple(meta["feature_cols"]), tuple(meta.get("P1_power_steps", [])),
+    )
+
+
+def _meta_bytes(meta: Dict[str, Any]) -> bytes:
+    return json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def pack_model_store(
+    model_dir: Path,
+    model_date: datetime,
+    forecast_max_minutes: int = 360,
+    out_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    model_dir 의 model_date 유저 번들을 스토어 파일 하나로 묶는다.
+    기준 shape 는 가장 많은 유저가 가진 shape. 다른 유저와 읽지 못한 번들은 skipped 로 보고.
+    """
+    t0 = time.perf_counter()
+    date_str = model_date.strftime("%Y%m%d")
+    out_path = Path(out_path) if out_path is not None else store_path(model_dir, model_date)
+
+    # 1) 헤더만 훑어서 shape 그룹 / meta 크기 계산 (mmap 이라 배열은 읽지 않음)
+    candidates = []
+    skipped: Dict[str, str] = {}
+    shape_counts: Dict[Tuple[Any, ...], int] = {}
+    for user_id, path in _user_bundles(model_dir, date_str):
+        try:
+            arrays, meta = read_bundle(path)
+            shapes = _bundle_shapes(arrays, meta)
+        except (OSError, KeyError, BundleFormatError) as e:
+            skipped[user_id] = f"unreadable: {e}"
+            continue
+        candidates.append((user_id, path, shapes, len(_meta_bytes(meta))))
+        shape_counts[shapes] = shape_counts.get(shapes, 0) + 1
+
+    if not candidates:
+        raise FileNotFoundError(f"no model bundles for {date_str} in {model_dir}")
+
+    ref = max(shape_counts, key=shape_counts.get)
+    users = []
+    for user_id, path, shapes, meta_len in candidates:
+        if shapes != ref:
+            skipped[user_id] = "shape mismatch"
+        else:
+            users.append((user_id, path, meta_len))
+
+    ref_shapes, freq_minutes, window_length, K, feature_cols, power_steps = ref
+    ref_arrays = dict(ref_shapes)
+    forecast_steps = max(1, forecast_max_minutes // freq_minutes)
+    N = len(users)
+    keys = np.array([u.encode("utf-8") for u, _, _ in users])
+    meta_lens = np.array([m for _, _, m in users], dtype=np.int64)
+
+    specs = {"user_keys": (keys.dtype, (N,))}
+    for name in STORE_ARRAYS:
+        if name in ref_arrays:
+            specs[name] = (np.float64, (N,) + tuple(ref_arrays[name]))
+    specs["forecast_powers"] = (np.float64, (N, forecast_steps, K, K))
+    specs["meta_offsets"] = (np.int64, (N + 1,))
+    specs["meta_blob"] = (np.uint8, (int(meta_lens.sum()),))
+
+    store_meta = {
+        "model_date": date_str,
+        "n_users": N,
+        "key_width": keys.dtype.itemsize,
+        "freq_minutes": freq_minutes,
+        "window_length": window_length,
+        "K": K,
+        "feature_cols": list(feature_cols),
+        "P1_power_steps": list(power_steps),
+        "forecast_steps": forecast_steps,
+    }
+
+    # 2) 유저 번들을 하나씩 읽어 memmap 에 채움
+    with bundle_writer(out_path, specs, store_meta) as out:
+        out["user_keys"][:] = keys
+        offsets = out["meta_offsets"]
+        offsets[0] = 0
+        offsets[1:] = np.cumsum(meta_lens)
+        for i, (user_id, path, _) in enumerate(users):
+            arrays, meta = read_bundle(path)
+            for name in STORE_ARRAYS:
+                if name in out:
+                    out[name][i] = arrays[name]
+            out["forecast_powers"][i] = transition_powers(arrays["P1"], range(1, forecast_steps + 1))
+            out["meta_blob"][offsets[i]:offsets[i + 1]] = np.frombuffer(_meta_bytes(meta), dtype=np.uint8)
+
+    return {
+        "path": str(out_path),
+        "model_date": date_str,
+        "n_users": N,
+        "n_skipped": len(skipped),
+        "skipped": skipped,
+        "bytes": out_path.stat().st_size,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+# ============================================================
+# 2. 조회 (추론 서버 쪽)
+# ============================================================
+
+class ModelStore:
+    """스토어 파일 1개 (읽기 전용 mmap). 여러 스레드가 동시에 lookup 해도 된다."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.arrays, self.meta = read_bundle(self.path)
+        self.keys = self.arrays["user_keys"]
+        self.offsets = self.arrays["meta_offsets"]
+        self.blob = self.arrays["meta_blob"]
+
+    def __len__(self) -> int:
+        return int(self.keys.shape[0])
+
+    def index_of(self, user_id: str) -> int:
+        """정렬된 user_keys 이진 탐색. 없으면 -1."""
+        key = user_id.encode("utf-8")
+        if not key or len(key) > self.keys.dtype.itemsize:
+            return -1
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self) and self.keys[i] == key:
+            return i
+        return -1
+
+    def __contains__(self, user_id: str) -> bool:
+        return self.index_of(user_id) >= 0
+
+    def lookup(self, user_id: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """
+        (arrays, meta) — read_bundle(유저 번들) 과 같은 모양, 없으면 None.
+        arrays 는 스토어 mmap 의 view, forecast_powers 포함.
+        """
+        i = self.index_of(user_id)
+        if i < 0:
+            return None
+        arrays = {name: self.arrays[name][i]
+                  for name in STORE_ARRAYS + ("forecast_powers",) if name in self.arrays}
+        meta = json.loads(self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8"))
+        return arrays, meta
+
+
+_OPEN_LOCK = threading.Lock()
+_OPEN_STORES: Dict[str, Tuple[Tuple[int, int, int], ModelStore]] = {}
+
+
+def open_store(path: Path) -> Optional[ModelStore]:
+    """
+    프로세스 안에서 경로별로 한 번만 mmap (파일이 교체되면 다시 연다). 파일이 없으면 None.
+    """
+    path = Path(path)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        with _OPEN_LOCK:
+            _OPEN_STORES.pop(str(path), None)
+        return None
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    with _OPEN_LOCK:
+        cached = _OPEN_STORES.get(str(path))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    store = ModelStore(path)
+    with _OPEN_LOCK:
+        _OPEN_STORES[str(path)] = (stamp, store)
+    return store
+
+
+# ============================================================
+# 3. CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="날짜별 공유 모델 스토어 패킹")
+    parser.add_argument("--date", required=True, help="모델 날짜 YYYY-MM-DD")
+    parser.add_argument("--model-dir", type=Path, default=Path("./debug_outputs/model"))
+    parser.add_argument("--forecast-max-minutes", type=int,
+                        default=int(os.environ.get("FORECAST_MAX_MINUTES", "360")),
+                        help="forecast_powers 로 미리 계산할 최대 분 (추론 서버 FORECAST_MAX_MINUTES 와 맞춤)")
+    parser.add_argument("--out", type=Path, help="스토어 경로 (기본: {model_dir}/store_{date}.mstore)")
+    args = parser.parse_args(argv)
+
+    model_date = datetime.strptime(args.date, "%Y-%m-%d")
+    try:
+        summary = pack_model_store(args.model_dir, model_date, args.forecast_max_minutes, args.out)
+    except FileNotFoundError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
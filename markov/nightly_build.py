@@ -0,0 +1,274 @@
+# nightly_build.py
+# -*- coding: utf-8 -*-
+"""
+야간 전체 유저 어제 모델 빌드 오케스트레이터 (CLI).
+
+- 대상 유저: 해당 날짜 DailyPreprocessedSlot 에 row 가 있는 유저 (또는 --users-file)
+- 샤딩: sha1(user_id) % shard_count == shard_index 인 유저만 빌드
+  → 머신 N 대에서 같은 명령을 --shard-index 만 바꿔 실행하면 겹치지 않게 나눠진다
+- 머신 안에서는 --workers 프로세스로 빌드 (build_yesterday_models_for_users)
+- 체크포인트: 유저 1명이 끝날 때마다 결과를 JSONL 에 한 줄 append
+  → 중간에 죽어도 다시 실행하면 성공한 유저는 건너뛰고 이어서 빌드
+- 끝나면 처리량 요약(JSON) 출력
+- --pack-store: 빌드 후 MODEL_DIR 의 해당 날짜 번들을 공유 스토어(model_store) 하나로 묶음
+  (샤드가 여러 개면 모든 샤드가 끝난 뒤 python model_store.py --date ... 로 한 번만)
+
+사용:
+    python nightly_build.py --date 2025-11-30 --workers 8
+    python nightly_build.py --date 2025-11-30 --workers 8 --pack-store
+    python nightly_build.py --date 2025-11-30 --shard-index 0 --shard-count 4   # 머신 0
+    python nightly_build.py --date 2025-11-30 --users-file users.txt --no-retry-failed
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+import build_yesterday_many as builder
+from model_store import pack_model_store
+from rds_fetch import fetch_active_user_ids
+
+
+DEFAULT_CHUNK_SIZE = 2000  # 일괄 조회 1번에 다루는 유저 수 (메모리 상한)
+
+
+# ============================================================
+# 1. 샤딩
+# ============================================================
+
+def shard_of(user_id: str, shard_count: int) -> int:
+    """user_id → 0..shard_count-1 (프로세스/머신이 달라도 같은 값)."""
+    digest = hashlib.sha1(user_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def select_shard(user_ids: Iterable[str], shard_index: int, shard_count: int) -> List[str]:
+    return [uid for uid in user_ids if shard_of(uid, shard_count) == shard_index]
+
+
+# ============================================================
+# 2. 체크포인트 (JSONL)
+# ============================================================
+
+def default_checkpoint_path(date: datetime, shard_index: int, shard_count: int) -> Path:
+    return (builder.BASE_DEBUG_DIR / "nightly"
+            / f"{date.strftime('%Y%m%d')}_shard{shard_index}of{shard_count}.jsonl")
+
+
+class Checkpoint:
+    """
+    유저별 빌드 결과를 한 줄씩 기록하는 JSONL 파일.
+    같은 유저가 여러 번 기록되면 마지막 줄이 최종 결과.
+    """
+
+    def __init__(self, path: Path, target_date: str) -> None:
+        self.path = Path(path)
+        self.target_date = target_date
+        self._lock = threading.Lock()
+        self.done: Dict[str, Dict[str, Any]] = {}
+
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 쓰다가 죽은 마지막 줄
+                        continue
+                    if rec.get("target_date") == target_date:
+                        self.done[rec["user_id"]] = rec
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.path.open("a", encoding="utf-8")
+        if self._f.tell() > 0:
+            with self.path.open("rb") as f:
+                f.seek(-1, os.SEEK_END)
+                partial = f.read(1) != b"\n"
+            if partial:
+                # 쓰다가 죽은 마지막 줄 뒤에 이어 쓰면 다음 기록까지 깨지므로 줄을 끊고 시작
+                self._f.write("\n")
+                self._f.flush()
+
+    def is_done(self, user_id: str, retry_failed: bool) -> bool:
+        rec = self.done.get(user_id)
+        if rec is None:
+            return False
+        return rec["status"] == "success" or not retry_failed
+
+    def append(self, result: Dict[str, Any]) -> None:
+        rec = {k: v for k, v in result.items() if k != "stage_sec"}
+        rec["target_date"] = self.target_date
+        rec["finished_at"] = datetime.now(timezone.utc).isoformat()
+        line = json.dumps(rec, ensure_ascii=False)
+        with self._lock:
+            self._f.write(line + "\n")
+            self._f.flush()
+            self.done[rec["user_id"]] = rec
+
+    def sync(self) -> None:
+        with self._lock:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+
+# ============================================================
+# 3. 실행
+# ============================================================
+
+def run_nightly(
+    user_ids: List[str],
+    date: datetime,
+    checkpoint: Checkpoint,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    retry_failed: bool = True,
+    bulk_fetch: bool = True,
+) -> Dict[str, Any]:
+    """
+    user_ids(이 샤드 몫) 중 체크포인트에 없는 유저를 chunk_size 명씩 빌드.
+    """
+    pending = [uid for uid in user_ids if not checkpoint.is_done(uid, retry_failed)]
+    n_skipped = len(user_ids) - len(pending)
+    n_chunks = (len(pending) + chunk_size - 1) // chunk_size
+
+    t0 = time.perf_counter()
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    fetch_sec = 0.0
+    n_workers = None
+    n_done = 0
+
+    def on_result(result: Dict[str, Any]) -> None:
+        checkpoint.append(result)
+        statuses[result["status"]] += 1
+        if result["status"] != "success":
+            errors[result.get("error", "unknown")] += 1
+
+    for ci in range(n_chunks):
+        chunk = pending[ci * chunk_size:(ci + 1) * chunk_size]
+        summary = builder.build_yesterday_models_for_users(
+            chunk, date, max_workers=workers, bulk_fetch=bulk_fetch, on_result=on_result,
+        )
+        checkpoint.sync()
+        fetch_sec += summary["fetch_sec"] or 0.0
+        n_workers = summary["n_workers"]
+        n_done += summary["n_users"]
+
+        elapsed = time.perf_counter() - t0
+        print(f"[NIGHTLY] chunk {ci + 1}/{n_chunks}  users {n_done}/{len(pending)}  "
+              f"ok={statuses['success']} err={statuses['error']}  "
+              f"{n_done / elapsed:.2f} users/s  elapsed {elapsed:.1f}s", flush=True)
+
+    elapsed = time.perf_counter() - t0
+    n_attempted = statuses["success"] + statuses["error"]
+    return {
+        "target_date": date.strftime("%Y-%m-%d"),
+        "n_users": len(user_ids),
+        "n_skipped": n_skipped,
+        "n_attempted": n_attempted,
+        "n_success": statuses["success"],
+        "n_error": statuses["error"],
+        "errors": dict(errors),
+        "n_chunks": n_chunks,
+        "n_workers": n_workers,
+        "fetch_sec": round(fetch_sec, 3),
+        "elapsed_sec": round(elapsed, 3),
+        "users_per_sec": round(n_attempted / elapsed, 3) if elapsed > 0 and n_attempted else None,
+        "checkpoint": str(checkpoint.path),
+    }
+
+
+# ============================================================
+# 4. CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="야간 전체 유저 어제 모델 빌드 (샤딩 + 체크포인트)")
+    parser.add_argument("--date", help="YYYY-MM-DD (없으면 UTC 기준 어제)")
+    parser.add_argument("--users-file", type=Path,
+                        help="user_id 가 한 줄에 하나씩 있는 파일 (없으면 해당 날짜 데이터가 있는 유저 전체)")
+    parser.add_argument("--shard-index", type=int, default=0, help="이 머신의 샤드 번호 (0부터)")
+    parser.add_argument("--shard-count", type=int, default=1, help="전체 샤드(머신) 수")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="일괄 조회 / 프로세스 풀 1회에 다루는 유저 수")
+    parser.add_argument("--checkpoint", type=Path,
+                        help="체크포인트 JSONL 경로 (기본: debug_outputs/nightly/{date}_shard{i}of{n}.jsonl)")
+    parser.add_argument("--no-retry-failed", action="store_true",
+                        help="체크포인트에 실패로 기록된 유저는 다시 빌드하지 않음")
+    parser.add_argument("--no-bulk-fetch", action="store_true",
+                        help="일괄 조회 대신 워커별로 유저 raw 를 조회")
+    parser.add_argument("--pack-store", action="store_true",
+                        help="빌드 후 해당 날짜 공유 모델 스토어 생성 (추론 워커 mmap 공유용)")
+    args = parser.parse_args(argv)
+
+    if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+        parser.error("0 <= --shard-index < --shard-count 이어야 합니다.")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size 는 1 이상이어야 합니다.")
+
+    if args.date:
+        target_date = datetime.strptime(args.date, "%Y-%m-%d")
+    else:
+        target_date = datetime.now(timezone.utc) - timedelta(days=1)
+
+    if args.users_file:
+        with args.users_file.open("r", encoding="utf-8") as f:
+            all_users = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    else:
+        all_users = fetch_active_user_ids(target_date)
+    user_ids = select_shard(all_users, args.shard_index, args.shard_count)
+
+    print(f"[NIGHTLY] {target_date.strftime('%Y-%m-%d')} shard {args.shard_index}/{args.shard_count}: "
+          f"{len(user_ids)} / {len(all_users)} users", flush=True)
+
+    checkpoint = Checkpoint(
+        args.checkpoint or default_checkpoint_path(target_date, args.shard_index, args.shard_count),
+        target_date.strftime("%Y-%m-%d"),
+    )
+    try:
+        summary = run_nightly(
+            user_ids,
+            target_date,
+            checkpoint,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            retry_failed=not args.no_retry_failed,
+            bulk_fetch=not args.no_bulk_fetch,
+        )
+    finally:
+        checkpoint.close()
+
+    summary["shard_index"] = args.shard_index
+    summary["shard_count"] = args.shard_count
+    summary["n_users_all_shards"] = len(all_users)
+    if args.pack_store:
+        forecast_max_minutes = int(os.environ.get("FORECAST_MAX_MINUTES", "360"))
+        try:
+            store = pack_model_store(builder.MODEL_DIR, target_date, forecast_max_minutes)
+            store.pop("skipped")
+            summary["store"] = store
+        except FileNotFoundError as e:
+            summary["store"] = {"error": str(e)}
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary["n_error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
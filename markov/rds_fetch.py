@@ -0,0 +1,245 @@
+# rds_fetch.py
+# -*- coding: utf-8 -*-
+"""
+DailyPreprocessedSlot 조회 공용 모듈.
+
+- 커넥션 풀(psycopg2 ThreadedConnectionPool)을 프로세스당 1개 유지
+- 여러 유저의 하루치 슬롯을 user_id 청크 단위 쿼리 몇 번으로 가져와서
+  dict/DataFrame 없이 바로 (users, 144, len(RAW_COLS)) NumPy 블록에 배치
+- conn 인자로 sqlite3 커넥션을 넘기면 로컬 SQLite 테이블로도 동작 (테스트/오프라인용)
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+from contextlib import contextmanager
+from datetime import datetime
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from feature_engine import RAW_COLS
+
+
+SLOT_MINUTES = 10
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES  # 144
+
+RDS_CONFIG = {
+    "host": os.environ.get("RDS_HOST", "mood-manager-db.cd4iisicagg0.ap-northeast-2.rds.amazonaws.com"),
+    "port": os.environ.get("RDS_PORT", "5432"),
+    "dbname": os.environ.get("RDS_DB", "mymood"),
+    "user": os.environ.get("RDS_USER", "postgres"),
+    "password": os.environ.get("RDS_PASSWORD", "moodmanagerrds"),
+}
+
+POOL_MIN_CONN = int(os.environ.get("RDS_POOL_MIN", "1"))
+POOL_MAX_CONN = int(os.environ.get("RDS_POOL_MAX", "8"))
+
+USER_CHUNK_SIZE = 500     # 쿼리 1번에 넣는 user_id 수
+FETCH_BATCH_ROWS = 10000  # cursor.fetchmany 단위
+
+
+# ============================================================
+# 1. 커넥션 풀
+# ============================================================
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    프로세스당 1개의 ThreadedConnectionPool.
+    fork 된 워커에서는 부모 풀을 쓰지 않고 새로 만든다.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            import psycopg2.pool
+            _pool = psycopg2.pool.ThreadedConnectionPool(
+                POOL_MIN_CONN, POOL_MAX_CONN, **RDS_CONFIG
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
+
+
+@contextmanager
+def pooled_connection() -> Iterator[Any]:
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        # 읽기 전용 트랜잭션을 정리한 뒤 반납
+        try:
+            conn.rollback()
+        finally:
+            pool.putconn(conn)
+
+
+# ============================================================
+# 2. 멀티 유저 하루치 조회 → NumPy 블록
+# ============================================================
+
+def placeholder(conn: Any) -> str:
+    """conn 의 쿼리 파라미터 자리 표시자 (sqlite3: "?", psycopg2: "%s")."""
+    return "?" if isinstance(conn, sqlite3.Connection) else "%s"
+
+
+def _day_range(date: datetime) -> Tuple[str, str]:
+    date_str = date.strftime("%Y-%m-%d")
+    return f"{date_str} 00:00:00", f"{date_str} 23:59:59"
+
+
+def slot_index_of(timestamps: Sequence[Any]) -> np.ndarray:
+    """
+    timestamp(datetime 또는 ISO 문자열) 배열 → 0~143 슬롯 인덱스.
+    """
+    ts = np.array(timestamps, dtype="datetime64[m]")
+    minutes = (ts - ts.astype("datetime64[D]")).astype(np.int64)
+    return minutes // SLOT_MINUTES
+
+
+def _fetch_chunk_into(
+    conn: Any,
+    user_ids: Sequence[str],
+    date: datetime,
+    block: np.ndarray,
+    row_counts: np.ndarray,
+    offset: int,
+) -> None:
+    ph = placeholder(conn)
+    start_ts, end_ts = _day_range(date)
+    in_list = ", ".join([ph] * len(user_ids))
+    query = f"""
+        SELECT user_id,
+               timestamp,
+               {", ".join(RAW_COLS)}
+        FROM DailyPreprocessedSlot
+        WHERE user_id IN ({in_list})
+          AND timestamp BETWEEN {ph} AND {ph};
+    """
+    user_pos = {uid: offset + i for i, uid in enumerate(user_ids)}
+
+    cur = conn.cursor()
+    try:
+        cur.execute(query, (*user_ids, start_ts, end_ts))
+        while True:
+            rows = cur.fetchmany(FETCH_BATCH_ROWS)
+            if not rows:
+                break
+            uidx = np.fromiter((user_pos[r[0]] for r in rows), dtype=np.int64, count=len(rows))
+            slots = slot_index_of([r[1] for r in rows])
+            vals = np.array([r[2:] for r in rows], dtype=float)
+
+            ok = (slots >= 0) & (slots < SLOTS_PER_DAY)
+            block[uidx[ok], slots[ok]] = vals[ok]
+            np.add.at(row_counts, uidx[ok], 1)
+    finally:
+        cur.close()
+
+
+def fetch_day_raw_block(
+    user_ids: Sequence[str],
+    date: datetime,
+    conn: Any = None,
+    chunk_size: int = USER_CHUNK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    여러 유저의 하루치 raw 를 슬롯 그리드에 배치해서 반환.
+
+    output:
+      - block: (len(user_ids), 144, len(RAW_COLS)) float, 데이터 없는 슬롯은 NaN
+      - row_counts: (len(user_ids),) 유저별 조회된 row 수
+    conn 이 없으면 커넥션 풀에서 빌려 쓴다.
+    """
+    user_ids = list(user_ids)
+    block = np.full((len(user_ids), SLOTS_PER_DAY, len(RAW_COLS)), np.nan, dtype=float)
+    row_counts = np.zeros(len(user_ids), dtype=np.int64)
+    if not user_ids:
+        return block, row_counts
+
+    def run(c: Any) -> None:
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            _fetch_chunk_into(c, chunk, date, block, row_counts, start)
+
+    if conn is not None:
+        run(conn)
+    else:
+        with pooled_connection() as c:
+            run(c)
+
+    return block, row_counts
+
+
+def fetch_day_raw_many(
+    user_ids: Sequence[str],
+    date: datetime,
+    conn: Any = None,
+    chunk_size: int = USER_CHUNK_SIZE,
+) -> Dict[str, np.ndarray]:
+    """
+    fetch_day_raw_block 의 dict 버전.
+    row 가 하나라도 있는 유저만 {user_id: (144, len(RAW_COLS))} 로 반환.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    block, row_counts = fetch_day_raw_block(user_ids, date, conn=conn, chunk_size=chunk_size)
+    return {uid: block[i] for i, uid in enumerate(user_ids) if row_counts[i] > 0}
+
+
+def fetch_active_user_ids(date: datetime, conn: Any = None) -> List[str]:
+    """
+    해당 날짜에 DailyPreprocessedSlot row 가 있는 user_id 목록 (정렬).
+    """
+    def run(c: Any) -> List[str]:
+        ph = placeholder(c)
+        query = f"""
+            SELECT DISTINCT user_id
+            FROM DailyPreprocessedSlot
+            WHERE timestamp BETWEEN {ph} AND {ph}
+            ORDER BY user_id;
+        """
+        cur = c.cursor()
+        try:
+            cur.execute(query, _day_range(date))
+            return [str(r[0]) for r in cur.fetchall()]
+        finally:
+            cur.close()
+
+    if conn is not None:
+        return run(conn)
+    with pooled_connection() as c:
+        return run(c)
+
+
+def slot_timestamps(date: datetime) -> np.ndarray:
+    """
+    해당 날짜의 144개 슬롯 시작 시각 (datetime64[m]).
+    """
+    day = np.datetime64(date.strftime("%Y-%m-%d"), "m")
+    return day + np.arange(SLOTS_PER_DAY) * np.timedelta64(SLOT_MINUTES, "m")
+
+
+def day_block_to_frame(day_raw: np.ndarray, date: datetime):
+    """
+    (144, len(RAW_COLS)) 블록 → 기존 빌드 경로용 raw DataFrame.
+    값이 하나도 없는 슬롯(row 미존재)은 제외해서 fetch_day_raw_from_rds 결과와 맞춘다.
+    """
+    import pandas as pd
+
+    present = ~np.isnan(day_raw).all(axis=1)
+    df = pd.DataFrame(day_raw[present], columns=RAW_COLS)
+    df.insert(0, "timestamp", pd.to_datetime(slot_timestamps(date)[present]))
+    return df
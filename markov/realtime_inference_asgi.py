@@ -0,0 +1,299 @@
+# realtime_inference_asgi.py
+# -*- coding: utf-8 -*-
+"""
+realtime_inference_many 와 같은 API 를 ASGI 앱으로 서빙 (동시 접속이 많을 때용).
+
+- 요청 검증 / 추론 / 오류 응답은 realtime_inference_many 함수를 그대로 사용 (계약 동일)
+    POST /inference, POST /inference/batch, GET /metrics, GET /
+- 캐시에 있는 모델 + stream 이 아닌 요청은 이벤트 루프에서 바로 추론 (수십 µs)
+- 캐시 miss 모델 로드, stream 요청 추론(링버퍼 + 증분 DTW), 배치 추론은
+  크기가 고정된 스레드 풀에서 실행 → 루프를 막지 않음
+- back-pressure: 처리 중 요청이 ASGI_MAX_IN_FLIGHT 이상이면 바로 503 (Retry-After)
+- timeout: ASGI_REQUEST_TIMEOUT_SEC 안에 끝나지 않으면 504
+    · 응답만 504 로 끊고 풀에 들어간 작업은 끝까지 돈다 (스레드는 중단할 수 없음)
+    · 그래서 풀 점유(제출 ~ 스레드 작업 종료)는 요청 수와 따로 센다:
+      ASGI_MAX_POOL_PENDING 이상이면 풀이 필요한 요청은 바로 503
+
+실행 (uvicorn 필요):
+    uvicorn realtime_inference_asgi:app --host 0.0.0.0 --port 5000
+    python realtime_inference_asgi.py --port 5000
+
+환경 변수:
+    ASGI_MODEL_THREADS        모델 로드 / 배치 추론 스레드 수 (기본 16)
+    ASGI_MAX_IN_FLIGHT        동시 처리 요청 상한 (기본 512)
+    ASGI_MAX_POOL_PENDING     스레드 풀에 제출된 미완료 작업 상한 (기본 0 → 모델 스레드 수 × 4)
+    ASGI_REQUEST_TIMEOUT_SEC  요청 처리 시간 상한 (기본 2.0)
+    ASGI_MAX_BODY_BYTES       요청 body 상한 (기본 1 MiB)
+"""
+
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import realtime_inference_many as core
+
+
+ASGI_MODEL_THREADS = int(os.environ.get("ASGI_MODEL_THREADS", "16"))
+ASGI_MAX_IN_FLIGHT = int(os.environ.get("ASGI_MAX_IN_FLIGHT", "512"))
+ASGI_MAX_POOL_PENDING = int(os.environ.get("ASGI_MAX_POOL_PENDING", "0"))  # 0: model_threads × 4
+ASGI_REQUEST_TIMEOUT_SEC = float(os.environ.get("ASGI_REQUEST_TIMEOUT_SEC", "2.0"))
+ASGI_MAX_BODY_BYTES = int(os.environ.get("ASGI_MAX_BODY_BYTES", str(1024 * 1024)))
+
+JSON_CONTENT_TYPE = b"application/json; charset=utf-8"
+
+Reply = Tuple[int, bytes, bytes, List[Tuple[bytes, bytes]]]
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class _PoolSaturated(Exception):
+    pass
+
+
+def _json_reply(obj: Dict[str, Any], status: int) -> Reply:
+    return status, json.dumps(obj, ensure_ascii=False).encode("utf-8"), JSON_CONTENT_TYPE, []
+
+
+def _error_reply(status: int, error: str, message: str) -> Reply:
+    return _json_reply({"error": error, "message": message}, status)
+
+
+class InferenceASGI:
+    """ASGI 3 앱. 설정별로 인스턴스를 만들 수 있다 (부하 테스트에서 파라미터 비교)."""
+
+    def __init__(
+        self,
+        model_threads: int = ASGI_MODEL_THREADS,
+        max_in_flight: int = ASGI_MAX_IN_FLIGHT,
+        max_pool_pending: int = ASGI_MAX_POOL_PENDING,
+        timeout_sec: float = ASGI_REQUEST_TIMEOUT_SEC,
+        max_body_bytes: int = ASGI_MAX_BODY_BYTES,
+        prefix: str = "mood_inference_asgi",
+    ) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout_sec = timeout_sec
+        self.max_body_bytes = max_body_bytes
+        model_threads = max(1, model_threads)
+        self.pool = ThreadPoolExecutor(max_workers=model_threads, thread_name_prefix="asgi-model")
+        self.max_pool_pending = max_pool_pending or model_threads * 4
+        self._in_flight = 0
+        # 풀 점유: 제출 시 +1, 스레드 작업이 끝날 때(done callback, 워커 스레드) -1
+        self._pool_pending = 0
+        self._pool_lock = threading.Lock()
+
+        registry = core.METRICS
+        self._requests_total = registry.counter(
+            f"{prefix}_http_requests_total", "HTTP 요청 수", ("endpoint", "method", "status"))
+        self._request_seconds = registry.histogram(
+            f"{prefix}_http_request_seconds", "HTTP 요청 처리 시간(초)", ("endpoint",))
+        self._in_flight_gauge = registry.gauge(
+            f"{prefix}_http_requests_in_flight", "처리 중인 HTTP 요청 수")
+        self._pool_pending_gauge = registry.gauge(
+            f"{prefix}_pool_pending", "스레드 풀에 제출됐지만 끝나지 않은 작업 수 (504 로 끊긴 요청 포함)")
+
+        self._routes: Dict[Tuple[str, str], Callable[[Dict[str, Any], Callable], Awaitable[Reply]]] = {
+            ("GET", "/"): self._health,
+            ("GET", "/metrics"): self._metrics,
+            ("POST", "/inference"): self._inference,
+            ("POST", "/inference/batch"): self._inference_batch,
+        }
+        self._paths = {path for _, path in self._routes}
+
+    # ------------------------------
+    # ASGI 진입점
+    # ------------------------------
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        t0 = time.perf_counter()
+        method, path = scope["method"], scope["path"]
+        handler = self._routes.get((method, path))
+        endpoint = path if path in self._paths else "unmatched"
+
+        if handler is None:
+            if path in self._paths:
+                reply = _error_reply(405, "method_not_allowed", f"{method} 은 지원하지 않습니다.")
+            else:
+                reply = _error_reply(404, "not_found", f"{path} 는 없는 경로입니다.")
+        elif self._in_flight >= self.max_in_flight:
+            reply = _error_reply(503, "overloaded", "처리 중인 요청이 많습니다. 잠시 후 다시 시도하세요.")
+            reply[3].append((b"retry-after", b"1"))
+        else:
+            self._in_flight += 1
+            self._in_flight_gauge.inc()
+            try:
+                reply = await asyncio.wait_for(handler(scope, receive), self.timeout_sec)
+            except asyncio.TimeoutError:
+                reply = _error_reply(504, "timeout", f"{self.timeout_sec}초 안에 처리하지 못했습니다.")
+            except _PoolSaturated:
+                reply = _error_reply(503, "overloaded", "모델 스레드 풀이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+                reply[3].append((b"retry-after", b"1"))
+            except _BodyTooLarge:
+                reply = _error_reply(413, "body_too_large", f"body 는 최대 {self.max_body_bytes} bytes 입니다.")
+            except Exception as e:
+                reply = _error_reply(500, "internal_error", str(e))
+            finally:
+                self._in_flight -= 1
+                self._in_flight_gauge.dec()
+
+        status, body, content_type, extra_headers = reply
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type),
+                        (b"content-length", str(len(body)).encode("ascii"))] + extra_headers,
+        })
+        await send({"type": "http.response.body", "body": body})
+
+        self._request_seconds.observe(time.perf_counter() - t0, endpoint=endpoint)
+        self._requests_total.inc(endpoint=endpoint, method=method, status=str(status))
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                core.MODEL_ROLLOVER.ensure_started()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                core.MODEL_ROLLOVER.stop()
+                self.pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, receive: Callable) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise _BodyTooLarge()
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _read_json(self, receive: Callable) -> Any:
+        body = await self._read_body(receive)
+        with core.INFERENCE_STAGES.span("parse"):
+            return json.loads(body)
+
+    async def _run_in_pool(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """풀에서 fn 실행. 미완료 작업이 max_pool_pending 이상이면 제출하지 않고 _PoolSaturated."""
+        with self._pool_lock:
+            if self._pool_pending >= self.max_pool_pending:
+                raise _PoolSaturated()
+            self._pool_pending += 1
+        self._pool_pending_gauge.inc()
+        try:
+            future = self.pool.submit(fn, *args)
+        except BaseException:
+            self._pool_done(None)
+            raise
+        future.add_done_callback(self._pool_done)
+        return await asyncio.wrap_future(future)
+
+    def _pool_done(self, _future: Any) -> None:
+        with self._pool_lock:
+            self._pool_pending -= 1
+        self._pool_pending_gauge.dec()
+
+    # ------------------------------
+    # 라우트
+    # ------------------------------
+
+    async def _health(self, scope, receive) -> Reply:
+        return 200, "Mood inference ASGI server is running.".encode("utf-8"), b"text/plain; charset=utf-8", []
+
+    async def _metrics(self, scope, receive) -> Reply:
+        body = core.METRICS.render().encode("utf-8")
+        return 200, body, b"text/plain; version=0.0.4; charset=utf-8", []
+
+    async def _inference(self, scope, receive) -> Reply:
+        today = datetime.now(timezone.utc)
+        try:
+            payload = await self._read_json(receive)
+        except ValueError:
+            return _error_reply(400, "invalid_json", "유효한 JSON body가 필요합니다.")
+
+        try:
+            req = core.parse_inference_request(payload)
+        except core.RequestError as e:
+            return _json_reply(e.body(), e.status)
+
+        try:
+            with core.INFERENCE_STAGES.span("model_load"):
+                model = core.peek_yesterday_model(req["user_id"], today)
+                if model is None:
+                    model = await self._run_in_pool(core.load_yesterday_model_runtime, req["user_id"], today)
+            if req["stream"]:
+                # 링버퍼 갱신 + 증분 DTW 는 window_length × K 비례 → 루프 밖에서
+                result = await self._run_in_pool(core.run_inference, req, model)
+            else:
+                result = core.run_inference(req, model)
+            return _json_reply(result, 200)
+        except _PoolSaturated:
+            raise
+        except Exception as e:
+            status, err = core.inference_error(e)
+            return _json_reply(err, status)
+
+    async def _inference_batch(self, scope, receive) -> Reply:
+        today = datetime.now(timezone.utc)
+        try:
+            payload = await self._read_json(receive)
+        except ValueError:
+            return _error_reply(400, "invalid_json", "유효한 JSON body가 필요합니다.")
+
+        try:
+            items, future_minutes = core.parse_batch_request(payload)
+        except core.RequestError as e:
+            return _json_reply(e.body(), e.status)
+
+        try:
+            results = await self._run_in_pool(core.run_inference_batch, items, today, future_minutes)
+        except _PoolSaturated:
+            raise
+        except Exception as e:
+            return _error_reply(500, "internal_error", str(e))
+        return _json_reply(core.batch_response(results), 200)
+
+
+app = InferenceASGI()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="mood 추론 ASGI 서버 (uvicorn)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn 이 필요합니다: pip install uvicorn", file=sys.stderr)
+        return 1
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,18 +35,63 @@
         "future_title": "...",
         "future_description": "..."
       }
+
+      body 에 "forecast_minutes": [10, 20, ..., 100] 을 주면 응답에 "forecast" 추가
+      → [{"minutes", "cluster_id", "title", "distribution": [K개 확률]}, ...]
+         (현재 클러스터에서 P1^step 으로 전파한 분포, 10분 단위로 FORECAST_MAX_MINUTES 까지,
+          범위 밖 / 10분 단위가 아닌 값은 400 invalid_forecast)
+
+      body 에 "stream": true 를 주면 유저별 최근 window_length 포인트 링버퍼에 이번 포인트를 넣고
+      응답에 "window" 추가 (24 포인트 윈도우를 DTW 로 centroids 에 할당한 결과)
+      → {"ready", "filled", "window_length", "cluster_id", "title", "dtw_distances"}
+         (ready=false 면 포인트가 아직 window_length 개 안 쌓인 것)
+
+    POST /inference/batch
+      Body(JSON): {"items": [위 /inference body, ...], "future_minutes": 30}
+      → {"results": [...], "n_ok": ..., "n_error": ...}
+         results[i] 는 items[i] 의 /inference 결과, 실패한 아이템은 {"index", "error", "message"}
+
+    GET /metrics
+      Prometheus text (단계별 시간: parse / model_load / features / predict / stream / explain,
+                       모델 캐시 hit / miss / eviction)
+
+- 모델은 (user_id, model_date) LRU 캐시(model_cache.ModelCache)에 보관
+    MODEL_CACHE_MAX_MB: 캐시 용량 (기본 256)
+    MODEL_CACHE_REVALIDATE_SEC: 모델 파일 stat 재확인 간격 (기본 5초)
+- 날짜별 공유 스토어(model_store, store_{YYYYMMDD}.mstore)가 있으면 유저 번들보다 먼저 조회
+    → pre-fork 워커들이 mmap 한 파일 하나(page cache 한 벌)를 공유
+- 자정 전환 pre-warm (model_rollover.ModelRollover): 백그라운드 스레드가 새 모델을 미리 로드,
+  새 모델이 아직 없는 유저는 404 대신 이전 날짜 모델로 응답
+    MODEL_PREWARM_INTERVAL_SEC: MODEL_DIR 스캔 간격 (기본 30, 0 이면 끔)
+    MODEL_FALLBACK_DAYS: 이전 날짜 모델로 대신 응답할 최대 일수 (기본 1, 0 이면 끔)
+    MODEL_PREWARM_CACHE_FRACTION: 캐시 사용량이 이 비율을 넘으면 더 미리 로드하지 않음 (기본 0.8)
+    MODEL_PREWARM_MAX_ENTRIES: 캐시 엔트리가 이 수 이상이면 더 미리 로드하지 않음 (기본 10000)
+    MODEL_PREWARM_FD_RESERVE: 남은 fd(RLIMIT_NOFILE - 열린 fd)가 이보다 적으면 더 미리 로드하지 않음 (기본 256)
+    공유 스토어가 있는 날짜는 유저별로 미리 로드하지 않는다 (워커마다 사본을 만들지 않음)
 """
 
 from __future__ import annotations
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
+import os
 
 import numpy as np
-import pandas as pd
 from flask import Flask, request, Response
 
+from feature_engine import (
+    FEATURE_COLS, compute_feature_matrix, compute_feature_point, raw_point_to_array, select_feature_cols,
+)
+from model_bundle import BUNDLE_SUFFIX, bundle_path, read_bundle
+from model_cache import ModelCache
+from model_rollover import ModelRollover
+from model_store import STORE_SUFFIX, open_store, store_path
+from markov_stats import transition_powers
+from stream_state import StreamRegistry
+from metrics import MetricsRegistry, StageTimer, instrument_flask_app
+from cluster_text import RENDER_VERSION, explain_cluster, render_cluster_texts  # noqa: F401
+
 # ==============================
 # 공통 설정
 # ==============================
@@ -55,9 +100,37 @@ app = Flask(__name__)
 BASE_DEBUG_DIR = Path("./debug_outputs")
 MODEL_DIR = BASE_DEBUG_DIR / "model"
 
-
-def clamp(v: float, lo: float, hi: float) -> float:
-    return max(lo, min(hi, v))
+MODEL_CACHE_MAX_MB = float(os.environ.get("MODEL_CACHE_MAX_MB", "256"))
+MODEL_CACHE_REVALIDATE_SEC = float(os.environ.get("MODEL_CACHE_REVALIDATE_SEC", "5"))
+MODEL_PREWARM_INTERVAL_SEC = float(os.environ.get("MODEL_PREWARM_INTERVAL_SEC", "30"))
+MODEL_FALLBACK_DAYS = int(os.environ.get("MODEL_FALLBACK_DAYS", "1"))
+MODEL_PREWARM_CACHE_FRACTION = float(os.environ.get("MODEL_PREWARM_CACHE_FRACTION", "0.8"))
+MODEL_PREWARM_MAX_ENTRIES = int(os.environ.get("MODEL_PREWARM_MAX_ENTRIES", "10000"))
+MODEL_PREWARM_FD_RESERVE = int(os.environ.get("MODEL_PREWARM_FD_RESERVE", "256"))
+INFERENCE_BATCH_MAX_ITEMS = int(os.environ.get("INFERENCE_BATCH_MAX_ITEMS", "1000"))
+# 로드 시 P1^1..P1^H 를 미리 계산해 두는 최대 horizon (분)
+FORECAST_MAX_MINUTES = int(os.environ.get("FORECAST_MAX_MINUTES", "360"))
+FORECAST_MAX_HORIZONS = 144
+# forecast_minutes 는 모델 슬롯 간격(빌드의 SLOT_MINUTES)의 배수만 허용
+FORECAST_STEP_MINUTES = 10
+# 스트리밍 모드 유저별 상태 (링버퍼 + 증분 DTW) 상한
+STREAM_MAX_USERS = int(os.environ.get("STREAM_MAX_USERS", "100000"))
+STREAM_IDLE_TTL_SEC = float(os.environ.get("STREAM_IDLE_TTL_SEC", "1800"))
+
+# 계측 (GET /metrics)
+METRICS = MetricsRegistry()
+INFERENCE_STAGES = StageTimer(METRICS.histogram(
+    "mood_inference_stage_seconds", "추론 단계별 소요 시간(초)", ("stage",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+))
+MODEL_LOADS_TOTAL = METRICS.counter(
+    "mood_inference_model_loads_total", "모델 로드 수 (source: store | bundle | legacy)", ("source",))
+BATCH_ITEMS_TOTAL = METRICS.counter(
+    "mood_inference_batch_items_total", "/inference/batch 아이템 수 (status: ok | error)", ("status",))
+instrument_flask_app(app, METRICS, "mood_inference")
+
+STREAMS = StreamRegistry(STREAM_MAX_USERS, STREAM_IDLE_TTL_SEC,
+                         registry=METRICS, prefix="mood_inference_stream")
 
 
 # ==============================
@@ -91,7 +164,7 @@ def build_raw_point_from_payload(payload: dict) -> dict:
         "recent_stress_index": payload["recent_stress_index"],
         "latest_sleep_score": payload["latest_sleep_score"],
         "latest_sleep_duration": payload["latest_sleep_duration"],
-        "temparature": payload["temperature"],
+        "temperature": payload["temperature"],
         "humidity": payload["humidity"],
         "rainType": payload["rainType"],
         "sky": payload["sky"],
@@ -106,225 +179,144 @@ def build_raw_point_from_payload(payload: dict) -> dict:
 # 2. feature 계산
 # ==============================
 
-def compute_feature_row(raw_row: pd.Series) -> Dict[str, float]:
-    """
-    raw_row: Series
-      - average_stress_index, recent_stress_index,
-        latest_sleep_score, latest_sleep_duration,
-        temperature, humidity, rainType, sky,
-        laughter, sigh
-
-    output:
-      5개 0~1 score (Stress/Calm/Fatigue/Vibrancy/Weather)
-    """
-    # --- Stress / Calm ---
-    avg_stress = raw_row["average_stress_index"] / 100.0
-    recent_stress = raw_row["recent_stress_index"] / 100.0
-    stress_raw = 0.4 * avg_stress + 0.6 * recent_stress
-    StressScore = clamp(stress_raw, 0.0, 1.0)
-
-    CalmScore = clamp(1.0 - StressScore * 0.9, 0.0, 1.0)
-
-    # --- Fatigue ---
-    sleep_score = raw_row["latest_sleep_score"] / 100.0
-    sleep_dur_norm = raw_row["latest_sleep_duration"] / 600.0
-    sleep_fatigue = clamp(1.0 - 0.7 * sleep_score - 0.3 * sleep_dur_norm, 0.0, 1.0)
-
-    sigh = raw_row["sigh"]
-    sigh_norm = clamp(sigh / 10.0, 0.0, 1.0)
-    FatigueScore = clamp(0.6 * sleep_fatigue + 0.4 * sigh_norm, 0.0, 1.0)
-
-    # --- Vibrancy ---
-    laughter = raw_row["laughter"]
-    laugh_norm = clamp(laughter / 10.0, 0.0, 1.0)
-    VibrancyScore = clamp(0.7 * laugh_norm + 0.3 * (1.0 - FatigueScore), 0.0, 1.0)
-
-    # --- Weather ---
-    temp = raw_row["temperature"]
-    temp_discomfort = abs((temp if temp is not None else 22.0) - 22.0) / 20.0
-
-    humid = raw_row["humidity"]
-    humid_discomfort = 0.0
-    if humid is not None:
-        humid_discomfort = max(0.0, (humid - 60.0) / 40.0)
-
-    rainType = raw_row["rainType"]
-    sky = raw_row["sky"]
-    rain_penalty = 0.0
-    if rainType == 1:
-        rain_penalty = 0.1
-    elif rainType in (2, 3):
-        rain_penalty = 0.2
-    sky_penalty = 0.0
-    if sky == 4:
-        sky_penalty = 0.05
-
-    discomfort = clamp(
-        temp_discomfort + humid_discomfort + rain_penalty + sky_penalty,
-        0.0,
-        1.5,
-    )
-    WeatherScore = clamp(1.0 - discomfort, 0.0, 1.0)
-
-    return {
-        "StressScore": StressScore,
-        "CalmScore": CalmScore,
-        "FatigueScore": FatigueScore,
-        "VibrancyScore": VibrancyScore,
-        "WeatherScore": WeatherScore,
-    }
-
-
 def feature_from_raw_point(raw_point: Dict[str, float],
                            feature_cols: List[str]) -> np.ndarray:
     """
     실시간 인풋(raw dict)을 받아서 feature 5개로 변환.
     feature_cols: meta["feature_cols"] 순서
     """
-    row = pd.Series(raw_point)
-    scores = compute_feature_row(row)
-    return np.array([scores[c] for c in feature_cols], dtype=float)
+    feats = compute_feature_point(raw_point)
+    if list(feature_cols) != FEATURE_COLS:
+        feats = [feats[FEATURE_COLS.index(c)] for c in feature_cols]
+    return np.array(feats, dtype=float)
 
 
 # ==============================
 # 3. 클러스터 자연어 설명
 # ==============================
 
-def _describe_level(x: float, low=0.33, high=0.66,
-                    words=("낮은", "보통인", "높은")) -> str:
-    if x < low:
-        return words[0]
-    elif x > high:
-        return words[2]
-    else:
-        return words[1]
-
-
-def _overall_mood_title(valence: float, arousal: float,
-                        stress: float, fatigue: float, vibrancy: float) -> str:
-    if valence > 0.7 and arousal > 0.55:
-        base = "활력이 느껴지는 긍정 상태"
-    elif valence > 0.7 and arousal <= 0.55:
-        base = "편안한 긍정 상태"
-    elif valence > 0.2:
-        base = "안정적인 중립~긍정 상태"
-    elif valence < -0.3 and arousal < 0.4:
-        base = "기운이 빠진 다운 상태"
-    elif valence < -0.3 and arousal >= 0.4:
-        base = "예민하거나 긴장된 상태"
-    else:
-        base = "복합적인 감정 상태"
-
-    stress_level = _describe_level(stress, words=("낮은", "보통인", "높은"))
-    fatigue_level = _describe_level(fatigue, words=("낮은", "보통인", "높은"))
-    vib_level = _describe_level(vibrancy, words=("낮은", "보통인", "높은"))
-
-    if "긍정" in base and fatigue_level == "낮은" and vib_level == "높은":
-        return "에너지가 좋은 상향 긍정 상태"
-    if "긍정" in base and fatigue_level == "보통인" and vib_level == "낮은":
-        return "기분은 괜찮지만 조금 지친 긍정 상태"
-    if "다운" in base and stress_level == "높은":
-        return "지치고 부담이 큰 다운 상태"
-    if "편안한 긍정" in base and fatigue_level != "높은":
-        return "잔잔하고 편안한 긍정 상태"
-
-    return base
-
-
-def explain_cluster(summary: dict) -> Tuple[str, str]:
+def resolve_cluster_texts(meta: Dict[str, Any]) -> List[Dict[str, str]]:
     """
-    cluster_summaries[k] 하나를 받아서
-    (title, description) 반환.
+    빌드 시 렌더링해 둔 cluster_texts 를 사용.
+    없거나(예전 모델) 문구 규칙 버전(RENDER_VERSION)이 다르면 로드 시점에 다시 렌더링.
     """
-    s = summary["mean_scores"]
-    Stress = float(s["StressScore"])
-    Calm = float(s["CalmScore"])
-    Fatigue = float(s["FatigueScore"])
-    Vibrancy = float(s["VibrancyScore"])
-    Weather = float(s["WeatherScore"])
-    val = float(summary["valence"])
-    aro = float(summary["arousal"])
-
-    title = _overall_mood_title(val, aro, Stress, Fatigue, Vibrancy)
-
-    parts: List[str] = []
-
-    if val > 0.7:
-        parts.append("전반적으로 기분이 꽤 좋은 편이에요.")
-    elif val > 0.2:
-        parts.append("전반적으로 무난하고 안정적인 감정 상태예요.")
-    elif val > -0.2:
-        parts.append("크게 좋지도 나쁘지도 않은 보통 감정 상태예요.")
-    else:
-        parts.append("조금은 기분이 가라앉아 있는 편이에요.")
-
-    if aro > 0.6:
-        parts.append("에너지가 올라와 있고, 뭔가를 해볼 수 있는 여유가 느껴져요.")
-    elif aro > 0.4:
-        parts.append("적당한 에너지가 있어서 일상적인 일을 하기에는 무리가 없어요.")
-    else:
-        parts.append("에너지가 다소 떨어져 있어서 무리한 활동보다는 휴식이 잘 어울리는 상태예요.")
-
-    if Stress > 0.6:
-        parts.append("스트레스나 긴장은 비교적 높은 편이라, 스스로를 좀 더 보호해 줄 필요가 있어요.")
-    elif Stress < 0.4:
-        parts.append("스트레스 수준은 낮은 편이라 크게 압박을 느끼고 있지는 않아요.")
-
-    if Calm > 0.65:
-        parts.append("마음은 꽤 차분하고 안정적인 상태예요.")
-    elif Calm < 0.45:
-        parts.append("마음이 다소 산만하거나 불안정하게 느껴질 수 있어요.")
-
-    if Fatigue > 0.6:
-        parts.append("피로감이 많이 쌓여 있어서 충분한 휴식이 필요해 보여요.")
-    elif Fatigue > 0.35:
-        parts.append("어느 정도 피로가 느껴지지만, 완전히 지친 수준은 아니어요.")
-    else:
-        parts.append("피로감은 크지 않은 편이라 컨디션은 비교적 괜찮아요.")
-
-    if Vibrancy > 0.6:
-        parts.append("흥미나 즐거움이 잘 느껴지는 상태예요.")
-    elif Vibrancy < 0.3:
-        parts.append("흥미나 설렘은 다소 낮아서, 새로운 자극보다는 익숙한 것이 편할 수 있어요.")
-
-    if Weather > 0.7:
-        parts.append("외부 환경이나 날씨도 컨디션을 크게 방해하지는 않는 편이에요.")
-    elif Weather < 0.4:
-        parts.append("날씨나 환경이 컨디션에 조금 부정적인 영향을 줄 수 있어요.")
-
-    description = " ".join(parts)
-    return title, description
+    texts = meta.get("cluster_texts")
+    summaries = meta["cluster_summaries"]
+    if (texts is None
+            or meta.get("cluster_text_version") != RENDER_VERSION
+            or len(texts) != len(summaries)):
+        return render_cluster_texts(summaries)
+    return texts
 
 
 # ==============================
 # 4. 어제 모델 로드
 # ==============================
 
-def load_yesterday_model_runtime(user_id: str, today: datetime) -> Dict[str, Any]:
+def locate_model_artifact(user_id: str, model_date: datetime) -> Path:
     """
-    today 기준으로 '어제' 날짜의 모델 메타를 읽어서
-    실시간 추론에 사용할 runtime_model dict로 변환.
+    모델 파일 경로: 날짜별 공유 스토어 → 번들({prefix}_yesterday_model.bundle) → legacy meta json 순.
+    - 스토어에 유저가 있어도 유저 번들이 스토어보다 나중에 다시 빌드됐으면 번들 사용
+    모두 없으면 FileNotFoundError.
     """
-    yesterday = today - timedelta(days=1)
-    date_str = yesterday.strftime("%Y%m%d")
-    prefix = f"{user_id}_{date_str}"
+    prefix = f"{user_id}_{model_date.strftime('%Y%m%d')}"
+    bundle_file = bundle_path(MODEL_DIR, prefix)
+    store = open_store(store_path(MODEL_DIR, model_date))
+    if store is not None and user_id in store:
+        try:
+            if bundle_file.stat().st_mtime_ns <= store.path.stat().st_mtime_ns:
+                return store.path
+        except FileNotFoundError:
+            return store.path
+        return bundle_file
+    if bundle_file.exists():
+        return bundle_file
     meta_path = MODEL_DIR / f"{prefix}_yesterday_model_meta.json"
+    if meta_path.exists():
+        return meta_path
+    raise FileNotFoundError(f"Model not found: {bundle_file}")
+
 
-    if not meta_path.exists():
-        raise FileNotFoundError(f"Model meta not found: {meta_path}")
+def list_model_users(model_date: datetime) -> set:
+    """model_date 모델 파일(공유 스토어 / 번들 / legacy meta json)이 있는 user_id 집합."""
+    date_str = model_date.strftime("%Y%m%d")
+    users = set()
+    store = open_store(store_path(MODEL_DIR, model_date))
+    if store is not None:
+        users.update(k.decode("utf-8") for k in store.keys.tolist())
+    for tail in (BUNDLE_SUFFIX, "_yesterday_model_meta.json"):
+        tail = f"_{date_str}{tail}"
+        users.update(p.name[:-len(tail)] for p in MODEL_DIR.glob(f"*{tail}"))
+    return users
 
-    with meta_path.open("r", encoding="utf-8") as f:
+
+def attach_forecast_powers(runtime_model: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    runtime_model["forecast_powers"]: (H, K, K), [h-1] = P1^h (h = 1..FORECAST_MAX_MINUTES // freq)
+    모델 로드 시 한 번만 계산 → 요청마다 matrix_power 를 하지 않는다.
+    스토어에서 읽은 모델은 미리 계산된 forecast_powers(mmap view)가 충분히 길면 그대로 slice.
+    """
+    max_steps = max(1, FORECAST_MAX_MINUTES // runtime_model["freq_minutes"])
+    packed = runtime_model.get("forecast_powers")
+    if packed is not None and packed.shape[0] >= max_steps:
+        runtime_model["forecast_powers"] = packed[:max_steps]
+        return runtime_model
+    runtime_model["forecast_powers"] = transition_powers(runtime_model["P1"], range(1, max_steps + 1))
+    return runtime_model
+
+
+def load_model_artifact(user_id: str, model_date: datetime, path: Path) -> Dict[str, Any]:
+    """
+    모델 파일 하나를 읽어서 실시간 추론에 사용할 runtime_model dict로 변환.
+
+    - 공유 스토어면 index probe + slice (배열은 스토어 mmap 의 view, 스토어당 mmap 1개)
+    - 번들이면 파일 하나를 통째로 읽어서 복사 (유저별 배열은 작고, 캐시 엔트리마다
+      mmap / fd 를 들고 있으면 엔트리 수가 fd 한도를 넘는다)
+    - legacy meta json 이면 예전 방식(meta json + 배열별 npy)으로 읽는다
+    """
+    if path.name.endswith(STORE_SUFFIX) or path.name.endswith(BUNDLE_SUFFIX):
+        if path.name.endswith(STORE_SUFFIX):
+            store = open_store(path)
+            found = store.lookup(user_id) if store is not None else None
+            if found is None:
+                raise FileNotFoundError(f"Model not found in store: {user_id} ({path})")
+            arrays, meta = found
+            MODEL_LOADS_TOTAL.inc(source="store")
+        else:
+            arrays, meta = read_bundle(path, use_mmap=False)
+            MODEL_LOADS_TOTAL.inc(source="bundle")
+        return attach_forecast_powers({
+            "user_id": user_id,
+            "model_date": model_date,
+            "meta_path": str(path),
+            "freq_minutes": meta["freq_minutes"],
+            "window_length": meta["window_length"],
+            "K": meta["K"],
+            "feature_cols": meta["feature_cols"],
+            "centroids": arrays["centroids"],
+            "endpoint_means": arrays["endpoint_means"],
+            "P1": arrays["P1"],
+            "P3": arrays["P3"],
+            "P1_power_steps": meta.get("P1_power_steps", []),
+            "P1_powers": arrays.get("P1_powers"),
+            "forecast_powers": arrays.get("forecast_powers"),
+            "cluster_summaries": meta["cluster_summaries"],
+            "cluster_texts": resolve_cluster_texts(meta),
+        })
+
+    with path.open("r", encoding="utf-8") as f:
         meta = json.load(f)
 
     centroids = np.load(meta["centroids_npy"])
     endpoint_means = np.load(meta["endpoint_means_npy"])
     P1 = np.load(meta["P1_npy"])
     P3 = np.load(meta["P3_npy"])
+    MODEL_LOADS_TOTAL.inc(source="legacy")
 
     runtime_model = {
         "user_id": user_id,
-        "model_date": yesterday,
-        "meta_path": str(meta_path),
+        "model_date": model_date,
+        "meta_path": str(path),
         "freq_minutes": meta["freq_minutes"],
         "window_length": meta["window_length"],
         "K": meta["K"],
@@ -334,18 +326,119 @@ def load_yesterday_model_runtime(user_id: str, today: datetime) -> Dict[str, Any
         "P1": P1,
         "P3": P3,
         "cluster_summaries": meta["cluster_summaries"],
+        "cluster_texts": resolve_cluster_texts(meta),
     }
-    return runtime_model
+    return attach_forecast_powers(runtime_model)
+
+
+MODEL_CACHE = ModelCache(
+    locate_model_artifact,
+    load_model_artifact,
+    max_bytes=int(MODEL_CACHE_MAX_MB * 1024 * 1024),
+    revalidate_sec=MODEL_CACHE_REVALIDATE_SEC,
+    registry=METRICS,
+    prefix="mood_inference_model_cache",
+)
+
+
+MODEL_ROLLOVER = ModelRollover(
+    MODEL_CACHE,
+    list_model_users,
+    MODEL_DIR,
+    scan_interval_sec=MODEL_PREWARM_INTERVAL_SEC,
+    fallback_days=MODEL_FALLBACK_DAYS,
+    cache_fraction=MODEL_PREWARM_CACHE_FRACTION,
+    max_entries=MODEL_PREWARM_MAX_ENTRIES,
+    fd_reserve=MODEL_PREWARM_FD_RESERVE,
+    registry=METRICS,
+    prefix="mood_inference_model_prewarm",
+)
+
+
+def load_yesterday_model_runtime(user_id: str, today: datetime) -> Dict[str, Any]:
+    """
+    today 기준으로 '어제' 날짜의 모델 (MODEL_ROLLOVER → MODEL_CACHE 경유).
+    어제 모델이 아직 없으면 MODEL_FALLBACK_DAYS 안의 이전 날짜 모델.
+    반환된 dict 와 배열은 여러 요청이 공유하므로 수정하지 않는다.
+    """
+    yesterday = today - timedelta(days=1)
+    return MODEL_ROLLOVER.load(user_id, yesterday)
+
+
+def peek_yesterday_model(user_id: str, today: datetime) -> Optional[Dict[str, Any]]:
+    """캐시에 최근 확인된 모델이 있으면 바로 반환 (디스크 I/O 없음), 없으면 None."""
+    return MODEL_ROLLOVER.peek(user_id, today - timedelta(days=1))
 
 
 # ==============================
 # 5. 심플 JSON inference (단일 유저)
 # ==============================
 
+def transition_matrix_for(yesterday_model: Dict[str, Any], future_minutes: int) -> np.ndarray:
+    """future_minutes 뒤 전이행렬 (K, K)."""
+    freq = yesterday_model["freq_minutes"]
+    step = max(1, future_minutes // freq)
+
+    if step == 3:
+        return np.asarray(yesterday_model["P3"])
+    if step == 1:
+        return np.asarray(yesterday_model["P1"])
+    powers = yesterday_model.get("forecast_powers")
+    if powers is not None and step <= len(powers):
+        # 로드 시 미리 계산해 둔 P1^step
+        return powers[step - 1]
+    if step in yesterday_model.get("P1_power_steps", []):
+        # 빌드 시 미리 계산해 둔 P1^step
+        idx = yesterday_model["P1_power_steps"].index(step)
+        return np.asarray(yesterday_model["P1_powers"][idx])
+    return np.linalg.matrix_power(np.asarray(yesterday_model["P1"]), step)
+
+
+def parse_forecast_minutes(value: Any, freq_minutes: int = FORECAST_STEP_MINUTES) -> List[int]:
+    """
+    body 의 forecast_minutes → 양의 정수 리스트. 형식이 틀리면 ValueError.
+    각 값은 1~FORECAST_MAX_MINUTES 사이 freq_minutes 의 배수 (P1^h 의 step 과 정확히 맞도록).
+    """
+    if not isinstance(value, list) or not value:
+        raise ValueError("forecast_minutes 는 비어 있지 않은 정수 배열이어야 합니다.")
+    if len(value) > FORECAST_MAX_HORIZONS:
+        raise ValueError(f"forecast_minutes 는 최대 {FORECAST_MAX_HORIZONS}개입니다.")
+    minutes = []
+    for m in value:
+        if isinstance(m, bool) or not isinstance(m, int) or not 0 < m <= FORECAST_MAX_MINUTES:
+            raise ValueError(f"forecast_minutes 값은 1~{FORECAST_MAX_MINUTES} 사이 정수여야 합니다: {m!r}")
+        if m % freq_minutes:
+            raise ValueError(f"forecast_minutes 값은 {freq_minutes}분 단위여야 합니다: {m!r}")
+        minutes.append(m)
+    return minutes
+
+
+def forecast_distributions(
+    yesterday_model: Dict[str, Any],
+    current_cluster: int,
+    forecast_minutes: Sequence[int],
+) -> np.ndarray:
+    """
+    현재 클러스터(one-hot) × 쌓아 둔 P1^step → (len(forecast_minutes), K) 분포.
+    """
+    freq = yesterday_model["freq_minutes"]
+    steps = np.array([max(1, m // freq) for m in forecast_minutes], dtype=np.int64)
+
+    powers = yesterday_model.get("forecast_powers")
+    if powers is None or steps.max() > len(powers):
+        powers = transition_powers(yesterday_model["P1"], range(1, int(steps.max()) + 1))
+
+    p0 = np.zeros(powers.shape[-1])
+    p0[current_cluster] = 1.0
+    return p0 @ powers[steps - 1]
+
+
 def infer_state_simple(
     raw_point: Dict[str, float],
     yesterday_model: Dict[str, Any],
     future_minutes: int = 30,
+    forecast_minutes: Optional[Sequence[int]] = None,
+    stream: bool = False,
 ) -> Dict[str, Any]:
     """
     출력 필드:
@@ -353,46 +446,307 @@ def infer_state_simple(
       - inference_time (UTC ISO string)
       - current_id, current_title, current_description
       - future_id, future_title, future_description
+      - forecast (forecast_minutes 가 있을 때만)
+      - window (stream=True 일 때만, 윈도우 DTW 할당)
     """
     feature_cols = yesterday_model["feature_cols"]
-    feat_vec = feature_from_raw_point(raw_point, feature_cols)
+    with INFERENCE_STAGES.span("features"):
+        feat_vec = feature_from_raw_point(raw_point, feature_cols)
+
+    with INFERENCE_STAGES.span("predict"):
+        endpoint_means = np.array(yesterday_model["endpoint_means"])
+        dists = np.linalg.norm(endpoint_means - feat_vec[None, :], axis=1)
+        current_cluster = int(dists.argmin())
+
+        P = transition_matrix_for(yesterday_model, future_minutes)
+        transition_row = P[current_cluster]
+        future_cluster = int(transition_row.argmax())
+
+        if forecast_minutes:
+            trajectory = forecast_distributions(yesterday_model, current_cluster, forecast_minutes)
+
+    if stream:
+        with INFERENCE_STAGES.span("stream"):
+            window = STREAMS.update(yesterday_model["user_id"], yesterday_model["centroids"], feat_vec)
+
+    with INFERENCE_STAGES.span("explain"):
+        texts = yesterday_model.get("cluster_texts")
+        if texts is None:
+            texts = render_cluster_texts(yesterday_model["cluster_summaries"])
+        cur_title, cur_desc = texts[current_cluster]["title"], texts[current_cluster]["description"]
+        fut_title, fut_desc = texts[future_cluster]["title"], texts[future_cluster]["description"]
+
+        result = {
+            "user_id": yesterday_model["user_id"],
+            "inference_time": datetime.now(timezone.utc).isoformat(),
+            "current_id": current_cluster,
+            "current_title": cur_title,
+            "current_description": cur_desc,
+            "future_id": future_cluster,
+            "future_title": fut_title,
+            "future_description": fut_desc,
+        }
+        if forecast_minutes:
+            forecast = []
+            for m, dist in zip(forecast_minutes, trajectory.tolist()):
+                k = max(range(len(dist)), key=dist.__getitem__)
+                forecast.append({
+                    "minutes": m,
+                    "cluster_id": k,
+                    "title": texts[k]["title"],
+                    "distribution": dist,
+                })
+            result["forecast"] = forecast
+        if stream:
+            k = window["cluster_id"]
+            window["title"] = texts[k]["title"] if k is not None else None
+            result["window"] = window
+    return result
 
-    endpoint_means = np.array(yesterday_model["endpoint_means"])
-    dists = np.linalg.norm(endpoint_means - feat_vec[None, :], axis=1)
-    current_cluster = int(dists.argmin())
 
-    freq = yesterday_model["freq_minutes"]
-    step = max(1, future_minutes // freq)
+# ==============================
+# 5-2. 배치 inference (여러 유저 / 여러 포인트)
+# ==============================
 
-    if step == 3:
-        P = np.array(yesterday_model["P3"])
-    elif step == 1:
-        P = np.array(yesterday_model["P1"])
-    else:
-        P1 = np.array(yesterday_model["P1"])
-        P = np.linalg.matrix_power(P1, step)
+def infer_states_batch(
+    raw: np.ndarray,
+    models: List[Dict[str, Any]],
+    model_idx: np.ndarray,
+    future_minutes: int = 30,
+) -> List[Dict[str, Any]]:
+    """
+    raw: (N, len(RAW_COLS)) 아이템별 raw point
+    models: 유저별 모델 (중복 없이), model_idx: (N,) 아이템 → models 인덱스
+    output: 아이템 순서대로 infer_state_simple 과 같은 필드의 dict
+
+    feature 는 N개를 한 번에 계산하고, endpoint_means / 전이행렬은
+    shape 와 feature_cols 가 같은 모델끼리 쌓아서 최근접 탐색과 전이 row 조회를 한 번에 한다.
+    """
+    n = raw.shape[0]
+    current = np.zeros(n, dtype=np.int64)
+    future = np.zeros(n, dtype=np.int64)
+
+    with INFERENCE_STAGES.span("features"):
+        feats = compute_feature_matrix(raw)
+
+    with INFERENCE_STAGES.span("predict"):
+        groups: Dict[Tuple[Any, ...], List[int]] = {}
+        for j, m in enumerate(models):
+            key = (np.shape(m["endpoint_means"]), tuple(m["feature_cols"]))
+            groups.setdefault(key, []).append(j)
+
+        local = np.zeros(len(models), dtype=np.int64)
+        for (_, cols), members in groups.items():
+            local[members] = np.arange(len(members))
+            items = np.flatnonzero(np.isin(model_idx, members))
+            if items.size == 0:
+                continue
+            g = local[model_idx[items]]
+
+            E = np.stack([np.asarray(models[j]["endpoint_means"]) for j in members])       # (G, K, F)
+            P = np.stack([transition_matrix_for(models[j], future_minutes) for j in members])  # (G, K, K)
+
+            f = select_feature_cols(feats[items], list(cols))                              # (n, F)
+            dists = np.linalg.norm(E[g] - f[:, None, :], axis=2)                          # (n, K)
+            cur = dists.argmin(axis=1)
+            current[items] = cur
+            future[items] = P[g, cur].argmax(axis=1)
+
+    with INFERENCE_STAGES.span("explain"):
+        inference_time = datetime.now(timezone.utc).isoformat()
+        text_table = []
+        for m in models:
+            texts = m.get("cluster_texts")
+            text_table.append(texts if texts is not None else render_cluster_texts(m["cluster_summaries"]))
+
+        results = []
+        for i in range(n):
+            m = models[model_idx[i]]
+            texts = text_table[model_idx[i]]
+            cur, fut = int(current[i]), int(future[i])
+            results.append({
+                "user_id": m["user_id"],
+                "inference_time": inference_time,
+                "current_id": cur,
+                "current_title": texts[cur]["title"],
+                "current_description": texts[cur]["description"],
+                "future_id": fut,
+                "future_title": texts[fut]["title"],
+                "future_description": texts[fut]["description"],
+            })
+    return results
+
+
+def _item_error(index: int, error: str, message: str) -> Dict[str, Any]:
+    return {"index": index, "error": error, "message": message}
+
+
+def run_inference_batch(
+    items: List[Any],
+    today: datetime,
+    future_minutes: int = 30,
+) -> List[Dict[str, Any]]:
+    """
+    /inference/batch 본체. 아이템별 검증 / 모델 로드 오류는 그 아이템 결과에만 담고
+    나머지 아이템은 정상 처리한다.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+    # 1) payload → raw 배열 (아이템별 검증)
+    valid: List[int] = []
+    rows: List[np.ndarray] = []
+    user_of: List[str] = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i] = _item_error(i, "invalid_payload", "아이템은 object 형태여야 합니다.")
+            continue
+        user_id = item.get("user_id")
+        if not user_id:
+            results[i] = _item_error(i, "missing_user_id", "user_id가 필요합니다.")
+            continue
+        try:
+            rows.append(raw_point_to_array(build_raw_point_from_payload(item)))
+        except KeyError as e:
+            results[i] = _item_error(i, "missing_field", f"필수 필드가 없습니다: {e}")
+            continue
+        except (TypeError, ValueError) as e:
+            results[i] = _item_error(i, "invalid_value", str(e))
+            continue
+        valid.append(i)
+        user_of.append(str(user_id))
+
+    # 2) 유저별 모델 로드 (같은 유저는 1번)
+    models: List[Dict[str, Any]] = []
+    model_pos: Dict[str, int] = {}
+    load_errors: Dict[str, Tuple[str, str]] = {}
+    with INFERENCE_STAGES.span("model_load"):
+        for user_id in dict.fromkeys(user_of):
+            try:
+                model = load_yesterday_model_runtime(user_id, today)
+            except FileNotFoundError as e:
+                load_errors[user_id] = ("model_not_found", str(e))
+                continue
+            except Exception as e:
+                load_errors[user_id] = ("internal_error", str(e))
+                continue
+            model_pos[user_id] = len(models)
+            models.append(model)
+
+    keep = []
+    for k, (i, user_id) in enumerate(zip(valid, user_of)):
+        if user_id in load_errors:
+            results[i] = _item_error(i, *load_errors[user_id])
+        else:
+            keep.append(k)
+
+    # 3) 벡터화 추론
+    if keep:
+        raw = np.stack([rows[k] for k in keep])
+        model_idx = np.array([model_pos[user_of[k]] for k in keep], dtype=np.int64)
+        for k, res in zip(keep, infer_states_batch(raw, models, model_idx, future_minutes)):
+            results[valid[k]] = res
+
+    n_error = sum(1 for r in results if "error" in r)
+    BATCH_ITEMS_TOTAL.inc(len(results) - n_error, status="ok")
+    BATCH_ITEMS_TOTAL.inc(n_error, status="error")
+    return results
+
+
+# ==============================
+# 5-3. 요청 검증 / 오류 응답 (Flask 앱, ASGI 앱 공용)
+# ==============================
+
+class RequestError(Exception):
+    """요청 body 가 잘못됨 → status + {"error", "message"}."""
 
-    transition_row = P[current_cluster]
-    future_cluster = int(transition_row.argmax())
+    def __init__(self, status: int, error: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.error = error
+        self.message = message
 
-    cur_summary = yesterday_model["cluster_summaries"][current_cluster]
-    fut_summary = yesterday_model["cluster_summaries"][future_cluster]
+    def body(self) -> Dict[str, str]:
+        return {"error": self.error, "message": self.message}
 
-    cur_title, cur_desc = explain_cluster(cur_summary)
-    fut_title, fut_desc = explain_cluster(fut_summary)
+
+def parse_inference_request(payload: Any) -> Dict[str, Any]:
+    """
+    /inference body → {"user_id", "raw_point", "forecast_minutes", "stream"}
+    """
+    if not isinstance(payload, dict):
+        raise RequestError(400, "invalid_payload", "JSON body는 object 형태여야 합니다.")
+
+    user_id = payload.get("user_id")
+    if not user_id:
+        raise RequestError(400, "missing_user_id", "user_id가 body에 필요합니다.")
+
+    forecast_minutes = None
+    if payload.get("forecast_minutes") is not None:
+        try:
+            forecast_minutes = parse_forecast_minutes(payload["forecast_minutes"])
+        except ValueError as e:
+            raise RequestError(400, "invalid_forecast", str(e))
+
+    try:
+        raw_point = build_raw_point_from_payload(payload)
+    except KeyError as e:
+        raise RequestError(400, "missing_field", f"필수 필드가 없습니다: {e}")
 
     return {
-        "user_id": yesterday_model["user_id"],
-        "inference_time": datetime.datetime.now(datetime.UTC).isoformat(),
-        "current_id": current_cluster,
-        "current_title": cur_title,
-        "current_description": cur_desc,
-        "future_id": future_cluster,
-        "future_title": fut_title,
-        "future_description": fut_desc,
+        "user_id": user_id,
+        "raw_point": raw_point,
+        "forecast_minutes": forecast_minutes,
+        "stream": bool(payload.get("stream", False)),
     }
 
 
+def run_inference(req: Dict[str, Any], yesterday_model: Dict[str, Any]) -> Dict[str, Any]:
+    freq = yesterday_model["freq_minutes"]
+    if req["forecast_minutes"] and freq != FORECAST_STEP_MINUTES:
+        # 슬롯 간격이 다른 모델: 그 모델 간격으로 다시 검증
+        try:
+            parse_forecast_minutes(req["forecast_minutes"], freq)
+        except ValueError as e:
+            raise RequestError(400, "invalid_forecast", str(e))
+    return infer_state_simple(
+        raw_point=req["raw_point"],
+        yesterday_model=yesterday_model,
+        future_minutes=30,
+        forecast_minutes=req["forecast_minutes"],
+        stream=req["stream"],
+    )
+
+
+def inference_error(e: Exception) -> Tuple[int, Dict[str, str]]:
+    """모델 로드 / 추론 중 예외 → (status, body)."""
+    if isinstance(e, RequestError):
+        return e.status, e.body()
+    if isinstance(e, KeyError):
+        return 400, {"error": "missing_field", "message": f"필수 필드가 없습니다: {e}"}
+    if isinstance(e, FileNotFoundError):
+        return 404, {"error": "model_not_found", "message": str(e)}
+    return 500, {"error": "internal_error", "message": str(e)}
+
+
+def parse_batch_request(payload: Any) -> Tuple[List[Any], int]:
+    """/inference/batch body → (items, future_minutes)."""
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise RequestError(400, "invalid_payload", "JSON body는 items 배열을 가진 object 여야 합니다.")
+    if len(items) > INFERENCE_BATCH_MAX_ITEMS:
+        raise RequestError(413, "batch_too_large", f"items 는 최대 {INFERENCE_BATCH_MAX_ITEMS}개입니다.")
+
+    future_minutes = payload.get("future_minutes", 30)
+    if isinstance(future_minutes, bool) or not isinstance(future_minutes, int) or future_minutes <= 0:
+        raise RequestError(400, "invalid_payload", "future_minutes 는 양의 정수여야 합니다.")
+    return items, future_minutes
+
+
+def batch_response(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    n_error = sum(1 for r in results if "error" in r)
+    return {"results": results, "n_ok": len(results) - n_error, "n_error": n_error}
+
+
 # ==============================
 # 6. Flask 서버 세팅 (POST /inference)
 # ==============================
@@ -407,58 +761,54 @@ def inference():
     """
     POST http://localhost:5000/inference   
     """
-    now = datetime.datetime.now(datetime.UTC)
-    today = now
+    today = datetime.now(timezone.utc)
 
     try:
-        payload = request.get_json(force=True, silent=False)
+        with INFERENCE_STAGES.span("parse"):
+            payload = request.get_json(force=True, silent=False)
     except Exception:
-        err = {"error": "invalid_json", "message": "유효한 JSON body가 필요합니다."}
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=400, mimetype="application/json; charset=utf-8")
+        return _json_response({"error": "invalid_json", "message": "유효한 JSON body가 필요합니다."}, 400)
 
-    if not isinstance(payload, dict):
-        err = {"error": "invalid_payload", "message": "JSON body는 object 형태여야 합니다."}
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=400, mimetype="application/json; charset=utf-8")
-
-    user_id = payload.get("user_id")
-    if not user_id:
-        err = {"error": "missing_user_id", "message": "user_id가 body에 필요합니다."}
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=400, mimetype="application/json; charset=utf-8")
+    try:
+        req = parse_inference_request(payload)
+    except RequestError as e:
+        return _json_response(e.body(), e.status)
 
     try:
-        # 1) payload → raw_point 변환
-        raw_point = build_raw_point_from_payload(payload)
+        with INFERENCE_STAGES.span("model_load"):
+            yesterday_model = load_yesterday_model_runtime(req["user_id"], today)
+        return _json_response(run_inference(req, yesterday_model), 200)
+    except Exception as e:
+        status, err = inference_error(e)
+        return _json_response(err, status)
 
-        # 2) 어제 모델 로드
-        yesterday_model = load_yesterday_model_runtime(user_id, today)
 
-        # 3) 인퍼런스
-        result = infer_state_simple(
-            raw_point=raw_point,
-            yesterday_model=yesterday_model,
-            future_minutes=30,
-        )
+def _json_response(obj: Dict[str, Any], status: int) -> Response:
+    body = json.dumps(obj, ensure_ascii=False)
+    return Response(body, status=status, mimetype="application/json; charset=utf-8")
 
-        body = json.dumps(result, ensure_ascii=False)
-        return Response(body, status=200, mimetype="application/json; charset=utf-8")
 
-    except KeyError as e:
-        err = {
-            "error": "missing_field",
-            "message": f"필수 필드가 없습니다: {e}"
-        }
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=400, mimetype="application/json; charset=utf-8")
+@app.route("/inference/batch", methods=["POST"])
+def inference_batch():
+    """
+    POST http://localhost:5000/inference/batch
+    본문 전체가 잘못되면 4xx, 아이템별 오류는 200 + results[i].error
+    """
+    today = datetime.now(timezone.utc)
+
+    try:
+        with INFERENCE_STAGES.span("parse"):
+            payload = request.get_json(force=True, silent=False)
+    except Exception:
+        return _json_response({"error": "invalid_json", "message": "유효한 JSON body가 필요합니다."}, 400)
 
-    except FileNotFoundError as e:
-        err = {"error": "model_not_found", "message": str(e)}
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=404, mimetype="application/json; charset=utf-8")
+    try:
+        items, future_minutes = parse_batch_request(payload)
+    except RequestError as e:
+        return _json_response(e.body(), e.status)
 
+    try:
+        results = run_inference_batch(items, today, future_minutes)
     except Exception as e:
-        err = {"error": "internal_error", "message": str(e)}
-        body = json.dumps(err, ensure_ascii=False)
-        return Response(body, status=500, mimetype="application/json; charset=utf-8")
+        return _json_response({"error": "internal_error", "message": str(e)}, 500)
+    return _json_response(batch_response(results), 200)
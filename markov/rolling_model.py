@@ -0,0 +1,283 @@
+# rolling_model.py
+# -*- coding: utf-8 -*-
+"""
+여러 날을 누적하는 rolling 모델 상태.
+
+하루 모델은 144 슬롯(121 윈도우)만으로 학습되고 다음 날 버려진다.
+rolling 모드에서는 유저별로 아래 상태를 계속 들고 가면서 새 날만 접어 넣는다.
+  - centroids (K, L, D)          : 클러스터 중심
+  - trans_counts (S, K, K)       : step 별 전이 "횟수" (정규화 전)
+  - endpoint_sums (K, D)         : 클러스터별 tail 평균 벡터 합
+  - endpoint_counts (K,)         : 클러스터별 윈도우 수 (= 중심 가중치)
+
+새 날 반영 비용은 하루치에 비례한다:
+  1) 새 윈도우를 기존 중심에 할당 (재클러스터링 없음)
+  2) 기존 횟수/합에 decay^(경과 일수) 를 곱하고 새 날 값을 더함
+  3) 중심은 새 날 윈도우로 DBA 1회 한 결과와 가중 평균
+상태가 없으면(첫날) 하루치를 클러스터링해서 시작한다.
+
+날짜별 횟수/합(day_trans / day_sums / day_counts)을 최근 history_days 일치 따로 들고 있어서
+누적 값은 언제든 그 날짜들로부터 다시 계산할 수 있다 (그보다 오래된 날은 tail_* 에 합쳐 둠).
+  - 같은 날짜 재빌드: 그날 값을 교체 / 지난 날짜 backfill: 그날 값을 끼워 넣음
+    → 누적 값을 다시 계산 (중심은 그대로, 새 날짜에서만 갱신)
+  - history 밖(tail 에 합쳐진) 날짜는 다시 접을 수 없음 → 상태를 지우고 처음부터 다시 접는다
+상태 파일 갱신(load → fold → save)은 rolling_state_lock 으로 유저별 직렬화.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import fcntl
+
+import numpy as np
+
+from dtw_kmeans import DTW_RADIUS, assign_pruned, dba_update
+from markov_stats import endpoint_sums_counts, normalize_transitions, transition_count_tensor
+from model_bundle import read_bundle, write_bundle
+
+
+ROLLING_STEPS = (1, 3)
+ROLLING_HISTORY_DAYS = 60  # 날짜별 횟수/합을 따로 들고 있는 기간 (decay 0.8 이면 0.8^60 ≈ 1e-6)
+
+DAY_ARRAYS = ("day_trans", "day_sums", "day_counts")
+TAIL_ARRAYS = ("tail_trans", "tail_sums", "tail_counts")
+
+
+def rolling_state_path(model_dir: Path, user_id: str) -> Path:
+    return Path(model_dir) / "rolling" / f"{user_id}_rolling_state.bundle"
+
+
+# ============================================================
+# 1. 상태 저장 / 로드
+# ============================================================
+
+def load_rolling_state(path: Path) -> Optional[Dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    arrays, meta = read_bundle(path, use_mmap=False)
+    state = {name: np.array(a) for name, a in arrays.items()}
+    state.update(meta)
+    if "day_dates" not in state:
+        # 날짜별 값이 없던 예전 상태: 누적 값 전체를 last_date 의 tail 로 본다
+        state.update({
+            "day_dates": [],
+            "tail_date": state["last_date"],
+            "tail_trans": state["trans_counts"],
+            "tail_sums": state["endpoint_sums"],
+            "tail_counts": state["endpoint_counts"],
+        })
+        state.update(_empty_days(state["trans_counts"], state["endpoint_sums"]))
+    return state
+
+
+def save_rolling_state(path: Path, state: Dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    array_keys = ("centroids", "trans_counts", "endpoint_sums", "endpoint_counts") + DAY_ARRAYS
+    if state.get("tail_date") is not None:
+        array_keys += TAIL_ARRAYS
+    write_bundle(
+        path,
+        {k: state[k] for k in array_keys},
+        {k: v for k, v in state.items() if k not in array_keys + TAIL_ARRAYS},
+    )
+
+
+@contextmanager
+def rolling_state_lock(path: Path) -> Iterator[None]:
+    """
+    유저별 rolling 상태 갱신 잠금 ({path}.lock 에 flock, 프로세스 간).
+    같은 유저의 다른 날짜 빌드가 동시에 load → fold → save 해서 한쪽 갱신이 사라지지 않게 한다.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a+b") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# ============================================================
+# 2. 하루 접어 넣기
+# ============================================================
+
+def _days_between(a: str, b: str) -> int:
+    return (datetime.strptime(b, "%Y-%m-%d") - datetime.strptime(a, "%Y-%m-%d")).days
+
+
+def _empty_days(trans: np.ndarray, sums: np.ndarray) -> Dict[str, np.ndarray]:
+    return {
+        "day_trans": np.zeros((0,) + trans.shape),
+        "day_sums": np.zeros((0,) + sums.shape),
+        "day_counts": np.zeros((0, sums.shape[0])),
+    }
+
+
+def _aggregate(state: Dict[str, Any], as_of: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    as_of 날짜 기준 누적 (trans_counts, endpoint_sums, endpoint_counts):
+    tail 과 as_of 이전 날짜별 값에 decay^(경과 일수) 를 곱해서 합친다.
+    """
+    decay = state["decay"]
+    trans = np.zeros(state["day_trans"].shape[1:])
+    sums = np.zeros(state["day_sums"].shape[1:])
+    counts = np.zeros(state["day_counts"].shape[1:])
+    parts = [(d, i) for i, d in enumerate(state["day_dates"])]
+    if state.get("tail_date") is not None:
+        parts.append((state["tail_date"], None))
+    for d, i in parts:
+        gap = _days_between(d, as_of)
+        if gap < 0:
+            continue
+        f = decay ** gap
+        if i is None:
+            trans += f * state["tail_trans"]
+            sums += f * state["tail_sums"]
+            counts += f * state["tail_counts"]
+        else:
+            trans += f * state["day_trans"][i]
+            sums += f * state["day_sums"][i]
+            counts += f * state["day_counts"][i]
+    return trans, sums, counts
+
+
+def _put_day(
+    state: Dict[str, Any],
+    model_date: str,
+    trans: np.ndarray,
+    sums: np.ndarray,
+    counts: np.ndarray,
+    history_days: int,
+) -> Dict[str, Any]:
+    """
+    model_date 의 날짜별 값을 교체(이미 있으면) 또는 날짜 순서에 맞게 삽입하고,
+    history_days 밖으로 밀려난 날짜는 tail 에 합친 뒤 last_date 기준 누적 값을 다시 계산.
+    """
+    dates = list(state["day_dates"])
+    day = {k: np.array(state[k]) for k in DAY_ARRAYS}
+    new = {"day_trans": trans, "day_sums": sums, "day_counts": counts}
+    if model_date in dates:
+        i = dates.index(model_date)
+        for k in DAY_ARRAYS:
+            day[k][i] = new[k]
+    else:
+        i = sum(1 for d in dates if d < model_date)
+        dates.insert(i, model_date)
+        for k in DAY_ARRAYS:
+            day[k] = np.concatenate([day[k][:i], new[k][None], day[k][i:]])
+        state["n_days"] = int(state["n_days"]) + 1
+    state.update(day)
+    state["day_dates"] = dates
+    state["first_date"] = min(state["first_date"], model_date)
+    state["last_date"] = max(state["last_date"], model_date)
+
+    # history 밖 날짜 → tail
+    while dates and _days_between(dates[0], state["last_date"]) >= history_days:
+        d = dates.pop(0)
+        if state.get("tail_date") is None:
+            tail = [np.zeros_like(state[k][0]) for k in DAY_ARRAYS]
+        else:
+            f = state["decay"] ** _days_between(state["tail_date"], d)
+            tail = [state[k] * f for k in TAIL_ARRAYS]
+        for name, k, t in zip(TAIL_ARRAYS, DAY_ARRAYS, tail):
+            state[name] = t + state[k][0]
+            state[k] = state[k][1:]
+        state["tail_date"] = d
+
+    state["trans_counts"], state["endpoint_sums"], state["endpoint_counts"] = _aggregate(
+        state, state["last_date"])
+    return state
+
+
+def fold_day(
+    state: Optional[Dict[str, Any]],
+    windows: np.ndarray,
+    model_date: str,
+    K: int,
+    decay: float,
+    cluster_fn: Callable[[np.ndarray, int], Tuple[np.ndarray, np.ndarray]],
+    steps: Sequence[int] = ROLLING_STEPS,
+    radius: int = DTW_RADIUS,
+    history_days: int = ROLLING_HISTORY_DAYS,
+) -> Tuple[Dict[str, Any], np.ndarray]:
+    """
+    state 에 model_date(YYYY-MM-DD) 하루치 windows 를 반영한 새 상태와
+    그날 윈도우 라벨을 반환.
+      - state 가 None 이면 cluster_fn(windows, K) 로 시작
+      - last_date 이후 날짜: 기존 중심에 할당 + 중심 갱신 + 누적
+      - 이미 반영된 날짜(재빌드) / last_date 이전 날짜(backfill):
+        기존 중심에 할당만 하고 그날 값을 교체/삽입한 뒤 누적 값을 다시 계산
+      - tail 에 합쳐진 날짜(<= tail_date)면 ValueError (상태를 지우고 처음부터 다시 접어야 함)
+    """
+    if state is None:
+        labels, centroids = cluster_fn(windows, K)
+        labels = np.asarray(labels)
+        trans = transition_count_tensor(labels, K, steps)
+        sums, counts = endpoint_sums_counts(windows, labels, K)
+        new_state = {
+            "centroids": np.asarray(centroids, dtype=float),
+            "steps": list(steps),
+            "K": K,
+            "decay": decay,
+            "first_date": model_date,
+            "last_date": model_date,
+            "n_days": 0,
+            "day_dates": [],
+            "tail_date": None,
+        }
+        new_state.update(_empty_days(trans, sums))
+        return _put_day(new_state, model_date, trans, sums, counts, history_days), labels
+
+    if list(state["steps"]) != list(steps):
+        raise ValueError(f"rolling 상태의 steps 가 다릅니다: {state['steps']} != {list(steps)}")
+    tail_date = state.get("tail_date")
+    if tail_date is not None and model_date <= tail_date:
+        raise ValueError(
+            f"rolling 상태에 날짜별 값이 남아 있지 않은 날짜입니다: {model_date} (tail_date={tail_date}). "
+            "상태 파일을 지우고 처음부터 다시 접어야 합니다."
+        )
+
+    centroids = state["centroids"]
+    labels, _, _ = assign_pruned(windows, centroids, radius)
+    trans = transition_count_tensor(labels, K, steps)
+    sums, counts = endpoint_sums_counts(windows, labels, K)
+
+    new_state = dict(state)
+    new_state["decay"] = decay
+    gap = _days_between(state["last_date"], model_date)
+    if gap > 0:
+        # 중심: 과거 가중치(decay 적용) 와 새 날 DBA 결과를 가중 평균
+        old_w = state["endpoint_counts"] * decay ** gap
+        day_centroids = dba_update(windows, labels, centroids, radius, n_iter=1)
+        total_w = old_w + counts
+        blend = np.divide(counts, total_w, out=np.zeros_like(counts), where=total_w > 0)
+        new_state["centroids"] = centroids + blend[:, None, None] * (day_centroids - centroids)
+    return _put_day(new_state, model_date, trans, sums, counts, history_days), labels
+
+
+def state_to_model_arrays(state: Dict[str, Any], as_of: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    rolling 상태 → 하루 모델과 같은 배열 (centroids, endpoint_means, P1, P3).
+    as_of(YYYY-MM-DD): 그 날짜까지의 누적으로 (backfill 한 지난 날짜 모델용, 기본 last_date)
+    """
+    steps = list(state["steps"])
+    if as_of is None or as_of == state["last_date"]:
+        trans, sums, counts = state["trans_counts"], state["endpoint_sums"], state["endpoint_counts"]
+    else:
+        trans, sums, counts = _aggregate(state, as_of)
+    P = normalize_transitions(trans)
+    endpoint_means = np.divide(
+        sums, counts[:, None],
+        out=np.zeros_like(sums), where=counts[:, None] > 0,
+    )
+    return {
+        "centroids": state["centroids"],
+        "endpoint_means": endpoint_means,
+        "P1": P[steps.index(1)],
+        "P3": P[steps.index(3)],
+    }
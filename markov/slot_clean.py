@@ -0,0 +1,137 @@
+# slot_clean.py
+# -*- coding: utf-8 -*-
+"""
+step2-lite 클린을 (users, 144, len(RAW_COLS)) NumPy 블록 위에서 한 번에 처리하는 엔진.
+
+clean_raw_df_step2lite 와 같은 규칙을 10분 슬롯 그리드 기준으로 적용한다.
+  - continuous: 시간축 선형 보간, 양 끝은 가장 가까운 값으로 채움 (np.interp 와 같은 edge clamp)
+  - count: NaN → 0
+  - categorical: ffill + bfill
+row 가 없는 슬롯도 그리드에 NaN 으로 잡혀 있으므로, 하루 데이터가 일부 비어도
+항상 144 슬롯(→ 121 윈도우)이 나온다. 값이 하나도 없는 유저/컬럼은 NaN 으로 남는다.
+
+결과 블록은 feature_engine.compute_feature_matrix 에 그대로 넣을 수 있다.
+"""
+
+from __future__ import annotations
+from typing import Optional
+from datetime import datetime
+
+import numpy as np
+
+from feature_engine import RAW_COLS, RAW_INDEX
+from rds_fetch import SLOTS_PER_DAY, slot_index_of
+
+
+CONTINUOUS_COLS = [
+    "average_stress_index",
+    "recent_stress_index",
+    "latest_sleep_score",
+    "latest_sleep_duration",
+    "temperature",
+    "humidity",
+]
+COUNT_COLS = ["sigh", "laughter"]
+CATEGORICAL_COLS = ["rainType", "sky"]
+
+_CONT_IDX = [RAW_INDEX[c] for c in CONTINUOUS_COLS]
+_COUNT_IDX = [RAW_INDEX[c] for c in COUNT_COLS]
+_CAT_IDX = [RAW_INDEX[c] for c in CATEGORICAL_COLS]
+
+
+# ============================================================
+# 1. DataFrame → 슬롯 그리드
+# ============================================================
+
+def frame_to_slot_block(raw_df, date: Optional[datetime] = None) -> np.ndarray:
+    """
+    유저 1명 raw DataFrame(timestamp + RAW_COLS) → (144, len(RAW_COLS)) 블록.
+    - date 가 없으면 첫 timestamp 의 날짜
+    - 해당 날짜 밖 / 그리드 밖 row 는 버림, 같은 슬롯에 여러 row 면 나중 row 가 남음
+    - 없는 컬럼은 NaN
+    """
+    if raw_df is None or len(raw_df) == 0 or "timestamp" not in raw_df.columns:
+        raise ValueError("raw 데이터가 없습니다 (timestamp row 0개).")
+
+    ts = np.array(raw_df["timestamp"].to_numpy(), dtype="datetime64[m]")
+    day = np.datetime64(date.strftime("%Y-%m-%d"), "D") if date is not None else ts.min().astype("datetime64[D]")
+    on_day = ts.astype("datetime64[D]") == day
+    slots = slot_index_of(ts)
+
+    vals = raw_df.reindex(columns=RAW_COLS).to_numpy(dtype=float)
+    block = np.full((SLOTS_PER_DAY, len(RAW_COLS)), np.nan, dtype=float)
+    ok = on_day & (slots >= 0) & (slots < SLOTS_PER_DAY)
+    block[slots[ok]] = vals[ok]
+    return block
+
+
+# ============================================================
+# 2. 시간축 보간 / fill (마지막 축 = 시간)
+# ============================================================
+
+def _neighbor_index(valid: np.ndarray):
+    """
+    valid (..., T) → (prev, nxt)
+      prev[t]: t 이하에서 마지막 유효 인덱스 (없으면 -1)
+      nxt[t] : t 이상에서 첫 유효 인덱스 (없으면 T)
+    """
+    T = valid.shape[-1]
+    t = np.arange(T)
+    prev = np.maximum.accumulate(np.where(valid, t, -1), axis=-1)
+    nxt = np.minimum.accumulate(np.where(valid, t, T)[..., ::-1], axis=-1)[..., ::-1]
+    return prev, nxt
+
+
+def interp_fill(x: np.ndarray) -> np.ndarray:
+    """
+    (..., T) 시간축 선형 보간 + 양 끝 edge fill. 유효 값이 없는 시계열은 NaN 그대로.
+    """
+    T = x.shape[-1]
+    prev, nxt = _neighbor_index(~np.isnan(x))
+    # 앞쪽 끝은 다음 값, 뒤쪽 끝은 이전 값으로 (둘 다 없으면 0 으로 잡고 NaN 이 그대로 나옴)
+    lo = np.where(prev >= 0, prev, nxt)
+    hi = np.where(nxt < T, nxt, prev)
+    lo = np.clip(lo, 0, T - 1)
+    hi = np.clip(hi, 0, T - 1)
+
+    v_lo = np.take_along_axis(x, lo, axis=-1)
+    v_hi = np.take_along_axis(x, hi, axis=-1)
+    span = (hi - lo).astype(float)
+    w = np.divide(np.arange(T) - lo, span, out=np.zeros_like(span), where=span > 0)
+    return v_lo + w * (v_hi - v_lo)
+
+
+def ffill_bfill(x: np.ndarray) -> np.ndarray:
+    """(..., T) 앞 값으로 채우고, 맨 앞 구간은 뒤 값으로 채움."""
+    T = x.shape[-1]
+    prev, nxt = _neighbor_index(~np.isnan(x))
+    src = np.clip(np.where(prev >= 0, prev, nxt), 0, T - 1)
+    return np.take_along_axis(x, src, axis=-1)
+
+
+# ============================================================
+# 3. 블록 클린
+# ============================================================
+
+def clean_slot_block(block: np.ndarray) -> np.ndarray:
+    """
+    block: (..., 144, len(RAW_COLS)) raw (빈 슬롯 NaN) → 같은 shape 의 클린 블록 (새 배열).
+    """
+    block = np.asarray(block, dtype=float)
+    out = np.empty_like(block)
+
+    # 시간축을 마지막으로: (..., C, T)
+    cont = np.swapaxes(block[..., _CONT_IDX], -1, -2)
+    out[..., _CONT_IDX] = np.swapaxes(interp_fill(cont), -1, -2)
+
+    counts = block[..., _COUNT_IDX]
+    out[..., _COUNT_IDX] = np.where(np.isnan(counts), 0.0, counts)
+
+    cat = np.swapaxes(block[..., _CAT_IDX], -1, -2)
+    out[..., _CAT_IDX] = np.swapaxes(ffill_bfill(cat), -1, -2)
+    return out
+
+
+def users_with_data(block: np.ndarray) -> np.ndarray:
+    """(U, 144, C) raw 블록에서 값이 하나라도 있는 유저 mask (U,)."""
+    return ~np.isnan(block).all(axis=(1, 2))
@@ -0,0 +1,224 @@
+# stream_state.py
+# -*- coding: utf-8 -*-
+"""
+스트리밍 추론용 유저별 상태: 최근 window_length 개 feature 벡터 링버퍼 +
+K 개 중심(centroids)과의 banded DTW 를 포인트가 들어올 때마다 한 row 씩 진행.
+
+모델은 24 슬롯 윈도우의 DTW 로 학습되므로, 실시간 포인트가 쌓이면
+"지금까지 24개 포인트" 윈도우를 DTW 로 가장 가까운 중심에 할당할 수 있다.
+
+증분 DTW:
+  - 윈도우 시작 시점이 다른 정렬(DP)을 최대 L 개 동시에 들고 있다 (slot = 시작 시점 % L)
+  - 새 포인트 1개 → 진행 중인 모든 DP 가 row 1개씩 전진 (band 폭 2r+1 만, 한 번의 배열 연산)
+  - L 번째 row 를 채운 DP 가 곧 "최근 L 포인트 윈도우 vs 중심" DTW → 완성 후 slot 재사용
+  - 전체 DTW 재계산(L row 순차 DP)과 값이 같다 (dtw_kmeans.dtw_sq_matrix 와 같은 정의)
+  - 유저당 메모리: L·D (링버퍼) + L·K·(2r+1) (DP band) float → L=24, K=5, D=5, r=2 에서 약 6KB
+
+StreamRegistry 는 유저 수 상한(LRU)과 유휴 시간(TTL)으로 상태를 제거해 메모리를 묶어 둔다.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import threading
+import time
+
+import numpy as np
+
+from dtw_kmeans import DTW_RADIUS
+
+
+# ============================================================
+# 1. 유저 1명 증분 DTW
+# ============================================================
+
+class StreamingDTW:
+    """
+    centroids: (K, L, D). push(x) 로 feature 벡터 (D,) 를 하나씩 넣는다.
+    """
+
+    def __init__(self, centroids: np.ndarray, radius: int = DTW_RADIUS) -> None:
+        self.centroids = np.asarray(centroids, dtype=float)
+        self.K, self.L, self.D = self.centroids.shape
+        self.radius = radius
+        B = 2 * radius + 1
+
+        self.ring = np.zeros((self.L, self.D), dtype=float)
+        self.n_seen = 0
+        # slot 별 마지막으로 채운 DP row (band 좌표: offset b ↔ 열 j = i + b - r)
+        self.acc = np.full((self.L, self.K, B), np.inf, dtype=float)
+        # slot 별 채운 row 수 (-1: 비어 있음)
+        self.rows = np.full(self.L, -1, dtype=np.int64)
+        # 가장 최근에 완성된 윈도우의 DTW 거리 (K,)
+        self.last_dist: Optional[np.ndarray] = None
+
+        self._offsets = np.arange(B) - radius
+        self._row0 = np.full(B, np.inf)
+        self._row0[radius] = 0.0  # acc[0, 0] = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.n_seen >= self.L
+
+    def window(self) -> np.ndarray:
+        """링버퍼를 시간 순서 (min(n_seen, L), D) 로."""
+        if self.n_seen < self.L:
+            return self.ring[:self.n_seen].copy()
+        start = self.n_seen % self.L
+        return np.concatenate([self.ring[start:], self.ring[:start]])
+
+    def push(self, x: np.ndarray) -> Optional[np.ndarray]:
+        """
+        포인트 1개 추가. 이번 포인트로 윈도우가 완성되면 DTW 거리 (K,) 반환, 아니면 None.
+        """
+        L, r = self.L, self.radius
+        slot = self.n_seen % L
+        self.ring[slot] = x
+        self.acc[slot] = self._row0
+        self.rows[slot] = 0
+        self.n_seen += 1
+
+        idx = np.flatnonzero(self.rows >= 0)
+        i = self.rows[idx] + 1                              # 이번에 채울 row (S,)
+        j = i[:, None] + self._offsets[None, :]             # (S, B)
+        valid = (j >= 1) & (j <= L)
+
+        # 새 포인트와 중심의 모든 시점 사이 제곱 거리 (K, L) → band 위치만 꺼냄
+        dx = ((self.centroids - np.asarray(x, dtype=float)) ** 2).sum(axis=2)
+        cost = dx[:, np.clip(j - 1, 0, L - 1)].transpose(1, 0, 2)   # (S, K, B)
+        cost = np.where(valid[:, None, :], cost, np.inf)
+
+        prev = self.acc[idx]                                # row i-1, (S, K, B)
+        up = np.concatenate([prev[..., 1:], np.full(prev.shape[:2] + (1,), np.inf)], axis=2)
+        best = np.minimum(up, prev)                         # min(acc[i-1, j], acc[i-1, j-1])
+        new = np.empty_like(prev)
+        new[..., 0] = cost[..., 0] + best[..., 0]
+        for b in range(1, new.shape[2]):                    # acc[i, j-1] 은 같은 row → 순차
+            new[..., b] = cost[..., b] + np.minimum(best[..., b], new[..., b - 1])
+
+        self.acc[idx] = new
+        self.rows[idx] = i
+
+        done = np.flatnonzero(i == L)
+        if done.size == 0:
+            return None
+        self.last_dist = np.sqrt(new[done[0], :, r])       # acc[L, L] → band offset r
+        self.rows[idx[done]] = -1
+        return self.last_dist
+
+
+# ============================================================
+# 2. 유저별 상태 보관 (LRU + 유휴 제거)
+# ============================================================
+
+class _StreamEntry:
+    __slots__ = ("state", "centroids", "last_seen", "lock")
+
+    def __init__(self, state: StreamingDTW, centroids: Any, last_seen: float) -> None:
+        self.state = state
+        self.centroids = centroids  # 모델이 바뀌었는지 확인용 (같은 배열 객체인지)
+        self.last_seen = last_seen
+        self.lock = threading.Lock()
+
+
+class StreamRegistry:
+    """
+    user_id → StreamingDTW.
+    - max_users 를 넘으면 가장 오래 안 들어온 유저부터 제거
+    - idle_ttl_sec 동안 포인트가 없던 유저는 제거 (다음 포인트부터 새로 쌓음)
+    - 모델(centroids)이 바뀌면 링버퍼의 포인트를 새 중심으로 다시 흘려서 DP 를 재구성
+    """
+
+    def __init__(self, max_users: int, idle_ttl_sec: float, radius: int = DTW_RADIUS,
+                 registry=None, prefix: str = "stream") -> None:
+        self.max_users = max(1, max_users)
+        self.idle_ttl_sec = idle_ttl_sec
+        self.radius = radius
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _StreamEntry]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+
+        self._evictions = None
+        if registry is not None:
+            self._evictions = registry.counter(
+                f"{prefix}_evictions_total", "스트리밍 상태 제거 수 (reason: idle | capacity)", ("reason",))
+            users_gauge = registry.gauge(f"{prefix}_users", "스트리밍 상태를 가진 유저 수")
+            registry.on_render(lambda: users_gauge.set(len(self)))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evicted(self, reason: str, n: int = 1) -> None:
+        if self._evictions is not None and n:
+            self._evictions.inc(n, reason=reason)
+
+    def _sweep_idle(self, now: float) -> int:
+        """lock 안에서 호출. 앞(오래된 것)부터 TTL 지난 엔트리 제거."""
+        n = 0
+        while self._entries:
+            uid, entry = next(iter(self._entries.items()))
+            if now - entry.last_seen <= self.idle_ttl_sec:
+                break
+            del self._entries[uid]
+            n += 1
+        self._last_sweep = now
+        return n
+
+    def _entry_for(self, user_id: str, centroids: Any, now: float) -> _StreamEntry:
+        n_idle = n_cap = 0
+        with self._lock:
+            if now - self._last_sweep > self.idle_ttl_sec / 4:
+                n_idle += self._sweep_idle(now)
+
+            entry = self._entries.get(user_id)
+            if entry is not None and now - entry.last_seen > self.idle_ttl_sec:
+                del self._entries[user_id]
+                n_idle += 1
+                entry = None
+
+            if entry is None:
+                entry = _StreamEntry(StreamingDTW(centroids, self.radius), centroids, now)
+                self._entries[user_id] = entry
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+                    n_cap += 1
+            else:
+                self._entries.move_to_end(user_id)
+            entry.last_seen = now
+
+        self._evicted("idle", n_idle)
+        self._evicted("capacity", n_cap)
+        return entry
+
+    def update(self, user_id: str, centroids: np.ndarray, feat_vec: np.ndarray) -> Dict[str, Any]:
+        """
+        포인트 1개 반영 후 윈도우 할당 상태 반환:
+          ready, filled, window_length, cluster_id, dtw_distances (ready 일 때만 값)
+        """
+        entry = self._entry_for(user_id, centroids, time.monotonic())
+        with entry.lock:
+            if entry.centroids is not centroids:
+                # 새 모델 → 이전 포인트를 새 중심 기준으로 다시 누적
+                old = entry.state.window()
+                state = StreamingDTW(centroids, self.radius)
+                if old.shape[1:] == (state.D,):
+                    for x in old[-state.L:]:
+                        state.push(x)
+                entry.state, entry.centroids = state, centroids
+
+            state = entry.state
+            state.push(feat_vec)
+            dist = state.last_dist if state.ready else None
+            return {
+                "ready": dist is not None,
+                "filled": min(state.n_seen, state.L),
+                "window_length": state.L,
+                "cluster_id": int(dist.argmin()) if dist is not None else None,
+                "dtw_distances": dist.tolist() if dist is not None else None,
+            }
+
+    def drop(self, user_id: str) -> bool:
+        with self._lock:
+            return self._entries.pop(user_id, None) is not None
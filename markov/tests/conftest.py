@@ -0,0 +1,17 @@
+# conftest.py
+# -*- coding: utf-8 -*-
+"""
+markov/ 모듈은 패키지가 아니라 평면 스크립트 → markov/ 를 sys.path 에 추가.
+빌드 / 추론 모듈은 import 시 ./debug_outputs 를 만들므로 테스트 세션 동안 임시 디렉토리에서 실행.
+"""
+
+from pathlib import Path
+import os
+import sys
+import tempfile
+
+MARKOV_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(MARKOV_DIR))
+
+_WORK_DIR = tempfile.mkdtemp(prefix="mood_markov_tests_")
+os.chdir(_WORK_DIR)
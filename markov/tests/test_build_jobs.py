@@ -0,0 +1,159 @@
+# tests/test_build_jobs.py
+# -*- coding: utf-8 -*-
+"""
+BuildJobQueue: submit_many 원자성 / 중복 제거 / 공용 풀(get_pool) 사용 / wait,
+/build-yesterday/batch 의 ?wait=1 유저별 결과.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import threading
+import time
+
+import pytest
+
+import build_yesterday_many as builder
+from build_jobs import JOB_SUCCEEDED, BuildJobQueue, QueueFullError
+
+
+DATE = datetime(2025, 11, 30)
+
+
+def _wait_done(queue, job_ids, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        jobs = [queue.get(j) for j in job_ids]
+        if all(j["status"] not in ("queued", "running") for j in jobs):
+            return jobs
+        time.sleep(0.01)
+    raise AssertionError("jobs did not finish")
+
+
+@pytest.fixture
+def gated_queue():
+    gate = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=4)
+
+    def build(user_id, date):
+        gate.wait(5)
+        return {"status": "success", "user_id": user_id}
+
+    queue = BuildJobQueue(build, max_concurrency=2, max_pending=3, get_pool=lambda: pool)
+    yield queue, gate
+    gate.set()
+    queue.shutdown()
+    pool.shutdown()
+
+
+def test_submit_many_dedups_and_runs_on_shared_pool(gated_queue):
+    queue, gate = gated_queue
+    first = queue.submit_many(["a", "b", "a"], DATE)
+    assert [(job["user_id"], created) for job, created in first] == [("a", True), ("b", True)]
+
+    again, created = queue.submit("a", DATE)
+    assert not created and again["job_id"] == first[0][0]["job_id"]
+
+    gate.set()
+    jobs = _wait_done(queue, [job["job_id"] for job, _ in first])
+    assert all(job["status"] == JOB_SUCCEEDED for job in jobs)
+
+
+def test_submit_many_is_all_or_nothing(gated_queue):
+    queue, gate = gated_queue
+    queue.submit_many(["a", "b"], DATE)
+    with pytest.raises(QueueFullError):
+        queue.submit_many(["c", "d"], DATE)
+    assert queue.stats()["queued"] + queue.stats()["running"] == 2
+
+    # 이미 진행 중인 잡은 자리를 새로 차지하지 않음
+    out = queue.submit_many(["a", "b", "c"], DATE)
+    assert [created for _, created in out] == [False, False, True]
+
+
+def test_broken_pool_is_reported():
+    class Broken:
+        def submit(self, *args, **kwargs):
+            from concurrent.futures.process import BrokenProcessPool
+            raise BrokenProcessPool("worker died")
+
+    broken = Broken()
+    reported = []
+    queue = BuildJobQueue(lambda u, d: {"status": "success"}, max_concurrency=1, max_pending=10,
+                          get_pool=lambda: broken, on_pool_broken=reported.append)
+    try:
+        job, _ = queue.submit("a", DATE)
+        (done,) = _wait_done(queue, [job["job_id"]])
+        assert done["status"] == "failed" and done["result"]["error"] == "BrokenProcessPool"
+        assert reported == [broken]
+    finally:
+        queue.shutdown()
+
+
+def test_wait_returns_when_jobs_finish(gated_queue):
+    queue, gate = gated_queue
+    ids = [job["job_id"] for job, _ in queue.submit_many(["a", "b"], DATE)]
+
+    t0 = time.monotonic()
+    jobs = queue.wait(ids, timeout=0.1)
+    assert time.monotonic() - t0 >= 0.1
+    assert all(job["status"] in ("queued", "running") for job in jobs)
+
+    threading.Timer(0.1, gate.set).start()
+    jobs = queue.wait(ids + ["no_such_job"], timeout=5)
+    assert [job["status"] for job in jobs[:2]] == [JOB_SUCCEEDED, JOB_SUCCEEDED]
+    assert jobs[2] is None
+
+
+@pytest.fixture
+def batch_client(monkeypatch):
+    gate = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=4)
+
+    def build(user_id, date):
+        gate.wait(5)
+        if user_id == "bad":
+            return {"user_id": user_id, "status": "error", "elapsed_sec": 0.01,
+                    "error": "ValueError", "message": "no rows"}
+        return {"user_id": user_id, "status": "success", "elapsed_sec": 0.02,
+                "model_meta_path": f"model/{user_id}_meta.json"}
+
+    queue = BuildJobQueue(build, max_concurrency=2, max_pending=10, get_pool=lambda: pool)
+    monkeypatch.setattr(builder, "get_build_job_queue", lambda: queue)
+    yield builder.app.test_client(), gate
+    gate.set()
+    queue.shutdown()
+    pool.shutdown()
+
+
+def test_batch_endpoint_without_wait_returns_job_ids(batch_client):
+    client, gate = batch_client
+    resp = client.post("/build-yesterday/batch", json={"user_ids": ["a", "b"], "date": "2025-11-30"})
+    body = resp.get_json()
+    assert resp.status_code == 202 and not body["done"]
+    assert [j["user_id"] for j in body["jobs"]] == ["a", "b"]
+    assert all(j["result"] is None and j["status_url"].endswith(j["job_id"]) for j in body["jobs"])
+
+
+def test_batch_endpoint_wait_returns_per_user_results(batch_client):
+    client, gate = batch_client
+    gate.set()
+    resp = client.post("/build-yesterday/batch?wait=1&timeout=5",
+                       json={"user_ids": ["a", "bad", "c"], "date": "2025-11-30"})
+    body = resp.get_json()
+    assert resp.status_code == 200 and body["done"]
+    assert body["n_succeeded"] == 2 and body["n_failed"] == 1
+    by_user = {j["user_id"]: j for j in body["jobs"]}
+    assert by_user["a"]["status"] == "succeeded"
+    assert by_user["a"]["result"]["model_meta_path"] == "model/a_meta.json"
+    assert by_user["a"]["result"]["elapsed_sec"] == 0.02
+    assert by_user["bad"]["status"] == "failed" and by_user["bad"]["result"]["error"] == "ValueError"
+
+
+def test_batch_endpoint_wait_timeout(batch_client):
+    client, gate = batch_client
+    resp = client.post("/build-yesterday/batch?wait=1&timeout=0.1",
+                       json={"user_ids": ["a"], "date": "2025-11-30"})
+    assert resp.status_code == 202 and not resp.get_json()["done"]
+
+    resp = client.post("/build-yesterday/batch?wait=1&timeout=soon", json={"user_ids": ["a"]})
+    assert resp.status_code == 400 and resp.get_json()["error"] == "invalid_timeout"
@@ -0,0 +1,118 @@
+# tests/test_bulk_export.py
+# -*- coding: utf-8 -*-
+"""
+bulk_export: sqlite3 커넥션으로 export_range → read_export_block 왕복
+(전체 / 일부 유저 export, 여러 파트, 결측 -1 / NaN 복원)과
+build_yesterday_many.fetch_day_block 의 export 밖 유저 RDS 보충.
+"""
+
+from datetime import datetime
+import sqlite3
+
+import numpy as np
+import pytest
+
+import build_yesterday_many as builder
+from bulk_export import COLUMN_DTYPES, exported_user_ids, export_range, has_export_day, read_export_block
+from feature_engine import RAW_COLS
+from rds_fetch import SLOTS_PER_DAY, fetch_day_raw_block
+
+
+START, END = datetime(2025, 11, 29), datetime(2025, 11, 30)
+USERS = [f"u{i}" for i in range(5)]
+
+
+def _ts(day: str, slot: int) -> str:
+    return f"{day} {slot * 10 // 60:02d}:{slot * 10 % 60:02d}:00"
+
+
+def _values(rng: np.random.Generator) -> list:
+    out = []
+    for c in RAW_COLS:
+        if rng.random() < 0.15:
+            out.append(None)
+        elif COLUMN_DTYPES[c].kind == "f":
+            # float32 로 저장되므로 float32 로 표현 가능한 값
+            out.append(float(np.float32(rng.uniform(0, 100))))
+        else:
+            out.append(int(rng.integers(0, 5)))
+    return out
+
+
+@pytest.fixture
+def conn():
+    rng = np.random.default_rng(0)
+    c = sqlite3.connect(":memory:")
+    c.execute(
+        "CREATE TABLE DailyPreprocessedSlot (user_id TEXT, timestamp TEXT, "
+        + ", ".join(f"{col} REAL" for col in RAW_COLS) + ")"
+    )
+    rows = []
+    for day in ("2025-11-29", "2025-11-30"):
+        for uid in USERS[:4]:  # u4 는 데이터 없음
+            for slot in rng.choice(SLOTS_PER_DAY, size=20, replace=False):
+                rows.append((uid, _ts(day, int(slot)), *_values(rng)))
+    c.executemany(f"INSERT INTO DailyPreprocessedSlot VALUES ({', '.join(['?'] * (2 + len(RAW_COLS)))})",
+                  rows)
+    c.commit()
+    yield c
+    c.close()
+
+
+def _assert_same(a, b):
+    np.testing.assert_array_equal(np.isnan(a), np.isnan(b))
+    np.testing.assert_allclose(np.nan_to_num(a, nan=-999), np.nan_to_num(b, nan=-999))
+
+
+@pytest.mark.parametrize("users_per_part", [1, 2, 5000])
+def test_full_export_matches_direct_fetch(conn, tmp_path, users_per_part):
+    summary = export_range(START, END, tmp_path, conn=conn, users_per_part=users_per_part)
+    assert summary["n_users"] == 4
+    assert summary["n_parts"] == (4 + users_per_part - 1) // users_per_part
+
+    for date in (START, END):
+        assert has_export_day(tmp_path, date)
+        block, counts = read_export_block(tmp_path, USERS, date)
+        ref_block, ref_counts = fetch_day_raw_block(USERS, date, conn=conn)
+        np.testing.assert_array_equal(counts, ref_counts)
+        _assert_same(block, ref_block)
+        assert counts[4] == 0 and np.isnan(block[4]).all()
+    assert not has_export_day(tmp_path, datetime(2025, 12, 1))
+
+
+def test_missing_values_decode_to_nan(conn, tmp_path):
+    export_range(START, END, tmp_path, conn=conn)
+    block, counts = read_export_block(tmp_path, USERS[:4], END)
+    ref_block, _ = fetch_day_raw_block(USERS[:4], END, conn=conn)
+    for c in ("rainType", "laughter", "temperature"):
+        ci = RAW_COLS.index(c)
+        # row 는 있는데 값이 NULL 인 슬롯: -1 / NaN 으로 저장 → NaN 으로 복원
+        present = ~np.isnan(ref_block).all(axis=2)
+        null_cells = present & np.isnan(ref_block[..., ci])
+        assert null_cells.any()
+        assert np.isnan(block[..., ci][null_cells]).all()
+    assert (block[~np.isnan(block)] >= 0).all()
+
+
+def test_partial_export_and_fetch_day_block(conn, tmp_path, monkeypatch):
+    export_range(START, END, tmp_path, user_ids=["u0", "u4"], conn=conn, users_per_part=1)
+    assert exported_user_ids(tmp_path, END) == {"u0", "u4"}
+
+    block, counts = read_export_block(tmp_path, USERS, END)
+    assert counts[0] > 0 and counts[1:].sum() == 0
+
+    fetched = []
+
+    def fake_fetch(user_ids, date):
+        fetched.append(list(user_ids))
+        return fetch_day_raw_block(user_ids, date, conn=conn)
+
+    monkeypatch.setattr(builder, "RAW_EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(builder, "fetch_day_raw_block", fake_fetch)
+    block, counts = builder.fetch_day_block(USERS, END)
+
+    # export 에 있는 u0 / u4(데이터 없음) 는 RDS 조회 없이, 나머지만 RDS 에서
+    assert fetched == [["u1", "u2", "u3"]]
+    ref_block, ref_counts = fetch_day_raw_block(USERS, END, conn=conn)
+    np.testing.assert_array_equal(counts, ref_counts)
+    _assert_same(block, ref_block)
@@ -0,0 +1,63 @@
+# tests/test_dtw_kmeans.py
+# -*- coding: utf-8 -*-
+"""
+dtw_kmeans: banded DTW 거리 (tslearn 과 같은 정의), 가지치기 할당, DBA 갱신, 빈 클러스터 보정.
+"""
+
+import numpy as np
+import pytest
+
+from dtw_kmeans import assign_pruned, banded_dtw_kmeans, dba_update, dtw_sq_matrix
+
+
+def _data(seed=0, n=60, k=4, L=24, D=5):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, L, D)).cumsum(axis=1) * 0.1
+    C = rng.normal(size=(k, L, D)).cumsum(axis=1) * 0.1
+    return X, C
+
+
+@pytest.mark.parametrize("radius", [0, 1, 2, 5])
+def test_dtw_matches_tslearn(radius):
+    metrics = pytest.importorskip("tslearn.metrics")
+    X, C = _data(1, n=20)
+    ref = metrics.cdist_dtw(X, C, global_constraint="sakoe_chiba", sakoe_chiba_radius=radius) ** 2
+    np.testing.assert_allclose(dtw_sq_matrix(X, C, radius), ref, rtol=1e-10, atol=1e-10)
+
+
+def test_radius_zero_is_euclidean():
+    X, C = _data(2, n=10)
+    ref = ((X[:, None] - C[None]) ** 2).sum(axis=(2, 3))
+    np.testing.assert_allclose(dtw_sq_matrix(X, C, 0), ref)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_assign_pruned_matches_full_argmin(seed):
+    X, C = _data(seed)
+    full = dtw_sq_matrix(X, C)
+    labels, dist, pruned = assign_pruned(X, C)
+    np.testing.assert_array_equal(labels, full.argmin(axis=1))
+    np.testing.assert_allclose(dist, full.min(axis=1))
+    assert 0.0 <= pruned < 1.0
+
+
+def test_dba_update_keeps_shape_and_lowers_inertia():
+    X, C = _data(3)
+    labels, dist, _ = assign_pruned(X, C)
+    new_C = dba_update(X, labels, C, n_iter=2)
+    assert new_C.shape == C.shape
+    # 할당 고정, 중심만 갱신 → 각 윈도우와 자기 중심 거리 합이 늘지 않음
+    after = dtw_sq_matrix(X, new_C)[np.arange(len(X)), labels]
+    assert after.sum() <= dist.sum() + 1e-9
+    # 빈 클러스터 중심은 그대로
+    empty = np.setdiff1d(np.arange(len(C)), labels)
+    np.testing.assert_array_equal(new_C[empty], C[empty])
+
+
+def test_final_assignment_has_no_empty_cluster():
+    X, _ = _data(4, n=30, k=3)
+    init = np.stack([X[0], X[1], X[0] + 100.0])  # 3번째 중심은 어떤 윈도우와도 멀다
+    res = banded_dtw_kmeans(X, 3, init_centroids=init, max_iter=0)
+    assert np.bincount(res["labels"], minlength=3).min() > 0
+    full = dtw_sq_matrix(X, res["centroids"])
+    np.testing.assert_allclose(full[np.arange(len(X)), res["labels"]].mean(), res["inertia"])
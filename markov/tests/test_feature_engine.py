@@ -0,0 +1,137 @@
+# test_feature_engine.py
+# -*- coding: utf-8 -*-
+"""
+feature_engine.compute_feature_matrix 와 스칼라 기준 구현
+build_yesterday_many.compute_feature_row 의 parity.
+
+결측 규칙 (feature_engine docstring):
+  - temperature / humidity 결측(NaN / None) → 날씨 불쾌지수에 영향 없음
+    (스칼라 쪽은 temperature=22, humidity=60 으로 채운 값과 비교)
+  - 그 밖의 컬럼 결측 → 그 컬럼에 의존하는 score 만 NaN (clip 이 NaN 을 유지)
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_yesterday_many import compute_feature_row
+from feature_engine import (
+    FEATURE_COLS,
+    RAW_COLS,
+    compute_feature_matrix,
+    compute_feature_point,
+    raw_point_to_array,
+)
+
+
+# score → 의존하는 raw 컬럼
+DEPENDS_ON = {
+    "StressScore": {"average_stress_index", "recent_stress_index"},
+    "CalmScore": {"average_stress_index", "recent_stress_index"},
+    "FatigueScore": {"latest_sleep_score", "latest_sleep_duration", "sigh"},
+    "VibrancyScore": {"latest_sleep_score", "latest_sleep_duration", "sigh", "laughter"},
+    "WeatherScore": set(),
+}
+
+
+def random_raw(rng: np.random.Generator, n: int) -> np.ndarray:
+    """범위 밖 값(음수, 100 초과 등)도 섞어서 clip 경계를 지나가게 한다."""
+    cols = {
+        "average_stress_index": rng.uniform(-20, 130, n),
+        "recent_stress_index": rng.uniform(-20, 130, n),
+        "latest_sleep_score": rng.uniform(-10, 120, n),
+        "latest_sleep_duration": rng.uniform(0, 900, n),
+        "temperature": rng.uniform(-30, 50, n),
+        "humidity": rng.uniform(0, 100, n),
+        "rainType": rng.integers(0, 5, n).astype(float),
+        "sky": rng.choice([1.0, 3.0, 4.0], n),
+        "laughter": rng.poisson(3, n).astype(float),
+        "sigh": rng.poisson(3, n).astype(float),
+    }
+    return np.stack([cols[c] for c in RAW_COLS], axis=1)
+
+
+def scalar_features(row: np.ndarray) -> np.ndarray:
+    """스칼라 기준 구현 (결측 temperature / humidity 는 중립값으로 채움)."""
+    s = pd.Series(row, index=RAW_COLS)
+    if math.isnan(s["temperature"]):
+        s["temperature"] = 22.0
+    if math.isnan(s["humidity"]):
+        s["humidity"] = 60.0
+    out = compute_feature_row(s)
+    return np.array([out[c] for c in FEATURE_COLS], dtype=float)
+
+
+def test_matrix_matches_scalar_on_random_rows():
+    raw = random_raw(np.random.default_rng(0), 2000)
+    feats = compute_feature_matrix(raw)
+    assert feats.shape == (2000, len(FEATURE_COLS))
+    for i in range(raw.shape[0]):
+        np.testing.assert_allclose(feats[i], scalar_features(raw[i]), rtol=0, atol=1e-12)
+
+
+def test_matrix_matches_scalar_on_zero_and_boundary_rows():
+    rows = [
+        np.zeros(len(RAW_COLS)),                                   # 모든 값 0
+        np.array([100, 100, 100, 600, 22, 60, 0, 1, 10, 10.0]),    # clip 상한 경계
+        np.array([0, 0, 0, 0, 42, 100, 3, 4, 0, 0.0]),            # 불쾌지수 상한 (1.5) 초과
+        np.array([50, 50, 50, 300, 2, 60, 2, 4, 5, 5.0]),
+        np.array([50, 50, 50, 300, 22, 59.999, 1, 3, 20, 20.0]),
+    ]
+    raw = np.stack(rows).astype(float)
+    feats = compute_feature_matrix(raw)
+    for i, row in enumerate(raw):
+        np.testing.assert_allclose(feats[i], scalar_features(row), rtol=0, atol=1e-12)
+
+
+def test_batched_shapes_match_flat():
+    raw = random_raw(np.random.default_rng(1), 3 * 144).reshape(3, 144, len(RAW_COLS))
+    np.testing.assert_array_equal(
+        compute_feature_matrix(raw).reshape(-1, len(FEATURE_COLS)),
+        compute_feature_matrix(raw.reshape(-1, len(RAW_COLS))),
+    )
+    np.testing.assert_array_equal(compute_feature_matrix(raw[0, 0]), compute_feature_matrix(raw[0])[0])
+
+
+def test_point_matches_matrix():
+    rng = np.random.default_rng(4)
+    raw = random_raw(rng, 500)
+    raw[rng.random(raw.shape) < 0.05] = np.nan
+    expected = compute_feature_matrix(raw)
+    for row, exp in zip(raw, expected):
+        point = {c: (None if math.isnan(v) else v) for c, v in zip(RAW_COLS, row.tolist())}
+        np.testing.assert_array_equal(compute_feature_point(point), exp)
+
+
+@pytest.mark.parametrize("missing", [np.nan, None])
+@pytest.mark.parametrize("col", ["temperature", "humidity"])
+def test_missing_weather_is_neutral(col, missing):
+    rng = np.random.default_rng(2)
+    for row in random_raw(rng, 200):
+        point = dict(zip(RAW_COLS, row.tolist()))
+        point[col] = missing
+        arr = raw_point_to_array(point)
+        feats = compute_feature_matrix(arr)
+        np.testing.assert_allclose(feats, scalar_features(arr), rtol=0, atol=1e-12)
+        assert not np.isnan(feats).any()
+
+
+@pytest.mark.parametrize("col", [c for c in RAW_COLS if c not in ("temperature", "humidity")])
+def test_missing_other_column_only_affects_dependent_scores(col):
+    rng = np.random.default_rng(3)
+    for row in random_raw(rng, 50):
+        point = dict(zip(RAW_COLS, row.tolist()))
+        point[col] = None
+        feats = compute_feature_matrix(raw_point_to_array(point))
+        full = scalar_features(row)
+        for j, name in enumerate(FEATURE_COLS):
+            if col in DEPENDS_ON[name]:
+                assert math.isnan(feats[j]), name
+            elif name == "WeatherScore" and col in ("rainType", "sky"):
+                # 결측 rainType / sky 는 penalty 0 (== 비교가 False)
+                assert not math.isnan(feats[j])
+            else:
+                assert feats[j] == pytest.approx(full[j], abs=1e-12), name
+
@@ -0,0 +1,83 @@
+# tests/test_forecast.py
+# -*- coding: utf-8 -*-
+"""
+forecast: 로드 시 미리 계산한 P1^h (스토어에 짧게 패킹됐으면 다시 계산),
+forecast_minutes 검증 (슬롯 간격 배수 / 상한 / 정수만, 아니면 400).
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import realtime_inference_many as core
+from bench_pipeline import synthetic_payload, write_synthetic_model
+from model_store import pack_model_store, store_path
+
+
+DATE = datetime(2025, 11, 30)
+
+
+def _P1(K=5, seed=0):
+    return np.random.default_rng(seed).dirichlet(np.ones(K), size=K)
+
+
+def test_attach_forecast_powers():
+    P1 = _P1()
+    model = core.attach_forecast_powers({"P1": P1, "freq_minutes": 10})
+    powers = model["forecast_powers"]
+    assert powers.shape == (core.FORECAST_MAX_MINUTES // 10, 5, 5)
+    for h in range(1, len(powers) + 1):
+        np.testing.assert_allclose(powers[h - 1], np.linalg.matrix_power(P1, h), atol=1e-14)
+
+
+@pytest.mark.parametrize("packed_minutes", [60, 360, 720])
+def test_store_powers_recomputed_when_short(tmp_path, monkeypatch, packed_minutes):
+    monkeypatch.setattr(core, "MODEL_DIR", tmp_path)
+    write_synthetic_model(tmp_path, "u", DATE)
+    pack_model_store(tmp_path, DATE, forecast_max_minutes=packed_minutes)
+    model = core.load_model_artifact("u", DATE, store_path(tmp_path, DATE))
+    powers = model["forecast_powers"]
+    assert powers.shape[0] == core.FORECAST_MAX_MINUTES // 10
+    for h in (1, 6, 7, len(powers)):
+        np.testing.assert_allclose(powers[h - 1], np.linalg.matrix_power(model["P1"], h), atol=1e-12)
+
+
+def test_forecast_uses_powers():
+    model = core.attach_forecast_powers({"P1": _P1(seed=1), "freq_minutes": 10})
+    out = core.forecast_distributions(model, 2, [10, 60, 360])
+    for row, h in zip(out, (1, 6, 36)):
+        np.testing.assert_allclose(row, np.linalg.matrix_power(model["P1"], h)[2])
+
+
+@pytest.mark.parametrize("bad", [
+    [15], [10, 25], [0], [-10], [core.FORECAST_MAX_MINUTES + 10], [10.0], ["10"], [True], [], 30,
+    list(range(10, 10 * (core.FORECAST_MAX_HORIZONS + 2), 10)),
+])
+def test_parse_forecast_minutes_rejects(bad):
+    payload = dict(synthetic_payload(np.random.default_rng(0), "u"), forecast_minutes=bad)
+    with pytest.raises(core.RequestError) as exc:
+        core.parse_inference_request(payload)
+    assert exc.value.status == 400 and exc.value.error == "invalid_forecast"
+
+    resp = core.app.test_client().post("/inference", json=payload)
+    assert resp.status_code == 400 and resp.get_json()["error"] == "invalid_forecast"
+
+
+def test_parse_forecast_minutes_accepts_multiples():
+    assert core.parse_forecast_minutes([10, 30, core.FORECAST_MAX_MINUTES]) == [10, 30, core.FORECAST_MAX_MINUTES]
+    assert core.parse_forecast_minutes([20, 40], freq_minutes=20) == [20, 40]
+    with pytest.raises(ValueError):
+        core.parse_forecast_minutes([10], freq_minutes=20)
+
+
+def test_model_with_other_slot_interval(tmp_path):
+    path = write_synthetic_model(tmp_path, "u", DATE)
+    model = core.load_model_artifact("u", DATE, path)
+    model = core.attach_forecast_powers(dict(model, freq_minutes=20, forecast_powers=None))
+    payload = dict(synthetic_payload(np.random.default_rng(0), "u"), forecast_minutes=[10])
+    req = core.parse_inference_request(payload)
+    with pytest.raises(core.RequestError) as exc:
+        core.run_inference(req, model)
+    assert core.inference_error(exc.value) == (400, exc.value.body())
+    assert core.run_inference(dict(req, forecast_minutes=[20, 40]), model)["forecast"][1]["minutes"] == 40
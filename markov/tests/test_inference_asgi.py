@@ -0,0 +1,92 @@
+# tests/test_inference_asgi.py
+# -*- coding: utf-8 -*-
+"""
+InferenceASGI: 504 뒤에도 풀 점유를 세서 포화 시 503, stream 요청은 풀에서 추론.
+"""
+
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
+import threading
+import time
+
+import numpy as np
+
+import realtime_inference_asgi as asgi_mod
+import realtime_inference_many as core
+from bench_pipeline import synthetic_payload, write_synthetic_model
+
+
+def _call(app, method, path, body=None):
+    async def run():
+        sent = []
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+
+        async def receive():
+            return {"type": "http.request", "body": data, "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await app({"type": "http", "method": method, "path": path}, receive, send)
+        return sent[0]["status"], json.loads(sent[1]["body"])
+
+    return asyncio.run(run())
+
+
+def _write_model(user_id, seed=0):
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    write_synthetic_model(core.MODEL_DIR, user_id, yesterday, seed=seed)
+    return synthetic_payload(np.random.default_rng(seed), user_id)
+
+
+def test_timed_out_pool_work_still_counts(monkeypatch):
+    payload = _write_model("asgi_slow_user")
+    app = asgi_mod.InferenceASGI(model_threads=1, max_pool_pending=1, timeout_sec=0.05)
+    release = threading.Event()
+    real_load = core.load_yesterday_model_runtime
+
+    def slow_load(user_id, today):
+        release.wait(5)
+        return real_load(user_id, today)
+
+    monkeypatch.setattr(core, "load_yesterday_model_runtime", slow_load)
+    monkeypatch.setattr(core, "peek_yesterday_model", lambda user_id, today: None)
+
+    status, body = _call(app, "POST", "/inference", payload)
+    assert status == 504
+    # 응답은 끝났지만 스레드는 아직 로드 중 → 풀이 필요한 요청은 바로 503
+    status, body = _call(app, "POST", "/inference", payload)
+    assert status == 503 and body["error"] == "overloaded"
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while app._pool_pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert app._pool_pending == 0
+    status, body = _call(app, "POST", "/inference", payload)
+    assert status == 200
+    app.pool.shutdown()
+
+
+def test_stream_inference_runs_in_pool(monkeypatch):
+    payload = dict(_write_model("asgi_stream_user", seed=1), stream=True)
+    app = asgi_mod.InferenceASGI(model_threads=2)
+    threads = []
+    real_run = core.run_inference
+
+    def record_run(req, model):
+        threads.append(threading.current_thread().name)
+        return real_run(req, model)
+
+    monkeypatch.setattr(core, "run_inference", record_run)
+
+    for _ in range(2):
+        status, body = _call(app, "POST", "/inference", payload)
+        assert status == 200
+    assert threads and all(name.startswith("asgi-model") for name in threads)
+
+    threads.clear()
+    status, _ = _call(app, "POST", "/inference", dict(payload, stream=False))
+    assert status == 200 and threads == [threading.current_thread().name]
+    app.pool.shutdown()
@@ -0,0 +1,105 @@
+# tests/test_inference_batch.py
+# -*- coding: utf-8 -*-
+"""
+run_inference_batch / infer_states_batch: 아이템별 run_inference 와 같은 결과,
+K / feature_cols 가 다른 모델이 섞인 배치, 아이템별 오류가 자기 index 를 유지하는지.
+"""
+
+from datetime import datetime
+import copy
+
+import numpy as np
+import pytest
+
+import realtime_inference_many as core
+from bench_pipeline import synthetic_payload, write_synthetic_model
+
+
+DATE = datetime(2025, 11, 30)
+TODAY = datetime(2025, 12, 1)
+
+
+@pytest.fixture
+def models(tmp_path, monkeypatch):
+    out = {}
+    for i, (user_id, K) in enumerate([("k5_a", 5), ("k5_b", 5), ("k3_a", 3), ("k4_a", 4)]):
+        path = write_synthetic_model(tmp_path, user_id, DATE, seed=i, K=K)
+        out[user_id] = core.load_model_artifact(user_id, DATE, path)
+
+    # 같은 K 지만 feature 순서가 다른 모델 (endpoint_means 열도 같은 순서로)
+    perm = [2, 0, 4, 1, 3]
+    swapped = copy.copy(out["k5_b"])
+    swapped["user_id"] = "k5_perm"
+    swapped["feature_cols"] = [out["k5_b"]["feature_cols"][j] for j in perm]
+    swapped["endpoint_means"] = np.asarray(out["k5_b"]["endpoint_means"])[:, perm]
+    out["k5_perm"] = swapped
+
+    def load(user_id, today):
+        if user_id == "broken":
+            raise RuntimeError("broken bundle")
+        if user_id not in out:
+            raise FileNotFoundError(f"Model not found: {user_id}")
+        return out[user_id]
+
+    monkeypatch.setattr(core, "load_yesterday_model_runtime", load)
+    return out
+
+
+def _strip_time(result):
+    return {k: v for k, v in result.items() if k != "inference_time"}
+
+
+@pytest.mark.parametrize("future_minutes", [10, 30, 60, 90])
+def test_batch_matches_single_inference(models, future_minutes):
+    rng = np.random.default_rng(future_minutes)
+    users = list(models)
+    items = [synthetic_payload(rng, users[i % len(users)]) for i in range(40)]
+    results = core.run_inference_batch(items, TODAY, future_minutes=future_minutes)
+    assert len(results) == len(items)
+    for item, res in zip(items, results):
+        req = core.parse_inference_request(item)
+        ref = core.infer_state_simple(req["raw_point"], models[item["user_id"]], future_minutes=future_minutes)
+        assert _strip_time(res) == _strip_time(ref)
+        if future_minutes == 30:
+            assert _strip_time(res) == _strip_time(core.run_inference(req, models[item["user_id"]]))
+
+
+def test_feature_order_is_respected(models):
+    rng = np.random.default_rng(1)
+    items = [synthetic_payload(rng, "k5_b") for _ in range(20)]
+    plain = core.run_inference_batch(items, TODAY)
+    permuted = core.run_inference_batch([dict(it, user_id="k5_perm") for it in items], TODAY)
+    for a, b in zip(plain, permuted):
+        assert a["current_id"] == b["current_id"] and a["future_id"] == b["future_id"]
+
+
+def test_item_errors_keep_index(models):
+    rng = np.random.default_rng(2)
+    ok = synthetic_payload(rng, "k3_a")
+    missing_field = synthetic_payload(rng, "k5_a")
+    del missing_field["humidity"]
+    items = [
+        ok,
+        "not an object",
+        {k: v for k, v in ok.items() if k != "user_id"},
+        missing_field,
+        synthetic_payload(rng, "unknown_user"),
+        synthetic_payload(rng, "broken"),
+        dict(ok, temperature="warm"),
+        synthetic_payload(rng, "k4_a"),
+        synthetic_payload(rng, "unknown_user"),
+    ]
+    results = core.run_inference_batch(items, TODAY)
+    errors = {r["index"]: r["error"] for r in results if "error" in r}
+    assert errors == {
+        1: "invalid_payload",
+        2: "missing_user_id",
+        3: "missing_field",
+        4: "model_not_found",
+        5: "internal_error",
+        6: "invalid_value",
+        8: "model_not_found",
+    }
+    assert results[0]["user_id"] == "k3_a" and results[7]["user_id"] == "k4_a"
+    body = core.batch_response(results)
+    assert body["n_ok"] == 2 and body["n_error"] == 7
@@ -0,0 +1,28 @@
+# tests/test_inference_startup.py
+# -*- coding: utf-8 -*-
+"""
+추론 서버 import: 빌드 전용 의존성(pandas 등)을 끌고 오지 않고, 시간 안에 뜬다.
+새 프로세스에서 bench_startup 의 probe 를 그대로 실행.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from bench_pipeline import synthetic_payload, write_synthetic_model
+from bench_startup import BENCH_USER, run_probe
+
+
+# CI 머신 편차를 감안한 느슨한 상한 (로컬 중앙값은 수백 ms)
+MAX_IMPORT_MS = 5000
+
+
+def test_inference_import_is_light(tmp_path):
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    write_synthetic_model(tmp_path / "debug_outputs" / "model", BENCH_USER, yesterday, seed=0)
+    payload = synthetic_payload(np.random.default_rng(0), BENCH_USER)
+
+    res = run_probe(tmp_path, payload)
+    assert res["forbidden_modules"] == []
+    assert res["first_status"] == 200 and res["second_status"] == 200
+    assert res["import_ms"] < MAX_IMPORT_MS
@@ -0,0 +1,114 @@
+# tests/test_markov_stats.py
+# -*- coding: utf-8 -*-
+"""
+markov_stats: 배치 전이 횟수 / endpoint μ_k 가 유저별 루프 계산(기존 구현)과 같은지.
+라벨 -1 패딩, 여러 step, 관측 없는 행(→ 자기 자신으로 1) 포함.
+"""
+
+import numpy as np
+import pytest
+
+from markov_stats import (
+    endpoint_means_batch,
+    normalize_transitions,
+    transition_count_tensor,
+    transition_matrices,
+    transition_powers,
+)
+
+
+K = 5
+STEPS = (1, 2, 3, 6)
+
+
+def _loop_counts(labels, K, step):
+    C = np.zeros((K, K))
+    for i in range(len(labels) - step):
+        C[labels[i], labels[i + step]] += 1.0
+    return C
+
+
+def _loop_transition(labels, K, step):
+    P = _loop_counts(labels, K, step)
+    for i in range(K):
+        total = P[i].sum()
+        if total > 0:
+            P[i] /= total
+        else:
+            P[i, i] = 1.0
+    return P
+
+
+def _loop_endpoint_means(windows, labels, K, tail=3):
+    N, L, D = windows.shape
+    mu = np.zeros((K, D))
+    counts = np.zeros(K)
+    for i in range(N):
+        mu[labels[i]] += windows[i, L - tail:L].mean(axis=0)
+        counts[labels[i]] += 1
+    for k in range(K):
+        if counts[k] > 0:
+            mu[k] /= counts[k]
+    return mu
+
+
+def _padded_users(seed=0):
+    """유저별 윈도우 수가 다르고, 일부 유저는 쓰지 않는 클러스터가 있는 (U, W) 라벨 + 윈도우."""
+    rng = np.random.default_rng(seed)
+    lengths = [40, 7, 3, 1, 0, 25]
+    W = max(lengths)
+    labels = np.full((len(lengths), W), -1, dtype=int)
+    windows = np.zeros((len(lengths), W, 6, 4))
+    for u, n in enumerate(lengths):
+        n_used = K if u % 2 == 0 else 2  # 홀수 유저는 클러스터 0, 1 만 → 빈 행
+        labels[u, :n] = rng.integers(0, n_used, size=n)
+        windows[u, :n] = rng.normal(size=(n, 6, 4))
+    return labels, windows, lengths
+
+
+def test_transition_counts_match_loop():
+    labels, _, lengths = _padded_users()
+    counts = transition_count_tensor(labels, K, STEPS)
+    assert counts.shape == (len(lengths), len(STEPS), K, K)
+    for u, n in enumerate(lengths):
+        for si, step in enumerate(STEPS):
+            np.testing.assert_array_equal(counts[u, si], _loop_counts(labels[u, :n], K, step))
+
+
+def test_transition_matrices_match_loop():
+    labels, _, lengths = _padded_users(1)
+    P = transition_matrices(labels, K, STEPS)
+    for u, n in enumerate(lengths):
+        for si, step in enumerate(STEPS):
+            np.testing.assert_allclose(P[u, si], _loop_transition(labels[u, :n], K, step))
+            # 1유저 입력도 같은 결과
+            np.testing.assert_allclose(transition_matrices(labels[u, :n], K, (step,))[0], P[u, si])
+
+
+def test_empty_rows_normalize_to_identity():
+    counts = np.zeros((2, K, K))
+    counts[0, 1, 3] = 2.0
+    P = normalize_transitions(counts)
+    np.testing.assert_array_equal(P[1], np.eye(K))
+    expected = np.eye(K)
+    expected[1] = np.eye(K)[3]
+    np.testing.assert_array_equal(P[0], expected)
+    np.testing.assert_allclose(P.sum(axis=-1), 1.0)
+
+
+def test_endpoint_means_match_loop():
+    labels, windows, lengths = _padded_users(2)
+    mu = endpoint_means_batch(windows, labels, K)
+    assert mu.shape == (len(lengths), K, windows.shape[-1])
+    for u, n in enumerate(lengths):
+        ref = _loop_endpoint_means(windows[u, :n], labels[u, :n], K)
+        np.testing.assert_allclose(mu[u], ref)
+        np.testing.assert_allclose(endpoint_means_batch(windows[u, :n], labels[u, :n], K), ref)
+
+
+@pytest.mark.parametrize("horizons", [(1,), (1, 2, 3, 6), (6, 3)])
+def test_transition_powers(horizons):
+    P1 = transition_matrices(np.random.default_rng(3).integers(0, K, size=50), K, (1,))[0]
+    powers = transition_powers(P1, horizons)
+    for i, h in enumerate(horizons):
+        np.testing.assert_allclose(powers[i], np.linalg.matrix_power(P1, h))
@@ -0,0 +1,108 @@
+# tests/test_model_bundle.py
+# -*- coding: utf-8 -*-
+"""
+model_bundle: write / bundle_writer → read 왕복 (mmap / 복사), 깨진 파일은 BundleFormatError,
+find_latest_bundle lookback.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from model_bundle import (
+    BundleFormatError,
+    bundle_path,
+    bundle_writer,
+    find_latest_bundle,
+    read_bundle,
+    write_bundle,
+)
+
+
+DATE = datetime(2025, 11, 30)
+
+
+def _arrays():
+    rng = np.random.default_rng(0)
+    return {
+        "centroids": rng.normal(size=(5, 24, 5)),
+        "P1": rng.dirichlet(np.ones(5), size=5),
+        "labels": rng.integers(0, 5, size=121).astype(np.int32),
+        "keys": np.array([b"a_user", b"bb"]),
+        "empty": np.zeros((0, 3)),
+        "fortran": np.asfortranarray(rng.normal(size=(3, 4))),
+    }
+
+
+META = {"K": 5, "feature_cols": ["stress", "기분"], "nested": {"steps": [1, 3]}}
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_roundtrip(tmp_path, use_mmap):
+    arrays = _arrays()
+    path = write_bundle(tmp_path / "u.bundle", arrays, META)
+    out, meta = read_bundle(path, use_mmap=use_mmap)
+    assert meta == META and set(out) == set(arrays)
+    for name, a in arrays.items():
+        assert out[name].dtype == a.dtype and out[name].shape == a.shape
+        np.testing.assert_array_equal(out[name], a)
+        assert not out[name].flags.writeable
+    assert list(tmp_path.iterdir()) == [path]  # 임시 파일이 남지 않음
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_bundle_writer_roundtrip(tmp_path, use_mmap):
+    arrays = _arrays()
+    specs = {name: (a.dtype, a.shape) for name, a in arrays.items()}
+    path = tmp_path / "w.bundle"
+    with bundle_writer(path, specs, META) as out:
+        for name, a in arrays.items():
+            out[name][...] = a
+    got, meta = read_bundle(path, use_mmap=use_mmap)
+    assert meta == META
+    for name, a in arrays.items():
+        np.testing.assert_array_equal(got[name], a)
+
+    with pytest.raises(RuntimeError):
+        with bundle_writer(tmp_path / "x.bundle", specs, META):
+            raise RuntimeError("interrupted")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["w.bundle"]
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_truncated_file_raises(tmp_path, use_mmap):
+    path = write_bundle(tmp_path / "u.bundle", _arrays(), META)
+    data = path.read_bytes()
+    for n in (0, 5, 16, 40, len(data) // 2, len(data) - 1):
+        path.write_bytes(data[:n])
+        with pytest.raises(BundleFormatError):
+            read_bundle(path, use_mmap=use_mmap)
+
+
+@pytest.mark.parametrize("damage", [
+    lambda d: b"NOTABNDL" + d[8:],
+    lambda d: d[:8] + (99).to_bytes(4, "little") + d[12:],
+    lambda d: d[:16] + b"\xff\xfe" + d[18:],
+    lambda d: d[:12] + (1 << 30).to_bytes(4, "little") + d[16:],
+])
+def test_bad_preamble_or_header_raises(tmp_path, damage):
+    path = write_bundle(tmp_path / "u.bundle", _arrays(), META)
+    path.write_bytes(damage(path.read_bytes()))
+    with pytest.raises(BundleFormatError):
+        read_bundle(path)
+
+
+def test_find_latest_bundle_lookback(tmp_path):
+    assert find_latest_bundle(tmp_path, "u", DATE) is None
+    for days_back in (3, 9):
+        write_bundle(bundle_path(tmp_path, f"u_{DATE - timedelta(days=days_back):%Y%m%d}"), {}, {})
+    # 같은 날짜 번들은 후보가 아님
+    write_bundle(bundle_path(tmp_path, f"u_{DATE:%Y%m%d}"), {}, {})
+    write_bundle(bundle_path(tmp_path, f"other_{DATE - timedelta(days=1):%Y%m%d}"), {}, {})
+
+    assert find_latest_bundle(tmp_path, "u", DATE) == bundle_path(tmp_path, "u_20251127")
+    assert find_latest_bundle(tmp_path, "u", DATE, lookback_days=2) is None
+    assert find_latest_bundle(tmp_path, "u", DATE, lookback_days=3) == bundle_path(tmp_path, "u_20251127")
+    assert find_latest_bundle(tmp_path, "u", DATE - timedelta(days=4), lookback_days=5) == \
+        bundle_path(tmp_path, "u_20251121")
@@ -0,0 +1,212 @@
+# tests/test_model_cache.py
+# -*- coding: utf-8 -*-
+"""
+ModelCache: byte 예산 LRU 제거, 파일 stat 변경 시 무효화, 동시 miss 합치기, 로드 실패 전파,
+load_model_artifact 로 캐시된 번들 모델이 엔트리마다 fd / mmap 을 들고 있지 않음.
+"""
+
+from datetime import datetime
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import model_cache
+import realtime_inference_many as core
+from bench_pipeline import write_synthetic_model
+from model_cache import ENTRY_OVERHEAD_BYTES, ModelCache, model_nbytes
+
+
+DATE = datetime(2025, 11, 30)
+ARRAY_BYTES = 1000
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(model_cache, "time", c)
+    return c
+
+
+def _files_cache(tmp_path, loads, **kwargs):
+    def locate(user_id, model_date):
+        path = tmp_path / f"{user_id}.bin"
+        if not path.exists():
+            raise FileNotFoundError(path)
+        return path
+
+    def load(user_id, model_date, path):
+        loads.append(user_id)
+        return {"user_id": user_id, "x": np.zeros(ARRAY_BYTES // 8)}
+
+    kwargs.setdefault("max_bytes", 1 << 30)
+    return ModelCache(locate, load, **kwargs)
+
+
+def _write(tmp_path, user_id, data=b"v1"):
+    path = tmp_path / f"{user_id}.bin"
+    path.write_bytes(data)
+    return path
+
+
+def test_byte_budget_lru_eviction(tmp_path, clock):
+    loads = []
+    per_entry = ARRAY_BYTES + ENTRY_OVERHEAD_BYTES
+    assert model_nbytes({"x": np.zeros(ARRAY_BYTES // 8), "meta": {}}) == per_entry
+    cache = _files_cache(tmp_path, loads, max_bytes=3 * per_entry, revalidate_sec=60)
+    for u in "abcd":
+        _write(tmp_path, u)
+
+    for u in "abc":
+        cache.get(u, DATE)
+    cache.get("a", DATE)  # a 를 최근으로
+    cache.get("d", DATE)  # 가장 오래 안 쓴 b 제거
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["bytes"] == 3 * per_entry and stats["evictions"] == 1
+    assert cache.peek("b", DATE) is None
+    assert all(cache.peek(u, DATE) is not None for u in "acd")
+
+    # 오버헤드만으로도 예산을 넘으면 새 엔트리 하나만 남는다
+    small = _files_cache(tmp_path, [], max_bytes=ENTRY_OVERHEAD_BYTES, revalidate_sec=60)
+    small.get("a", DATE)
+    small.get("b", DATE)
+    assert small.stats()["entries"] == 1 and small.peek("b", DATE) is not None
+
+
+@pytest.mark.parametrize("change", ["mtime", "size", "inode"])
+def test_invalidated_when_file_stat_changes(tmp_path, clock, change):
+    loads = []
+    cache = _files_cache(tmp_path, loads, revalidate_sec=5)
+    path = _write(tmp_path, "u")
+    st = os.stat(path)
+    first = cache.get("u", DATE)
+
+    if change == "mtime":
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    elif change == "size":
+        path.write_bytes(b"v22")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    else:
+        tmp = tmp_path / "u.tmp"
+        tmp.write_bytes(b"v2")
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        keep = tmp_path / "u.old"
+        os.link(path, keep)  # 이전 inode 가 재사용되지 않도록 유지
+        os.replace(tmp, path)
+        assert os.stat(path).st_ino != st.st_ino
+
+    # revalidate_sec 안에서는 stat 을 보지 않는다
+    clock.now += 4.9
+    assert cache.get("u", DATE) is first and loads == ["u"]
+
+    clock.now += 0.2
+    second = cache.get("u", DATE)
+    assert second is not first and loads == ["u", "u"]
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_unchanged_file_is_revalidated_without_reload(tmp_path, clock):
+    loads = []
+    cache = _files_cache(tmp_path, loads, revalidate_sec=5)
+    _write(tmp_path, "u")
+    first = cache.get("u", DATE)
+    clock.now += 10
+    assert cache.get("u", DATE) is first and loads == ["u"]
+
+    # 파일이 사라지면 엔트리도 버린다
+    (tmp_path / "u.bin").unlink()
+    clock.now += 10
+    with pytest.raises(FileNotFoundError):
+        cache.get("u", DATE)
+    assert cache.stats()["entries"] == 0
+
+
+def _concurrent_gets(cache, n):
+    results = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = cache.get("u", DATE)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def _blocking_cache(tmp_path, release, calls, error=None):
+    _write(tmp_path, "u")
+
+    def load(user_id, model_date, path):
+        calls.append(user_id)
+        release.wait(5)
+        if error is not None:
+            raise error
+        return {"x": np.zeros(4)}
+
+    return ModelCache(lambda u, d: tmp_path / f"{u}.bin", load, max_bytes=1 << 30)
+
+
+def test_concurrent_misses_coalesce(tmp_path):
+    release, calls = threading.Event(), []
+    cache = _blocking_cache(tmp_path, release, calls)
+    threads, results = _concurrent_gets(cache, 8)
+    time.sleep(0.3)  # 나머지 요청이 진행 중인 로드를 기다리는 상태가 되도록
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert calls == ["u"]
+    assert all(r is results[0] for r in results) and isinstance(results[0], dict)
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 7 and stats["entries"] == 1
+
+
+def test_load_error_reaches_all_waiters_and_is_not_cached(tmp_path):
+    release, calls = threading.Event(), []
+    cache = _blocking_cache(tmp_path, release, calls, error=ValueError("broken bundle"))
+    threads, results = _concurrent_gets(cache, 5)
+    time.sleep(0.3)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert calls == ["u"]
+    assert all(isinstance(r, ValueError) for r in results)
+    assert cache.stats()["entries"] == 0
+
+    # 실패는 캐시하지 않으므로 다음 요청은 다시 로드
+    with pytest.raises(ValueError):
+        cache.get("u", DATE)
+    assert calls == ["u", "u"]
+
+
+def _open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_cached_bundles_hold_no_fds():
+    n_users = 300
+    core.MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    for i in range(n_users):
+        write_synthetic_model(core.MODEL_DIR, f"fd_user_{i:03d}", DATE, seed=i)
+
+    cache = ModelCache(core.locate_model_artifact, core.load_model_artifact,
+                       max_bytes=1 << 30, revalidate_sec=60)
+    before = _open_fds()
+    models = [cache.get(f"fd_user_{i:03d}", DATE) for i in range(n_users)]
+    assert cache.stats()["entries"] == n_users
+    assert _open_fds() - before < 10
+
+    model = models[0]
+    assert isinstance(model["P1"], np.ndarray) and model["P1"].shape == (model["K"], model["K"])
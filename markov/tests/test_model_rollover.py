@@ -0,0 +1,100 @@
+# tests/test_model_rollover.py
+# -*- coding: utf-8 -*-
+"""
+ModelRollover pre-warm: 공유 스토어 날짜는 유저별 로드 없음, 엔트리 / fd 한도, 로드 실패 집계.
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import model_rollover
+from bench_pipeline import write_synthetic_model
+from metrics import MetricsRegistry
+from model_cache import ModelCache
+from model_rollover import ModelRollover
+from model_store import pack_model_store
+
+
+NOW = datetime(2025, 12, 1, 12, tzinfo=timezone.utc)
+TARGET = NOW - timedelta(days=1)
+USERS = [f"warm_user_{i}" for i in range(10)]
+
+
+def _rollover(tmp_path: Path, fail=(), **kwargs):
+    model_dir = tmp_path / "model"
+    model_dir.mkdir(exist_ok=True)
+    loaded = []
+
+    def locate(user_id, model_date):
+        return model_dir
+
+    def load(user_id, model_date, path):
+        if user_id in fail:
+            raise ValueError("broken bundle")
+        loaded.append(user_id)
+        return {"user_id": user_id}
+
+    cache = ModelCache(locate, load, max_bytes=1 << 30, revalidate_sec=60)
+    registry = MetricsRegistry()
+    rollover = ModelRollover(
+        cache,
+        lambda d: set(USERS) if d.date() == TARGET.date() else set(),
+        model_dir,
+        scan_interval_sec=0,
+        registry=registry,
+        prefix="t",
+        **kwargs,
+    )
+    return rollover, loaded, registry
+
+
+def _counter(registry, name):
+    return registry.counter(name, "").value()
+
+
+def test_prewarm_loads_and_switches(tmp_path):
+    rollover, loaded, _ = _rollover(tmp_path)
+    assert rollover.scan_once(NOW)["loaded"] == len(USERS)
+    stats = rollover.stats(NOW)
+    assert stats["target_ready_users"] == stats["target_warm_users"] == len(USERS)
+
+
+def test_store_date_skips_per_user_loads(tmp_path):
+    rollover, loaded, _ = _rollover(tmp_path)
+    for i, user_id in enumerate(USERS[:2]):
+        write_synthetic_model(rollover.model_dir, user_id, TARGET, seed=i)
+    pack_model_store(rollover.model_dir, TARGET)
+
+    assert rollover.scan_once(NOW)["loaded"] == 0
+    assert loaded == []
+    stats = rollover.stats(NOW)
+    assert stats["target_ready_users"] == len(USERS) and stats["target_warm_users"] == 0
+
+
+def test_entry_cap(tmp_path):
+    rollover, loaded, _ = _rollover(tmp_path, max_entries=3)
+    rollover.scan_once(NOW)
+    assert len(loaded) == 3
+    assert rollover.stats(NOW)["target_ready_users"] == len(USERS)
+
+
+def test_fd_headroom_cap(tmp_path, monkeypatch):
+    rollover, loaded, _ = _rollover(tmp_path, fd_reserve=256)
+    monkeypatch.setattr(model_rollover, "open_fd_headroom", lambda: 100)
+    rollover.scan_once(NOW)
+    assert loaded == []
+    assert rollover.stats(NOW)["target_ready_users"] == len(USERS)
+
+
+def test_load_errors_are_counted_and_retried(tmp_path, capsys):
+    rollover, loaded, registry = _rollover(tmp_path, fail={"warm_user_3"})
+    rollover.scan_once(NOW)
+    rollover.scan_once(NOW)
+    assert rollover.stats(NOW)["target_ready_users"] == len(USERS) - 1
+    assert _counter(registry, "t_load_errors_total") == 2
+    assert capsys.readouterr().err.count("load failed warm_user_3") == 1
+
+
+def test_open_fd_headroom():
+    headroom = model_rollover.open_fd_headroom()
+    assert headroom == float("inf") or headroom > 0
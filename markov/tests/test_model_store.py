@@ -0,0 +1,124 @@
+# tests/test_model_store.py
+# -*- coding: utf-8 -*-
+"""
+model_store: 유저 번들 → 날짜별 스토어 패킹, 키 조회, 스토어 / 번들 선택(locate_model_artifact),
+스토어에서 읽은 모델의 추론 결과가 번들과 같은지.
+"""
+
+from datetime import datetime
+import os
+
+import numpy as np
+import pytest
+
+import realtime_inference_many as core
+from bench_pipeline import synthetic_payload, write_synthetic_model
+from model_bundle import bundle_path, read_bundle
+from model_store import STORE_ARRAYS, ModelStore, open_store, pack_model_store, store_path
+
+
+DATE = datetime(2025, 11, 30)
+USERS = ["b_user", "a_user", "유저_c", "d_user"]
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "MODEL_DIR", tmp_path)
+    for i, user_id in enumerate(USERS):
+        write_synthetic_model(tmp_path, user_id, DATE, seed=i)
+    write_synthetic_model(tmp_path, "k3_user", DATE, seed=9, K=3)
+    bundle_path(tmp_path, f"broken_user_{DATE:%Y%m%d}").write_bytes(b"not a bundle")
+    return tmp_path
+
+
+def test_pack_and_lookup(model_dir):
+    summary = pack_model_store(model_dir, DATE, forecast_max_minutes=120)
+    assert summary["n_users"] == len(USERS)
+    assert summary["skipped"]["k3_user"] == "shape mismatch"
+    assert summary["skipped"]["broken_user"].startswith("unreadable")
+
+    store = ModelStore(store_path(model_dir, DATE))
+    assert len(store) == len(USERS)
+    keys = [k.decode("utf-8") for k in store.keys.tolist()]
+    assert keys == sorted(USERS, key=lambda u: u.encode("utf-8"))
+    for user_id in USERS:
+        assert store.index_of(user_id) == keys.index(user_id)
+        arrays, meta = store.lookup(user_id)
+        ref_arrays, ref_meta = read_bundle(bundle_path(model_dir, f"{user_id}_{DATE:%Y%m%d}"))
+        assert meta == ref_meta
+        for name in STORE_ARRAYS:
+            np.testing.assert_array_equal(arrays[name], ref_arrays[name])
+        assert arrays["forecast_powers"].shape[0] == 12
+        for h in (1, 5, 12):
+            np.testing.assert_allclose(arrays["forecast_powers"][h - 1],
+                                       np.linalg.matrix_power(ref_arrays["P1"], h))
+
+    for missing in ("k3_user", "zz_user", "", "x" * 100):
+        assert store.index_of(missing) == -1 and missing not in store
+        assert store.lookup(missing) is None
+
+
+def test_open_store_reopens_replaced_file(model_dir):
+    path = store_path(model_dir, DATE)
+    assert open_store(path) is None
+    pack_model_store(model_dir, DATE)
+    first = open_store(path)
+    assert open_store(path) is first
+
+    write_synthetic_model(model_dir, "e_user", DATE, seed=7)
+    pack_model_store(model_dir, DATE)
+    second = open_store(path)
+    assert second is not first and "e_user" in second
+
+    os.unlink(path)
+    assert open_store(path) is None
+
+
+def test_locate_prefers_store_unless_bundle_is_newer(model_dir):
+    pack_model_store(model_dir, DATE)
+    spath = store_path(model_dir, DATE)
+    assert core.locate_model_artifact("a_user", DATE) == spath
+    # 스토어에 없는 유저 (shape 이 달라 빠진 유저 포함) 는 유저 번들
+    assert core.locate_model_artifact("k3_user", DATE) == bundle_path(model_dir, f"k3_user_{DATE:%Y%m%d}")
+    with pytest.raises(FileNotFoundError):
+        core.locate_model_artifact("zz_user", DATE)
+
+    # 스토어 이후 다시 빌드된 번들이 이김
+    rebuilt = write_synthetic_model(model_dir, "a_user", DATE, seed=42)
+    st = os.stat(spath)
+    os.utime(rebuilt, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert core.locate_model_artifact("a_user", DATE) == rebuilt
+    model = core.load_model_artifact("a_user", DATE, rebuilt)
+    np.testing.assert_array_equal(model["P1"], read_bundle(rebuilt)[0]["P1"])
+
+    # 번들이 없어지면 스토어
+    os.unlink(rebuilt)
+    assert core.locate_model_artifact("a_user", DATE) == spath
+    assert "a_user" in core.list_model_users(DATE) and "k3_user" in core.list_model_users(DATE)
+
+
+def _strip_time(result):
+    return {k: v for k, v in result.items() if k != "inference_time"}
+
+
+def test_inference_same_after_packing(model_dir):
+    pack_model_store(model_dir, DATE)
+    spath = store_path(model_dir, DATE)
+    rng = np.random.default_rng(0)
+    for user_id in USERS:
+        from_bundle = core.load_model_artifact(
+            user_id, DATE, bundle_path(model_dir, f"{user_id}_{DATE:%Y%m%d}"))
+        from_store = core.load_model_artifact(user_id, DATE, spath)
+        assert from_store["meta_path"] == str(spath)
+        for _ in range(5):
+            payload = dict(synthetic_payload(rng, user_id), forecast_minutes=[10, 30, 60, 90, 360])
+            req = core.parse_inference_request(payload)
+            a = _strip_time(core.run_inference(req, from_bundle))
+            b = _strip_time(core.run_inference(req, from_store))
+            for fa, fb in zip(a.pop("forecast"), b.pop("forecast")):
+                np.testing.assert_allclose(fa.pop("distribution"), fb.pop("distribution"), atol=1e-12)
+                assert fa == fb
+            assert a == b
+
+    with pytest.raises(FileNotFoundError):
+        core.load_model_artifact("k3_user", DATE, spath)
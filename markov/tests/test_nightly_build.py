@@ -0,0 +1,131 @@
+# tests/test_nightly_build.py
+# -*- coding: utf-8 -*-
+"""
+nightly_build: sha1 샤딩이 유저를 겹치지 않고 빠짐없이 나누는지, 체크포인트로 이어서 실행,
+retry_failed 면 실패한 유저만 다시 빌드.
+"""
+
+from datetime import datetime
+import hashlib
+import json
+
+import pytest
+
+import build_yesterday_many as builder
+import nightly_build
+from nightly_build import Checkpoint, run_nightly, select_shard, shard_of
+
+
+DATE = datetime(2025, 11, 30)
+USERS = [f"user_{i:04d}" for i in range(200)]
+
+
+class FakeBuilder:
+    """build_yesterday_models_for_users 대용: fail 유저는 error, crash_after 명 뒤에는 프로세스가 죽은 것처럼."""
+
+    def __init__(self, fail=(), crash_after=None):
+        self.fail = set(fail)
+        self.crash_after = crash_after
+        self.built = []
+
+    def __call__(self, user_ids, date, max_workers=None, bulk_fetch=True, on_result=None):
+        for uid in user_ids:
+            if self.crash_after is not None and len(self.built) >= self.crash_after:
+                raise KeyboardInterrupt("killed")
+            self.built.append(uid)
+            if uid in self.fail:
+                on_result({"user_id": uid, "status": "error", "error": "ValueError",
+                           "message": "no rows", "elapsed_sec": 0.01, "stage_sec": {}})
+            else:
+                on_result({"user_id": uid, "status": "success", "elapsed_sec": 0.01,
+                           "model_meta_path": f"{uid}.json", "stage_sec": {"clean": 0.001}})
+        return {"fetch_sec": 0.0, "n_workers": 1, "n_users": len(user_ids)}
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    def install(**kwargs):
+        fb = FakeBuilder(**kwargs)
+        monkeypatch.setattr(builder, "build_yesterday_models_for_users", fb)
+        return fb
+    return install
+
+
+@pytest.mark.parametrize("shard_count", [1, 3, 8])
+def test_shards_partition_users(shard_count):
+    shards = [select_shard(USERS, i, shard_count) for i in range(shard_count)]
+    flat = [u for s in shards for u in s]
+    assert sorted(flat) == sorted(USERS) and len(flat) == len(set(flat))
+    if shard_count > 1:
+        assert all(shards)  # 200명이면 빈 샤드 없음
+    # 프로세스 / 머신과 무관한 값 (sha1 앞 8바이트 big endian, hash() 처럼 seed 를 타지 않음)
+    digest = hashlib.sha1(b"user_0001").digest()
+    assert shard_of("user_0001", shard_count) == int.from_bytes(digest[:8], "big") % shard_count
+
+
+def _checkpoint(tmp_path):
+    return Checkpoint(tmp_path / "ckpt.jsonl", DATE.strftime("%Y-%m-%d"))
+
+
+def test_resume_skips_finished_users(tmp_path, fake):
+    crashed = fake(crash_after=70)
+    ckpt = _checkpoint(tmp_path)
+    with pytest.raises(KeyboardInterrupt):
+        run_nightly(USERS, DATE, ckpt, chunk_size=50)
+    ckpt.close()
+    assert crashed.built == USERS[:70]
+
+    # 쓰다가 죽은 마지막 줄 + 다른 날짜 기록은 무시
+    with open(tmp_path / "ckpt.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"user_id": USERS[100], "status": "success", "target_date": "2025-11-29"}) + "\n")
+        f.write('{"user_id": "user_01')
+
+    resumed = fake()
+    ckpt = _checkpoint(tmp_path)
+    assert len(ckpt.done) == 70 and all("stage_sec" not in rec for rec in ckpt.done.values())
+    summary = run_nightly(USERS, DATE, ckpt, chunk_size=50)
+    ckpt.close()
+    assert resumed.built == USERS[70:]
+    assert summary["n_skipped"] == 70 and summary["n_success"] == 130 and summary["n_chunks"] == 3
+
+    again = fake()
+    ckpt = _checkpoint(tmp_path)
+    assert run_nightly(USERS, DATE, ckpt)["n_attempted"] == 0 and again.built == []
+    ckpt.close()
+
+
+def test_retry_failed_reruns_only_failed_users(tmp_path, fake):
+    failed = set(USERS[5:200:20])
+    fake(fail=failed)
+    ckpt = _checkpoint(tmp_path)
+    summary = run_nightly(USERS, DATE, ckpt)
+    ckpt.close()
+    assert summary["n_error"] == len(failed) and summary["errors"] == {"ValueError": len(failed)}
+
+    no_retry = fake()
+    ckpt = _checkpoint(tmp_path)
+    assert run_nightly(USERS, DATE, ckpt, retry_failed=False)["n_attempted"] == 0
+    ckpt.close()
+    assert no_retry.built == []
+
+    retry = fake()
+    ckpt = _checkpoint(tmp_path)
+    summary = run_nightly(USERS, DATE, ckpt, retry_failed=True)
+    ckpt.close()
+    assert set(retry.built) == failed and summary["n_success"] == len(failed)
+    assert all(rec["status"] == "success" for rec in _checkpoint(tmp_path).done.values())
+
+
+def test_cli_runs_one_shard(tmp_path, fake, capsys):
+    fb = fake()
+    users_file = tmp_path / "users.txt"
+    users_file.write_text("\n".join(USERS + USERS[:10]) + "\n", encoding="utf-8")
+    rc = nightly_build.main([
+        "--date", "2025-11-30", "--users-file", str(users_file),
+        "--shard-index", "1", "--shard-count", "4", "--checkpoint", str(tmp_path / "c.jsonl"),
+    ])
+    out = capsys.readouterr().out
+    summary = json.loads(out[out.index("\n{") + 1:])
+    assert rc == 0
+    assert fb.built == select_shard(USERS, 1, 4)
+    assert summary["n_users"] == len(fb.built) and summary["n_users_all_shards"] == len(USERS)
@@ -0,0 +1,135 @@
+# tests/test_rds_fetch.py
+# -*- coding: utf-8 -*-
+"""
+rds_fetch: sqlite3 커넥션으로 fetch_* 조회 / pooled_connection 반납 동작.
+"""
+
+from datetime import datetime
+import sqlite3
+
+import numpy as np
+import pytest
+
+import rds_fetch
+from feature_engine import RAW_COLS
+from rds_fetch import (
+    SLOTS_PER_DAY,
+    fetch_active_user_ids,
+    fetch_day_raw_block,
+    fetch_day_raw_many,
+    placeholder,
+    pooled_connection,
+)
+
+
+DATE = datetime(2025, 11, 30)
+
+
+def _row_values(user_no: int, slot: int) -> list:
+    return [float(user_no * 1000 + slot * 10 + c) for c in range(len(RAW_COLS))]
+
+
+@pytest.fixture
+def conn():
+    c = sqlite3.connect(":memory:")
+    c.execute(
+        "CREATE TABLE DailyPreprocessedSlot (user_id TEXT, timestamp TEXT, "
+        + ", ".join(f"{col} REAL" for col in RAW_COLS) + ")"
+    )
+    rows = []
+    # u1: 0, 1, 143 슬롯 / u2: 10 슬롯 / u3: 다른 날짜만
+    for user_id, user_no, slots, day in (
+        ("u1", 1, (0, 1, 143), "2025-11-30"),
+        ("u2", 2, (10,), "2025-11-30"),
+        ("u3", 3, (5,), "2025-11-29"),
+    ):
+        for slot in slots:
+            ts = f"{day} {slot * 10 // 60:02d}:{slot * 10 % 60:02d}:00"
+            rows.append((user_id, ts, *_row_values(user_no, slot)))
+    c.executemany(
+        f"INSERT INTO DailyPreprocessedSlot VALUES ({', '.join(['?'] * (2 + len(RAW_COLS)))})", rows
+    )
+    c.commit()
+    yield c
+    c.close()
+
+
+def test_placeholder(conn):
+    assert placeholder(conn) == "?"
+    assert placeholder(object()) == "%s"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 500])
+def test_fetch_day_raw_block(conn, chunk_size):
+    users = ["u2", "missing", "u1", "u3"]
+    block, row_counts = fetch_day_raw_block(users, DATE, conn=conn, chunk_size=chunk_size)
+
+    assert block.shape == (4, SLOTS_PER_DAY, len(RAW_COLS))
+    assert row_counts.tolist() == [1, 0, 3, 0]
+    for i, user_no, slots in ((0, 2, (10,)), (2, 1, (0, 1, 143))):
+        for slot in slots:
+            np.testing.assert_array_equal(block[i, slot], _row_values(user_no, slot))
+        empty = np.setdiff1d(np.arange(SLOTS_PER_DAY), slots)
+        assert np.isnan(block[i, empty]).all()
+    assert np.isnan(block[[1, 3]]).all()
+
+
+def test_fetch_day_raw_block_empty(conn):
+    block, row_counts = fetch_day_raw_block([], DATE, conn=conn)
+    assert block.shape == (0, SLOTS_PER_DAY, len(RAW_COLS))
+    assert row_counts.shape == (0,)
+
+
+def test_fetch_day_raw_many(conn):
+    out = fetch_day_raw_many(["u1", "u2", "u1", "missing"], DATE, conn=conn)
+    assert sorted(out) == ["u1", "u2"]
+    np.testing.assert_array_equal(out["u2"][10], _row_values(2, 10))
+
+
+def test_fetch_active_user_ids(conn):
+    assert fetch_active_user_ids(DATE, conn=conn) == ["u1", "u2"]
+    assert fetch_active_user_ids(datetime(2025, 11, 29), conn=conn) == ["u3"]
+    assert fetch_active_user_ids(datetime(2025, 12, 1), conn=conn) == []
+
+
+class _FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+        self.out = 0
+        self.returned = []
+
+    def getconn(self):
+        self.out += 1
+        return self.conn
+
+    def putconn(self, conn):
+        self.out -= 1
+        self.returned.append(conn)
+
+
+def test_pooled_connection_rolls_back_and_returns(conn, monkeypatch):
+    pool = _FakePool(conn)
+    monkeypatch.setattr(rds_fetch, "get_pool", lambda: pool)
+
+    with pooled_connection() as c:
+        assert pool.out == 1
+        c.execute("INSERT INTO DailyPreprocessedSlot (user_id, timestamp) VALUES ('tmp', '2025-11-30 00:00:00')")
+    assert pool.out == 0 and pool.returned == [conn]
+    # 반납 전에 rollback → 커밋 안 된 쓰기는 남지 않음
+    assert "tmp" not in fetch_active_user_ids(DATE, conn=conn)
+
+    # conn 없이 호출하면 풀에서 빌려 씀
+    assert fetch_active_user_ids(DATE) == ["u1", "u2"]
+    block, row_counts = fetch_day_raw_block(["u1"], DATE)
+    assert row_counts.tolist() == [3]
+    assert pool.out == 0 and len(pool.returned) == 3
+
+
+def test_pooled_connection_returns_on_error(conn, monkeypatch):
+    pool = _FakePool(conn)
+    monkeypatch.setattr(rds_fetch, "get_pool", lambda: pool)
+
+    with pytest.raises(RuntimeError):
+        with pooled_connection():
+            raise RuntimeError("boom")
+    assert pool.out == 0 and pool.returned == [conn]
@@ -0,0 +1,140 @@
+# tests/test_rolling_model.py
+# -*- coding: utf-8 -*-
+"""
+rolling_model: 날짜별 값으로 누적 재계산 (재빌드 / backfill / history trim), 상태 저장, 유저별 잠금.
+"""
+
+from datetime import datetime, timedelta
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from markov_stats import normalize_transitions
+from model_bundle import write_bundle
+from rolling_model import (
+    fold_day,
+    load_rolling_state,
+    rolling_state_lock,
+    save_rolling_state,
+    state_to_model_arrays,
+)
+
+
+K = 3
+DECAY = 0.8
+
+
+def _date(i: int) -> str:
+    return (datetime(2025, 11, 1) + timedelta(days=i)).strftime("%Y-%m-%d")
+
+
+def _windows(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(30, 6, 3)) + np.repeat(np.arange(3), 10)[:, None, None]
+
+
+def _cluster(windows, k):
+    return np.arange(len(windows)) % k, windows[[0, 10, 20]]
+
+
+def _fold(state, day, history_days=60):
+    return fold_day(state, _windows(day), _date(day), K, DECAY, _cluster, history_days=history_days)[0]
+
+
+def _expected_trans(state, as_of):
+    total = 0
+    for i, d in enumerate(state["day_dates"]):
+        gap = (datetime.strptime(as_of, "%Y-%m-%d") - datetime.strptime(d, "%Y-%m-%d")).days
+        if gap >= 0:
+            total = total + DECAY ** gap * state["day_trans"][i]
+    return total
+
+
+def test_rerun_same_date_replaces_day():
+    state = None
+    for day in range(3):
+        state = _fold(state, day)
+    rerun = _fold(state, 2)
+    assert rerun["day_dates"] == state["day_dates"] and rerun["n_days"] == 3
+    np.testing.assert_array_equal(rerun["centroids"], state["centroids"])
+    np.testing.assert_allclose(rerun["trans_counts"], _expected_trans(rerun, _date(2)))
+
+    again = _fold(rerun, 2)
+    np.testing.assert_array_equal(again["trans_counts"], rerun["trans_counts"])
+
+
+def test_backfill_inserts_day_in_order():
+    state = _fold(_fold(None, 0), 2)
+    filled = _fold(state, 1)
+    assert filled["day_dates"] == [_date(0), _date(1), _date(2)]
+    assert filled["n_days"] == 3 and filled["last_date"] == _date(2)
+    np.testing.assert_array_equal(filled["centroids"], state["centroids"])
+    np.testing.assert_allclose(filled["trans_counts"], _expected_trans(filled, _date(2)))
+
+    # 지난 날짜 모델은 그 날짜까지만 누적
+    model = state_to_model_arrays(filled, as_of=_date(1))
+    np.testing.assert_allclose(model["P1"], normalize_transitions(_expected_trans(filled, _date(1)))[0])
+
+
+def test_history_trim_keeps_totals():
+    full = trimmed = None
+    for day in range(5):
+        full = _fold(full, day)
+        trimmed = _fold(trimmed, day, history_days=2)
+    assert trimmed["day_dates"] == [_date(3), _date(4)] and trimmed["tail_date"] == _date(2)
+    for name in ("trans_counts", "endpoint_sums", "endpoint_counts", "centroids"):
+        np.testing.assert_allclose(trimmed[name], full[name])
+
+    _fold(trimmed, 3, history_days=2)
+    with pytest.raises(ValueError):
+        _fold(trimmed, 2, history_days=2)
+
+
+def test_save_load_roundtrip(tmp_path):
+    state = None
+    for day in range(4):
+        state = _fold(state, day, history_days=2)
+    path = tmp_path / "u_rolling_state.bundle"
+    save_rolling_state(path, state)
+    loaded = load_rolling_state(path)
+    assert loaded["day_dates"] == state["day_dates"] and loaded["tail_date"] == state["tail_date"]
+    for name in ("trans_counts", "day_trans", "tail_trans", "centroids"):
+        np.testing.assert_array_equal(loaded[name], state[name])
+    np.testing.assert_array_equal(_fold(loaded, 4)["trans_counts"], _fold(state, 4)["trans_counts"])
+
+
+def test_legacy_state_without_days(tmp_path):
+    state = _fold(_fold(None, 0), 1)
+    path = tmp_path / "legacy.bundle"
+    array_keys = ("centroids", "trans_counts", "endpoint_sums", "endpoint_counts")
+    meta_keys = ("steps", "K", "decay", "first_date", "last_date", "n_days")
+    write_bundle(path, {k: state[k] for k in array_keys}, {k: state[k] for k in meta_keys})
+
+    legacy = load_rolling_state(path)
+    assert legacy["day_dates"] == [] and legacy["tail_date"] == _date(1)
+    nxt = _fold(legacy, 2)
+    np.testing.assert_allclose(nxt["trans_counts"], _fold(state, 2)["trans_counts"])
+    with pytest.raises(ValueError):
+        _fold(legacy, 1)
+
+
+def test_state_lock_is_exclusive(tmp_path):
+    path = tmp_path / "u_rolling_state.bundle"
+    order = []
+    held = threading.Event()
+
+    def first():
+        with rolling_state_lock(path):
+            held.set()
+            time.sleep(0.2)
+            order.append("first")
+
+    t = threading.Thread(target=first)
+    t.start()
+    held.wait(5)
+    with rolling_state_lock(path):
+        order.append("second")
+    t.join()
+    assert order == ["first", "second"]
@@ -0,0 +1,108 @@
+# tests/test_slot_clean.py
+# -*- coding: utf-8 -*-
+"""
+slot_clean: interp_fill / ffill_bfill / clean_slot_block 가 pandas 기준 클린
+(10분 그리드 reindex → clean_raw_df_step2lite) 과 같은 결과인지.
+앞 / 중간 / 끝 누락 구간, 값이 하나도 없는 컬럼 포함.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_yesterday_many import clean_raw_df_step2lite
+from feature_engine import RAW_COLS
+from rds_fetch import SLOTS_PER_DAY
+from slot_clean import clean_slot_block, ffill_bfill, frame_to_slot_block, interp_fill
+
+
+DATE = datetime(2025, 11, 30)
+GRID = pd.date_range(DATE, periods=SLOTS_PER_DAY, freq="10min")
+
+
+def _series_with_gaps(rng, shape, nan_rate=0.2):
+    x = rng.normal(size=shape)
+    x[rng.random(shape) < nan_rate] = np.nan
+    x[..., :7] = np.nan     # 앞
+    x[..., 60:75] = np.nan  # 중간
+    x[..., -9:] = np.nan    # 끝
+    return x
+
+
+def test_interp_fill_matches_pandas():
+    rng = np.random.default_rng(0)
+    x = _series_with_gaps(rng, (3, 4, SLOTS_PER_DAY))
+    x[1, 2] = np.nan            # 값 없는 시계열
+    x[2, 0] = np.nan
+    x[2, 0, 50] = 1.5           # 값 1개
+    ref = pd.DataFrame(x.reshape(-1, SLOTS_PER_DAY).T).interpolate(
+        method="linear", limit_direction="both").ffill().bfill().to_numpy().T.reshape(x.shape)
+    out = interp_fill(x)
+    np.testing.assert_array_equal(np.isnan(out), np.isnan(ref))
+    np.testing.assert_allclose(out, ref, equal_nan=True)
+    assert np.isnan(out[1, 2]).all() and (out[2, 0] == 1.5).all()
+
+
+def test_ffill_bfill_matches_pandas():
+    rng = np.random.default_rng(1)
+    x = np.floor(_series_with_gaps(rng, (5, SLOTS_PER_DAY), nan_rate=0.4) * 2)
+    x[4] = np.nan
+    ref = pd.DataFrame(x.T).ffill().bfill().to_numpy().T
+    np.testing.assert_array_equal(ffill_bfill(x), ref)
+
+
+def _raw_frame(seed, missing_slots, all_nan_col=None):
+    rng = np.random.default_rng(seed)
+    keep = np.setdiff1d(np.arange(SLOTS_PER_DAY), missing_slots)
+    df = pd.DataFrame({"timestamp": GRID[keep]})
+    for c in RAW_COLS:
+        if c in ("rainType", "sky"):
+            v = rng.integers(0, 4, size=len(keep)).astype(float)
+        elif c in ("sigh", "laughter"):
+            v = rng.poisson(1.0, size=len(keep)).astype(float)
+        else:
+            v = rng.uniform(0, 100, size=len(keep))
+        v[rng.random(len(keep)) < 0.1] = np.nan
+        df[c] = v
+    if all_nan_col is not None:
+        df[all_nan_col] = np.nan
+    return df
+
+
+def _pandas_reference(df):
+    """기존 방식: 10분 그리드로 resample(reindex) 후 DataFrame 클린."""
+    grid = df.set_index("timestamp").reindex(GRID).rename_axis("timestamp").reset_index()
+    return clean_raw_df_step2lite(grid)[RAW_COLS].to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize("missing,all_nan_col", [
+    (np.arange(0, 12), None),                            # 앞
+    (np.arange(50, 80), "humidity"),                     # 중간 + 값 없는 연속형 컬럼
+    (np.arange(130, 144), "sky"),                        # 끝 + 값 없는 범주형 컬럼
+    (np.r_[0:5, 70:72, 140:144], "laughter"),            # 여러 구간 + 값 없는 횟수 컬럼
+    (np.array([], dtype=int), None),
+])
+def test_clean_slot_block_matches_pandas(missing, all_nan_col):
+    df = _raw_frame(len(missing), missing, all_nan_col)
+    block = frame_to_slot_block(df, DATE)
+    assert np.isnan(block[missing]).all()
+
+    out = clean_slot_block(block)
+    ref = _pandas_reference(df)
+    np.testing.assert_array_equal(np.isnan(out), np.isnan(ref))
+    np.testing.assert_allclose(out, ref, equal_nan=True)
+
+    if all_nan_col in ("humidity", "sky"):
+        assert np.isnan(out[:, RAW_COLS.index(all_nan_col)]).all()
+    if all_nan_col == "laughter":
+        assert (out[:, RAW_COLS.index("laughter")] == 0).all()
+
+
+def test_batch_block_matches_per_user():
+    frames = [_raw_frame(i, np.arange(i * 10, i * 10 + 15)) for i in range(4)]
+    block = np.stack([frame_to_slot_block(df, DATE) for df in frames])
+    out = clean_slot_block(block)
+    for u, df in enumerate(frames):
+        np.testing.assert_allclose(out[u], _pandas_reference(df), equal_nan=True)
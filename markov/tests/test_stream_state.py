@@ -0,0 +1,115 @@
+# tests/test_stream_state.py
+# -*- coding: utf-8 -*-
+"""
+stream_state: 증분 DTW 가 전체 DTW 재계산과 같은 값, StreamRegistry 유휴 TTL / 용량 제거,
+모델(centroids 객체)이 바뀌면 링버퍼 포인트를 새 중심으로 다시 누적.
+"""
+
+import numpy as np
+import pytest
+
+import stream_state
+from dtw_kmeans import dtw_sq_matrix
+from metrics import MetricsRegistry
+from stream_state import StreamingDTW, StreamRegistry
+
+
+K, L, D = 5, 24, 5
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(stream_state, "time", c)
+    return c
+
+
+def _centroids(seed):
+    return np.random.default_rng(seed).uniform(0, 1, size=(K, L, D))
+
+
+def _full_dtw(window, centroids, radius):
+    return np.sqrt(dtw_sq_matrix(window[None], centroids, radius)[0])
+
+
+@pytest.mark.parametrize("radius", [0, 2, 5])
+def test_push_matches_full_dtw(radius):
+    C = _centroids(0)
+    points = np.random.default_rng(1).uniform(0, 1, size=(80, D))
+    s = StreamingDTW(C, radius=radius)
+    for n, x in enumerate(points, start=1):
+        dist = s.push(x)
+        if n < L:
+            assert dist is None and not s.ready
+            continue
+        np.testing.assert_array_equal(s.window(), points[n - L:n])
+        np.testing.assert_array_equal(dist, _full_dtw(points[n - L:n], C, radius))
+
+
+def test_registry_idle_ttl(clock):
+    reg = MetricsRegistry()
+    streams = StreamRegistry(max_users=10, idle_ttl_sec=60, registry=reg, prefix="t")
+    C = _centroids(0)
+    x = np.full(D, 0.5)
+    for n in range(1, 4):
+        assert streams.update("a", C, x)["filled"] == n
+        clock.now += 30
+    assert streams.update("a", C, x)["filled"] == 4
+
+    clock.now += 61
+    assert streams.update("a", C, x)["filled"] == 1
+    streams.update("b", C, x)
+    clock.now += 61
+    # 다른 유저 요청 때 TTL 지난 유저를 정리
+    streams.update("c", C, x)
+    assert len(streams) == 1
+    evictions = reg.counter("t_evictions_total", "", ("reason",))
+    assert evictions.value(reason="idle") == 3
+
+
+def test_registry_capacity_lru(clock):
+    reg = MetricsRegistry()
+    streams = StreamRegistry(max_users=2, idle_ttl_sec=3600, registry=reg, prefix="t")
+    C = _centroids(0)
+    x = np.full(D, 0.5)
+    streams.update("a", C, x)
+    streams.update("b", C, x)
+    streams.update("a", C, x)   # a 를 최근으로
+    streams.update("c", C, x)   # 가장 오래된 b 제거
+    assert len(streams) == 2
+    assert streams.update("a", C, x)["filled"] == 3
+    assert streams.update("b", C, x)["filled"] == 1
+    assert reg.counter("t_evictions_total", "", ("reason",)).value(reason="capacity") == 2
+
+
+def test_replay_on_model_change(clock):
+    streams = StreamRegistry(max_users=10, idle_ttl_sec=3600)
+    C1, C2 = _centroids(0), _centroids(1)
+    points = np.random.default_rng(2).uniform(0, 1, size=(30, D))
+    for x in points[:-1]:
+        streams.update("u", C1, x)
+
+    out = streams.update("u", C2, points[-1])
+    assert out["ready"] and out["filled"] == L
+    np.testing.assert_allclose(out["dtw_distances"], _full_dtw(points[-L:], C2, stream_state.DTW_RADIUS))
+    assert out["cluster_id"] == int(np.argmin(out["dtw_distances"]))
+
+    # 값이 같아도 다른 배열 객체면 새 모델로 보고 다시 누적 (결과는 같음)
+    copy = C2.copy()
+    nxt = np.full(D, 0.3)
+    a = streams.update("u", copy, nxt)
+    np.testing.assert_allclose(
+        a["dtw_distances"], _full_dtw(np.vstack([points[-L + 1:], nxt]), C2, stream_state.DTW_RADIUS))
+
+    # 모델 shape 이 다르면 포인트를 버리고 새로 쌓음
+    short = np.random.default_rng(3).uniform(0, 1, size=(K, L, D + 1))
+    b = streams.update("u", short, np.zeros(D + 1))
+    assert b["filled"] == 1 and not b["ready"]
@@ -0,0 +1,85 @@
+# tests/test_warm_start.py
+# -*- coding: utf-8 -*-
+"""
+warm start (WARM_START 기본 on): 이전 모델 번들 중심으로 시작, 없거나 깨졌거나 shape 이 다르면
+cold k-means++, inertia_tol 조기 종료.
+"""
+
+from datetime import datetime, timedelta
+import json
+
+import numpy as np
+import pytest
+
+import build_yesterday_many as builder
+from bench_pipeline import synthetic_day_block, write_synthetic_model
+from dtw_kmeans import banded_dtw_kmeans
+from model_bundle import bundle_path
+
+
+DATE = datetime(2025, 11, 30)
+PREV = DATE - timedelta(days=1)
+USER = "warm_user"
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(builder, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(builder, "ROLLING_MODEL", False)
+    monkeypatch.setattr(builder, "WARM_START", True)
+    return tmp_path
+
+
+def _build(date, seed=0):
+    day_raw = synthetic_day_block(1, seed=seed)[0]
+    meta_path = builder.build_yesterday_model_for_user(USER, date, day_raw=day_raw)
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)["clustering"]
+
+
+def test_previous_model_seeds_clustering(model_dir):
+    assert _build(PREV, seed=1)["init"] == "cold"
+    prev = builder.load_warm_start_centroids(USER, DATE)
+    assert prev is not None and prev.shape[:2] == (builder.K_CLUSTERS, builder.WINDOW_LENGTH)
+    assert _build(DATE, seed=2)["init"] == "warm"
+
+
+def test_lookback_limit(model_dir, monkeypatch):
+    monkeypatch.setattr(builder, "WARM_START_LOOKBACK_DAYS", 2)
+    write_synthetic_model(model_dir, USER, DATE - timedelta(days=3))
+    assert builder.load_warm_start_centroids(USER, DATE) is None
+    write_synthetic_model(model_dir, USER, DATE - timedelta(days=2))
+    assert builder.load_warm_start_centroids(USER, DATE) is not None
+
+
+def test_missing_model_falls_back_to_cold(model_dir):
+    assert builder.load_warm_start_centroids(USER, DATE) is None
+    assert _build(DATE)["init"] == "cold"
+
+
+@pytest.mark.parametrize("damage", ["truncate", "magic"])
+def test_corrupt_model_falls_back_to_cold(model_dir, damage):
+    path = write_synthetic_model(model_dir, USER, PREV)
+    assert path == bundle_path(model_dir, f"{USER}_{PREV:%Y%m%d}")
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) // 2] if damage == "truncate" else b"XXXX" + data[4:])
+    assert builder.load_warm_start_centroids(USER, DATE) is None
+    assert _build(DATE)["init"] == "cold"
+
+
+@pytest.mark.parametrize("shape", [dict(K=3), dict(window_length=12)])
+def test_shape_mismatch_falls_back_to_cold(model_dir, shape):
+    write_synthetic_model(model_dir, USER, PREV, **shape)
+    assert builder.load_warm_start_centroids(USER, DATE) is None
+    assert _build(DATE)["init"] == "cold"
+
+
+def test_inertia_tol_early_stop():
+    X = np.random.default_rng(0).normal(size=(40, 12, 3)).cumsum(axis=1)
+    full = banded_dtw_kmeans(X, 3, max_iter=4, label_tol=-1.0, inertia_tol=None)
+    assert full["n_iter"] == 4 and not full["converged"]
+
+    # 상대 감소량이 항상 1 이하 → 두 번째 반복에서 종료
+    early = banded_dtw_kmeans(X, 3, max_iter=4, label_tol=-1.0, inertia_tol=1.0)
+    assert early["n_iter"] == 1 and early["converged"]
+    assert np.bincount(early["labels"], minlength=3).min() > 0